@@ -1,46 +1,342 @@
-from fastapi import FastAPI, Query
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
-from typing import List
+from typing import Dict, List, Optional
+import asyncio
+import functools
+import logging
+import math
+import numpy as np
 import uvicorn
 import pydantic
 import os
+import secrets
+import threading
+import time
 
-from backend.model.runtime.predict_one import predict_row
+from backend.catalog.exoplanet_metrics import (
+    ARROW_MEDIA_TYPE, FLOAT32_MEDIA_TYPE, SOURCE_COLUMNS, NotAcceptable, binary_media_type, encode_arrow, encode_float32, encode_metrics, metric_columns,
+)
+from backend.catalog.ingest import ReleaseDiff, ingest_release
+from backend.catalog.predictions import cached_release
+from backend.catalog.query import parse_range
+from backend.catalog.search import paginate
+from backend.catalog.snapshot import CatalogSnapshot
+from backend.catalog.thresholds import apply_threshold
+from backend.model.runtime.predict_one import choose_engine, feature_names, load_model, predict_batch
+from backend.model.runtime.prediction_cache import PREDICTION_CACHE
+from backend.cache import LRUCache
+from backend.coalesce import PredictionCoalescer
+from backend import csv_stream
+from backend.instrumentation import InstrumentationMiddleware, Registry, stage
+from backend.offload import InferencePool, PoolFull
+from backend.profiles import build_planet_profile
+from backend.responses import DuplexStreamingResponse
+
+logger = logging.getLogger(__name__)
 
 CSV_FILE_NAME = f"{os.path.dirname(os.path.abspath(__file__))}/data/koi.csv"
 
-app = FastAPI()
+# built on first use (normally by the lifespan hook), never at import
+_CATALOG: Optional[CatalogSnapshot] = None
+_CATALOG_LOCK = threading.Lock()
+_RELOAD_LOCK = threading.Lock()
+
+# how often a worker checks whether another worker ingested a new release
+CATALOG_CHECK_INTERVAL = float(os.environ.get("CATALOG_CHECK_INTERVAL", 1.0))
+_next_release_check = 0.0
+
+def get_catalog() -> CatalogSnapshot:
+    """
+    The loaded catalog, reading it on the first call.
+
+    Under uvicorn --workers N a reload only runs in the worker that got
+    POST /catalog/reload. It rewrites the release stamp stored with the
+    on-disk predictions, and every other worker, on its next call here
+    after CATALOG_CHECK_INTERVAL, sees the stamp differ from its snapshot's
+    and rebuilds in the background from the refreshed on-disk copies
+    (without rescoring). Until then it keeps serving the old snapshot.
+    """
+    global _CATALOG, _next_release_check
+    if _CATALOG is None:
+        with _CATALOG_LOCK:
+            if _CATALOG is None:
+                _CATALOG = CatalogSnapshot(CSV_FILE_NAME)
+        _next_release_check = time.monotonic() + CATALOG_CHECK_INTERVAL
+    elif time.monotonic() >= _next_release_check:
+        _next_release_check = time.monotonic() + CATALOG_CHECK_INTERVAL
+        if _released_elsewhere(_CATALOG):
+            threading.Thread(target=_follow_release, name="catalog-follow", daemon=True).start()
+    return _CATALOG
+
+def _released_elsewhere(catalog: CatalogSnapshot) -> bool:
+    """True if the on-disk release stamp no longer matches catalog's."""
+    if catalog.release is None:
+        # predictions were never written (read-only data dir): nothing to follow
+        return False
+    release = cached_release(CSV_FILE_NAME)
+    return release is not None and release != catalog.release
+
+def _follow_release() -> None:
+    """Swap in a snapshot of the release another worker ingested."""
+    global _CATALOG
+    # a reload already running here (ours or a follow) ends on the current release
+    if not _RELOAD_LOCK.acquire(blocking=False):
+        return
+    try:
+        if not _released_elsewhere(_CATALOG):
+            return
+        # columnar copy and predictions are already on disk, so nothing is rescored
+        snapshot = CatalogSnapshot(CSV_FILE_NAME)
+        with _CATALOG_LOCK:
+            _CATALOG = snapshot
+            # the diff was only seen by the worker that ingested it
+            PROFILE_CACHE.clear()
+        logger.info("Followed catalog release %s", snapshot.release)
+    except Exception:
+        logger.exception("Could not load the catalog release ingested by another worker")
+    finally:
+        _RELOAD_LOCK.release()
+
+def reload_catalog(csv_path=None) -> ReleaseDiff:
+    """
+    Ingest the release at csv_path into a new snapshot and swap it in.
+
+    Only added or feature-changed KOIs are rescored. Requests already
+    running keep the snapshot they started with; later ones see the new
+    one. Cached profiles of changed or removed KOIs are dropped. Other
+    workers follow within CATALOG_CHECK_INTERVAL (see get_catalog).
+    """
+    global _CATALOG
+    # one reload at a time; readers never wait on this
+    with _RELOAD_LOCK:
+        snapshot, diff = ingest_release(get_catalog(), csv_path or CSV_FILE_NAME)
+        if snapshot.release is None:
+            logger.warning("Release stamp not written; other workers keep serving the previous release")
+        # swap and evict together, so _cache_profile can't slip a stale profile in between
+        with _CATALOG_LOCK:
+            _CATALOG = snapshot
+            for kepoi_name in diff.changed + diff.removed:
+                PROFILE_CACHE.pop(kepoi_name)
+    return diff
+
+def _cache_profile(catalog: CatalogSnapshot, kepoi_name: str, profile) -> None:
+    """Cache a profile built from catalog's record, unless a reload has replaced catalog since."""
+    with _CATALOG_LOCK:
+        if _CATALOG is catalog:
+            PROFILE_CACHE.put(kepoi_name, profile)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # load before accepting requests so the first request doesn't pay for it;
+    # load_model also records load time and RSS in artifacts/model_load.json
+    load_model()
+    get_catalog()
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+LISTING_FIELDS = ["kepler_name", "kepoi_name"]
+MAX_PAGE_SIZE = 1000
+
+# profiles are deterministic per KOI, so keep the most recently requested ones
+PROFILE_CACHE = LRUCache(maxsize=int(os.environ.get("PROFILE_CACHE_SIZE", 4096)))
+
+# per-row pandas/model work runs here, off the event loop; when it's full
+# requests get a 429 instead of queueing behind each other
+INFERENCE_POOL = InferencePool(
+    max_workers=int(os.environ.get("INFERENCE_WORKERS", 4)),
+    max_queue=int(os.environ.get("INFERENCE_QUEUE", 64)),
+    timeout=float(os.environ.get("INFERENCE_TIMEOUT", 10.0)),
+)
+
+@contextmanager
+def _pool_errors():
+    """Map INFERENCE_POOL overload to 429 and timeouts to 504."""
+    try:
+        yield
+    except PoolFull:
+        raise HTTPException(status_code=429, detail="Too many requests in flight", headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Request timed out")
+
+async def _offload(fn, *args):
+    """Run fn(*args) on INFERENCE_POOL."""
+    with _pool_errors():
+        return await INFERENCE_POOL.run(fn, *args)
 
-# read csv
-DATA = pd.read_csv(CSV_FILE_NAME, comment='#')
-# create orbital radius column
-DATA["orbital_radius"] = DATA["koi_dor"] * DATA["koi_srad"]
+# Prometheus metrics served on /metrics
+METRICS = Registry()
+ROWS_SCORED = METRICS.counter("model_rows_scored_total", "Rows scored by the model, by endpoint and engine.", ("endpoint", "engine"))
+MODEL_SECONDS = METRICS.histogram("model_predict_seconds", "predict_batch latency per call, by engine.", ("engine",))
+
+def _scored(frame, *, endpoint, engine="auto", **kwargs):
+    """predict_batch(frame, ...) recorded in the model metrics."""
+    # resolved here so the metrics say which engine actually ran
+    engine = choose_engine(engine, len(frame))
+    start = time.perf_counter()
+    predictions = predict_batch(frame, engine=engine, **kwargs)
+    MODEL_SECONDS.observe(time.perf_counter() - start, engine=engine)
+    # cache hits never reach the model, so they are not counted as scored
+    ROWS_SCORED.inc(predictions.attrs["model_rows"], endpoint=endpoint, engine=engine)
+    return predictions
+
+def _predict_frame(frame):
+    return _scored(frame, endpoint="predict", use_cache=True)
+
+# concurrent /predict requests are scored together in one model call
+PREDICTOR = PredictionCoalescer(
+    _predict_frame,
+    window=float(os.environ.get("PREDICT_WINDOW_MS", 2.0)) / 1e3,
+    max_rows=int(os.environ.get("PREDICT_BATCH_ROWS", 256)),
+    run=INFERENCE_POOL.run,
+)
+
+MAX_PREDICT_ROWS = 10000
+CSV_CHUNK_BYTES = 1 << 20
+# how long a /predict/csv chunk waits for a pool slot before the stream gives up
+CSV_SLOT_WAIT = float(os.environ.get("CSV_SLOT_WAIT", 30.0))
+
+def _cache_lookups():
+    lookups = {}
+    for name, cache in (("profile", PROFILE_CACHE), ("prediction", PREDICTION_CACHE)):
+        stats = cache.stats()
+        lookups[(name, "hit")] = stats["hits"]
+        lookups[(name, "miss")] = stats["misses"]
+    return lookups
+
+METRICS.collect("cache_lookups_total", "Cache lookups by cache and result.", "counter", ("cache", "result"), _cache_lookups)
+METRICS.collect(
+    "cache_entries", "Entries currently cached.", "gauge", ("cache",),
+    lambda: {("profile",): PROFILE_CACHE.stats()["size"], ("prediction",): PREDICTION_CACHE.stats()["size"]},
+)
+METRICS.collect(
+    "inference_pool_jobs", "Inference pool jobs running or queued now.", "gauge", ("state",),
+    lambda: {("outstanding",): INFERENCE_POOL.stats()["outstanding"]},
+)
+METRICS.collect(
+    "inference_pool_jobs_total", "Inference pool jobs completed, rejected and timed out so far.", "counter", ("state",),
+    lambda: {(state,): INFERENCE_POOL.stats()[state] for state in ("completed", "rejected", "timeouts")},
+)
+METRICS.collect(
+    "predict_coalescer_total", "Coalesced /predict requests, model batches and rows.", "counter", ("kind",),
+    lambda: {(kind,): PREDICTOR.stats()[kind] for kind in ("requests", "batches", "rows")},
+)
+
+# folded stacks from requests profiled with X-Profile, served on /debug/profiles/{id}
+PROFILES = LRUCache(maxsize=32)
+
+def _store_profile(folded: str) -> str:
+    profile_id = secrets.token_hex(8)
+    PROFILES.put(profile_id, folded)
+    return profile_id
 
 origins = [
     "http://localhost:3000",
 ]
 
+# Server-Timing on every response and request metrics; PROFILE_TOKEN enables
+# per-request profiling for requests sending it as X-Profile
+app.add_middleware(
+    InstrumentationMiddleware,
+    registry=METRICS,
+    profile_token=os.environ.get("PROFILE_TOKEN") or None,
+    store_profile=_store_profile,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", "Server-Timing", "X-Cache", "X-Next-Cursor", "X-Profile-Id", "X-Total-Count"],
 )
 
 @app.get("/exoplanets")
-async def get_exoplanets():
+async def get_exoplanets(
+    request: Request,
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = Query(default=None),
+):
     """
     Endpoint that reads koi.csv and returns the data as a list of JSON objects.
+
+    Without parameters the full listing is served pre-encoded with an ETag;
+    If-None-Match gets a 304. Otherwise:
+      q       prefix/substring match on kepler_name or kepoi_name (prefix hits first)
+      limit   page size; the next page's cursor is returned in X-Next-Cursor
+      cursor  X-Next-Cursor from the previous page
+      fields  catalog columns to return (repeated or comma separated),
+              defaults to kepler_name and kepoi_name
+    X-Total-Count carries the number of matches across all pages.
+    """
+    catalog = get_catalog()
+    if q is None and limit is None and cursor is None and fields is None:
+        return catalog.listing.response(request)
+
+    positions = catalog.names.search(q) if q else np.arange(len(catalog.store))
+    return _page_response(positions, fields, limit, cursor)
+
+@app.get("/exoplanets/query")
+async def query_exoplanets(
+    ranges: List[str] = Query(default=[], alias="range"),
+    ra: Optional[float] = None,
+    dec: Optional[float] = Query(default=None, ge=-90, le=90),
+    radius: Optional[float] = Query(default=None, gt=0, le=180),
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = Query(default=None),
+):
+    """
+    Endpoint that returns the KOIs matching numeric range and sky cone predicates.
+
+      range   column:low:high, inclusive, either bound optional; repeat to AND
+              e.g. range=koi_teq:240:320&range=koi_prad::1.8
+      ra, dec, radius
+              cone search in degrees; all three together
+      limit, cursor, fields
+              same as /exoplanets
     """
-    return [
-        {
-            "kepler_name": record.kepler_name,
-            "kepoi_name": record.kepoi_name,
-        }
-        for record in DATA.fillna("").itertuples()
-    ]
+    try:
+        ranges = [parse_range(spec) for spec in ranges]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    queries = get_catalog().queries
+    unknown = [column for column, _, _ in ranges if column not in queries.numeric_columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Not numeric columns: {unknown}")
+
+    cone = (ra, dec, radius)
+    if any(value is None for value in cone):
+        if any(value is not None for value in cone):
+            raise HTTPException(status_code=400, detail="ra, dec and radius must be given together")
+        cone = None
+
+    positions = queries.query(ranges, cone)
+    return _page_response(positions, fields, limit, cursor)
+
+def _page_response(positions, fields, limit, cursor):
+    """One page of catalog rows at positions, projected onto fields."""
+    store = get_catalog().store
+    columns = [f for value in fields for f in value.split(",") if f] if fields else LISTING_FIELDS
+    unknown = [f for f in columns if f not in store.raw.columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {unknown}")
+
+    try:
+        page, next_cursor = paginate(positions, cursor, limit or MAX_PAGE_SIZE)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    headers = {"X-Total-Count": str(len(positions))}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+    records = store.rows(page, columns).to_dict(orient="records")
+    return JSONResponse(records, headers=headers)
 
 class ExoplanetMetrics(pydantic.BaseModel):
     kepoi_name: str # kepoi_name in the csv
@@ -54,32 +350,251 @@ class ExoplanetMetrics(pydantic.BaseModel):
     is_exoplanet: bool = False
     is_exoplanet_confidence: float = 0.0
 
-@app.get("/exoplanets/metrics")
-async def get_exoplanet_metrics(kepoi_name: List[str] = Query(default=[])):
+@app.get("/exoplanets/metrics", responses={200: {"model": List[ExoplanetMetrics]}})
+async def get_exoplanet_metrics(
+    request: Request,
+    kepoi_name: List[str] = Query(default=[]),
+    threshold: Optional[float] = None,
+    format: str = Query(default="records", pattern="^(records|columns)$"),
+):
     """
     Endpoint that reads koi.csv and returns the data as a list of JSON objects.
+
+    is_exoplanet/is_exoplanet_confidence use the catalog's 0.5 threshold
+    unless threshold (0 to 1, else 400) is given; either way the stored
+    probabilities are reused and the model isn't run. format=columns returns
+    {"columns": [ExoplanetMetrics fields], "rows": [[...], ...]} instead.
+
+    Accept: application/vnd.apache.arrow.stream (when pyarrow is installed)
+    or application/vnd.exoplanet.float32-columns, preferred over JSON by
+    q-value, selects a binary encoding instead; see
+    backend/catalog/exoplanet_metrics.py. Arrow alone without pyarrow is a 406.
+    """
+    if threshold is not None and not 0.0 <= threshold <= 1.0:
+        # also catches nan
+        raise HTTPException(status_code=400, detail=f"threshold must be between 0 and 1, got {threshold}")
+    media_type = _binary_media_type(request)
+    body = await _offload(_exoplanet_metrics, kepoi_name, threshold, media_type or format)
+    return Response(body, media_type=media_type or "application/json", headers={"Vary": "Accept"})
+
+def _binary_media_type(request: Request) -> Optional[str]:
+    """binary_media_type for the request's Accept header, 406 if nothing it accepts can be sent."""
+    try:
+        return binary_media_type(request.headers.get("accept", ""))
+    except NotAcceptable as exc:
+        raise HTTPException(status_code=406, detail=str(exc))
+
+# binary encodings by media type; anything else is a JSON format name
+_BINARY_ENCODERS = {ARROW_MEDIA_TYPE: encode_arrow, FLOAT32_MEDIA_TYPE: encode_float32}
+
+def _exoplanet_metrics(kepoi_name: List[str], threshold: Optional[float] = None, format: str = "records") -> bytes:
+    # built column-wise and encoded directly: no per-row dicts or pydantic models
+    with stage("lookup"):
+        data = get_catalog().store.get(kepoi_name, SOURCE_COLUMNS)
+    with stage("columns"):
+        columns = metric_columns(data, threshold)
+    with stage("encode"):
+        if format in _BINARY_ENCODERS:
+            return _BINARY_ENCODERS[format](columns)
+        return encode_metrics(columns, format)
+
+@app.get("/exoplanets/scene")
+async def get_exoplanet_scene(request: Request):
+    """
+    Endpoint that returns the render parameters of every KOI in one binary
+    payload: packed Float32 columns of the numeric ExoplanetMetrics fields
+    plus the kepoi_names (layout in backend/catalog/exoplanet_metrics.py),
+    pre-encoded per catalog with an ETag. Sends Arrow instead when the
+    Accept header prefers it and pyarrow is installed; an Arrow-only
+    Accept without pyarrow gets a 406.
+    """
+    catalog = get_catalog()
+    if _binary_media_type(request) == ARROW_MEDIA_TYPE:
+        body = await _offload(_exoplanet_metrics, list(catalog.store.raw["kepoi_name"]), None, ARROW_MEDIA_TYPE)
+        return Response(body, media_type=ARROW_MEDIA_TYPE, headers={"Vary": "Accept"})
+    scene = await _offload(getattr, catalog, "scene")
+    response = scene.response(request)
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+    return response
+
+@app.get("/model/threshold-sweep")
+async def get_threshold_sweep(request: Request):
+    """
+    Endpoint that returns, for every distinct catalog prob_candidate taken as
+    the threshold (highest first), how many KOIs would be flagged and the
+    precision/recall against koi_disposition (CANDIDATE = 1, CONFIRMED = 0,
+    FALSE POSITIVE unlabelled). Computed once per catalog, served with an ETag.
+    """
+    # built on first request, so keep it off the event loop
+    sweep = await _offload(getattr, get_catalog(), "threshold_sweep")
+    return sweep.response(request)
+
+@app.post("/catalog/reload")
+async def post_catalog_reload(request: Request):
+    """
+    Endpoint that ingests the catalog csv again after a new release was
+    copied over it, without a restart, and returns what changed:
+    {"added", "removed", "changed", "rescored", "rows", "seconds"}.
+    Other uvicorn workers pick the release up from disk within
+    CATALOG_CHECK_INTERVAL seconds; that needs the data directory to be
+    writable, so with a read-only one run a single worker.
+
+    Disabled (404) unless ADMIN_TOKEN is set; the request must send it as
+    X-Admin-Token.
+    """
+    token = os.environ.get("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(request.headers.get("x-admin-token", ""), token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    start = time.perf_counter()
+    # minutes at worst for a full rescore, so not on INFERENCE_POOL with its request timeout
+    diff = await asyncio.to_thread(reload_catalog)
+    return {**diff.summary(), "rows": len(get_catalog().store), "seconds": time.perf_counter() - start}
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Endpoint that returns request, model, cache and pool metrics in the
+    Prometheus text format.
+    """
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profiles/{profile_id}")
+async def get_profile_samples(profile_id: str):
+    """
+    Endpoint that returns the folded stacks of a request profiled with
+    X-Profile (see PROFILE_TOKEN), by the X-Profile-Id it was answered with.
+    """
+    folded = PROFILES.get(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired profile")
+    return PlainTextResponse(folded)
+
+@app.get("/exoplanets/{kepoi_name}/profile")
+async def get_exoplanet_profile(kepoi_name: str):
+    """
+    Endpoint that returns the planet/lifeform profile (environment,
+    habitability, lifeform size, color, communication and diet) for one KOI.
+    Served from an LRU cache; X-Cache says whether it was a HIT or MISS.
+    """
+    catalog = get_catalog()
+    # a reload evicts the profiles of changed or removed KOIs, so a hit is
+    # current and needs no record from the store
+    profile = PROFILE_CACHE.get(kepoi_name)
+    if profile is not None:
+        return JSONResponse(profile, headers={"X-Cache": "HIT"})
+
+    record = catalog.store.record(kepoi_name)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown kepoi_name: {kepoi_name}")
+    with stage("profile"):
+        profile = await _offload(build_planet_profile, record)
+    _cache_profile(catalog, kepoi_name, profile)
+    return JSONResponse(profile, headers={"X-Cache": "MISS"})
+
+@app.post("/predict")
+async def predict(
+    rows: List[Dict[str, Optional[float]]] = Body(...),
+    threshold: float = Query(default=0.5, ge=0.0, le=1.0),
+):
     """
-    data = DATA[DATA["kepoi_name"].astype(str).isin(kepoi_name)].copy()
-    predictions = [predict_row(record) for record in data.dropna(axis=1).to_dict(orient='records')]
-    for column in data.columns:
-        if data[column].dtype == 'object':
-            data[column] = data[column].fillna("")
-        else:
-            data[column] = data[column].fillna(0)
-    data = data.to_dict(orient='records')
-    data = [ExoplanetMetrics(
-        kepoi_name=record["kepoi_name"],
-        kepler_name=record["kepler_name"],
-        orbital_period=record["koi_period"],
-        planet_radius=record["koi_prad"],
-        stellar_radius=record["koi_srad"],
-        orbital_radius=record["koi_dor"] * record["koi_srad"],
-        temperature=record["koi_teq"],
-        stellar_temperature=record["koi_steff"],
-        is_exoplanet=prediction["is_candidate"],
-        is_exoplanet_confidence=prediction["confidence"],
-    ) for record, prediction in zip(data, predictions)]
-    return data
+    Endpoint that scores new candidates with the model.
+
+    The body is a JSON array of feature dicts keyed by the names in
+    model/artifacts/feature_list.json; missing or null features are filled
+    with the training means (impute_defaults.json). Returns one
+    {"is_candidate", "confidence", "prob_candidate", "threshold"} per input,
+    in order. The threshold is applied to the returned probabilities, so
+    requests with different thresholds still share a model call.
+    """
+    if len(rows) > MAX_PREDICT_ROWS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_PREDICT_ROWS} rows per request; use /predict/csv"
+        )
+    features = set(feature_names())
+    unknown = sorted({key for row in rows for key in row if key not in features})
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown features: {unknown}")
+    # JSON Infinity/NaN parse as floats, but the model can't score them
+    non_finite = sorted({key for row in rows for key, value in row.items() if value is not None and not math.isfinite(value)})
+    if non_finite:
+        raise HTTPException(status_code=400, detail=f"Non-finite values for features: {non_finite}")
+
+    rows = [{key: value for key, value in row.items() if value is not None} for row in rows]
+    # queueing in the coalescer plus the shared model call
+    with _pool_errors(), stage("predict"):
+        results = await PREDICTOR.predict(rows)
+    is_candidate, confidence = apply_threshold([result["prob_candidate"] for result in results], threshold)
+    for result, decision, conf in zip(results, is_candidate.tolist(), confidence.tolist()):
+        result.update(is_candidate=decision, confidence=conf, threshold=threshold)
+    return results
+
+@app.post("/predict/csv")
+async def predict_csv(
+    request: Request,
+    format: str = Query(default="csv", pattern="^(csv|ndjson)$"),
+    threshold: float = Query(default=0.5, ge=0.0, le=1.0),
+):
+    """
+    Endpoint that scores a streamed CSV upload (e.g. a Kepler archive export,
+    '#' comment lines allowed) chunk by chunk.
+
+    Columns named like model features are used, others ignored. The response
+    is streamed as CSV (default) or NDJSON with one record per input row:
+    row (0-based), kepid/kepoi_name/kepler_name when present, is_candidate,
+    confidence, prob_candidate (decided at threshold, default 0.5). If a
+    chunk can't be scored (malformed rows, non-finite values, overload)
+    the stream ends with {"error": ...} in NDJSON or a "# error: ..." line
+    in CSV.
+    """
+    chunks = request.stream()
+    header, buffer = await csv_stream.read_header(chunks)
+    if header is None:
+        raise HTTPException(status_code=400, detail="Empty CSV upload")
+    try:
+        columns = csv_stream.parse_header(header)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Unreadable CSV header: {exc}")
+    if not set(columns) & set(feature_names()):
+        raise HTTPException(status_code=400, detail="CSV has no model feature columns")
+
+    predict = functools.partial(_scored, endpoint="predict_csv", threshold=threshold)
+
+    async def score(body, first_row):
+        # the upload was already accepted, so wait a while for a slot instead of failing at once
+        return await INFERENCE_POOL.run(
+            csv_stream.score_chunk, header, body, first_row, predict, format, wait=CSV_SLOT_WAIT
+        )
+
+    async def results():
+        nonlocal buffer
+        rows = 0
+        # the 200 is already sent, so a failed chunk ends the stream with an error record
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                if len(buffer) < CSV_CHUNK_BYTES:
+                    continue
+                body, buffer = csv_stream.split_complete(buffer)
+                if body:
+                    text, count = await score(body, rows)
+                    rows += count
+                    yield text
+            if buffer.strip():
+                text, count = await score(buffer if buffer.endswith(b"\n") else buffer + b"\n", rows)
+                yield text
+        except PoolFull:
+            yield csv_stream.error_record(f"Too many requests in flight; scored {rows} rows", format)
+        except asyncio.TimeoutError:
+            yield csv_stream.error_record(f"Scoring timed out; scored {rows} rows", format)
+        except Exception as exc:
+            logger.warning("/predict/csv failed after %d rows: %s", rows, exc)
+            yield csv_stream.error_record(f"Could not score rows from {rows}: {exc}", format)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return DuplexStreamingResponse(results(), media_type=media_type)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
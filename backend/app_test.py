@@ -0,0 +1,436 @@
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import app as app_module
+from backend.catalog import exoplanet_metrics
+from backend.catalog.exoplanet_metrics import ARROW_MEDIA_TYPE, FLOAT32_MEDIA_TYPE
+from backend.catalog.snapshot import CatalogSnapshot
+from backend.profiles import iter_profiles
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+needs_model = pytest.mark.skipif(
+    not (REPO_ROOT / "backend" / "model" / "artifacts" / "rf_model.joblib").exists(),
+    reason="rf_model.joblib is not checked in",
+)
+
+GAME_CSV = REPO_ROOT / "backend" / "game-aspect" / "cumulative_2025.10.04_13.06.32.csv"
+
+# importing the app must not load data or heavy ML libraries; the budget
+# is generous so a slow CI box doesn't flake, a regression to loading the
+# catalog at import (several seconds) still fails
+IMPORT_BUDGET_SECONDS = 2.0
+
+
+def test_import_is_cheap():
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import backend.app as app\n"
+        "print(time.perf_counter() - start)\n"
+        "print(app._CATALOG is None)\n"
+        "print('sklearn' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    seconds, catalog_unloaded, sklearn_imported = result.stdout.split()
+
+    assert catalog_unloaded == "True"
+    assert sklearn_imported == "False"
+    assert float(seconds) < IMPORT_BUDGET_SECONDS
+
+
+def test_lifespan_loads_model_and_catalog_once(monkeypatch):
+    loads = []
+
+    class FakeSnapshot:
+        release = None
+
+        def __init__(self, csv_path):
+            loads.append(csv_path)
+
+    monkeypatch.setattr(app_module, "CatalogSnapshot", FakeSnapshot)
+    monkeypatch.setattr(app_module, "load_model", lambda: loads.append("model"))
+    monkeypatch.setattr(app_module, "_CATALOG", None)
+
+    with TestClient(app_module.app):
+        assert loads == ["model", app_module.CSV_FILE_NAME]
+        catalog = app_module.get_catalog()
+
+    assert isinstance(catalog, FakeSnapshot)
+    assert app_module.get_catalog() is catalog
+    assert len(loads) == 2
+
+
+@needs_model
+def test_non_finite_features_are_rejected_without_failing_the_batch():
+    async def main():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                client.post("/predict", content=b'[{"koi_period": Infinity}]', headers={"Content-Type": "application/json"}),
+                client.post("/predict", json=[{"koi_period": 3.5}]),
+            )
+
+    rejected, scored = asyncio.run(main())
+
+    assert rejected.status_code == 400
+    assert "koi_period" in rejected.json()["detail"]
+    assert scored.status_code == 200
+    assert 0.0 <= scored.json()[0]["prob_candidate"] <= 1.0
+
+
+@needs_model
+def test_rows_scored_excludes_prediction_cache_hits():
+    from backend.model.runtime.predict_one import PREDICTION_CACHE
+
+    PREDICTION_CACHE.clear()
+    client = TestClient(app_module.app)
+    key = ("predict", "flat")
+
+    def scored():
+        return app_module.ROWS_SCORED._values.get(key, 0.0)
+
+    before = scored()
+    assert client.post("/predict", json=[{"koi_period": 7.25}]).status_code == 200
+    assert scored() == before + 1
+    assert client.post("/predict", json=[{"koi_period": 7.25}]).status_code == 200
+    assert scored() == before + 1
+
+
+@needs_model
+def test_csv_stream_that_fails_ends_with_an_error_record():
+    upload = b"kepoi_name,koi_period\nK1,3.5\nK2,inf\n"
+
+    response = TestClient(app_module.app).post("/predict/csv?format=ndjson", content=upload)
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines and "error" in lines[-1]
+
+
+def test_pool_totals_are_exported_as_counters():
+    lines = TestClient(app_module.app).get("/metrics").text.splitlines()
+
+    assert "# TYPE inference_pool_jobs gauge" in lines
+    assert "# TYPE inference_pool_jobs_total counter" in lines
+    assert {line.split()[0] for line in lines if line.startswith("inference_pool_jobs{")} == {'inference_pool_jobs{state="outstanding"}'}
+
+
+def test_profile_built_across_a_reload_is_not_cached(monkeypatch):
+    class FakeSnapshot:
+        release = None
+
+        class store:
+            @staticmethod
+            def record(kepoi_name):
+                return {"kepoi_name": kepoi_name}
+
+    old, new = FakeSnapshot(), FakeSnapshot()
+    diff = app_module.ReleaseDiff(added=[], removed=[], changed=["K1"], rescore=[])
+    monkeypatch.setattr(app_module, "_CATALOG", old)
+    monkeypatch.setattr(app_module, "ingest_release", lambda previous, csv_path: (new, diff))
+    monkeypatch.setattr(app_module, "PROFILE_CACHE", app_module.LRUCache(maxsize=8))
+
+    def build_during_reload(record):
+        app_module.reload_catalog()
+        return {"built_from": "old"}
+
+    monkeypatch.setattr(app_module, "build_planet_profile", build_during_reload)
+    response = TestClient(app_module.app).get("/exoplanets/K1/profile")
+
+    assert response.json() == {"built_from": "old"}
+    assert app_module.get_catalog() is new
+    assert app_module.PROFILE_CACHE.get("K1") is None
+
+
+def test_workers_follow_a_release_ingested_elsewhere(monkeypatch):
+    class FakeSnapshot:
+        def __init__(self, release):
+            self.release = release
+
+    old, new = FakeSnapshot("r1"), FakeSnapshot("r2")
+    on_disk = ["r1"]
+    monkeypatch.setattr(app_module, "_CATALOG", old)
+    monkeypatch.setattr(app_module, "CATALOG_CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(app_module, "cached_release", lambda csv_path: on_disk[0])
+    monkeypatch.setattr(app_module, "CatalogSnapshot", lambda csv_path: new)
+    monkeypatch.setattr(app_module, "PROFILE_CACHE", app_module.LRUCache(maxsize=8))
+    app_module.PROFILE_CACHE.put("K1", {"built_from": "old"})
+
+    assert app_module.get_catalog() is old
+    assert not app_module._released_elsewhere(old)
+
+    # another worker ingested r2: this one keeps serving old until the rebuild is done
+    on_disk[0] = "r2"
+    assert app_module._released_elsewhere(old)
+    app_module._follow_release()
+
+    assert app_module.get_catalog() is new
+    assert app_module.PROFILE_CACHE.get("K1") is None
+
+
+@pytest.fixture
+def small_catalog(tmp_path, monkeypatch):
+    """A CatalogSnapshot of a few real KOIs with made-up predictions, served by the app."""
+    data = pd.read_csv(GAME_CSV, comment="#").head(20)
+    # the archive export lacks koi_dor, which the snapshot derives orbital_radius from
+    data = data.assign(koi_dor=np.linspace(5.0, 50.0, len(data)))
+    csv_path = tmp_path / "koi.csv"
+    data.to_csv(csv_path, index=False)
+    prob = np.linspace(0.0, 1.0, len(data))
+    predictions = pd.DataFrame(
+        {"is_candidate": prob >= 0.5, "confidence": np.maximum(prob, 1 - prob), "prob_candidate": prob},
+        index=data["kepoi_name"].astype(str),
+    )
+    snapshot = CatalogSnapshot(csv_path, data=data.copy(), predictions=predictions)
+    monkeypatch.setattr(app_module, "_CATALOG", snapshot)
+    monkeypatch.setattr(app_module, "PROFILE_CACHE", app_module.LRUCache(maxsize=8))
+    return data
+
+
+def test_profile_endpoint_serves_the_bulk_profile_and_caches_it(small_catalog):
+    client = TestClient(app_module.app)
+    position = 7
+    kepoi_name = small_catalog["kepoi_name"].iloc[position]
+    expected = list(iter_profiles(small_catalog))[position]
+
+    first = client.get(f"/exoplanets/{kepoi_name}/profile")
+    second = client.get(f"/exoplanets/{kepoi_name}/profile")
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert first.json() == json.loads(json.dumps(expected))
+    assert second.json() == first.json()
+
+
+def test_profile_cache_hit_skips_the_store(small_catalog, monkeypatch):
+    client = TestClient(app_module.app)
+    kepoi_name = small_catalog["kepoi_name"].iloc[3]
+    assert client.get(f"/exoplanets/{kepoi_name}/profile").headers["X-Cache"] == "MISS"
+
+    def record(name):
+        raise AssertionError("a cached profile must not read the store")
+
+    monkeypatch.setattr(app_module._CATALOG.store, "record", record)
+    response = client.get(f"/exoplanets/{kepoi_name}/profile")
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "HIT"
+
+
+def test_profile_of_unknown_kepoi_name_is_404(small_catalog):
+    response = TestClient(app_module.app).get("/exoplanets/K99999.99/profile")
+
+    assert response.status_code == 404
+    assert "K99999.99" in response.json()["detail"]
+    assert app_module.PROFILE_CACHE.get("K99999.99") is None
+
+
+def test_query_matches_ranges(small_catalog):
+    response = TestClient(app_module.app).get("/exoplanets/query", params={"range": "koi_teq:800:", "limit": 1000})
+
+    assert response.status_code == 200
+    expected = small_catalog.loc[small_catalog["koi_teq"] >= 800, "kepoi_name"].tolist()
+    assert [row["kepoi_name"] for row in response.json()] == expected
+    assert response.headers["X-Total-Count"] == str(len(expected))
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({"range": "nope:1:2"}, "Not numeric columns"),
+    ({"range": "kepler_name:1:2"}, "Not numeric columns"),
+    ({"range": "koi_teq:hot:"}, "must be numbers"),
+    ({"range": "koi_teq:nan:"}, "must be finite"),
+    ({"range": "koi_teq:1"}, "column:low:high"),
+    ({"radius": 1.0}, "ra, dec and radius"),
+    ({"ra": 290.0, "radius": 1.0}, "ra, dec and radius"),
+])
+def test_query_rejects_bad_predicates(small_catalog, params, detail):
+    response = TestClient(app_module.app).get("/exoplanets/query", params=params)
+
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+
+
+def test_listing_is_served_with_an_etag_and_304(small_catalog):
+    client = TestClient(app_module.app)
+
+    response = client.get("/exoplanets", headers={"Accept-Encoding": "identity"})
+    etag = response.headers["ETag"]
+    not_modified = client.get("/exoplanets", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert response.json() == [
+        {"kepler_name": "" if pd.isna(row.kepler_name) else row.kepler_name, "kepoi_name": row.kepoi_name}
+        for row in small_catalog.itertuples()
+    ]
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+def test_listing_is_gzipped_when_accepted(small_catalog):
+    client = TestClient(app_module.app)
+
+    plain = client.get("/exoplanets", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/exoplanets", headers={"Accept-Encoding": "gzip"})
+    refused = client.get("/exoplanets", headers={"Accept-Encoding": "gzip;q=0"})
+
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] != plain.headers["ETag"]
+    assert gzipped.json() == plain.json()
+    assert "Content-Encoding" not in refused.headers
+    assert "Accept-Encoding" in gzipped.headers["Vary"]
+
+
+def _names_matching(catalog, query):
+    # documented order: names starting with the query first, then other substring matches
+    names = [
+        [str(name).lower() for name in row if isinstance(name, str) and name]
+        for row in zip(catalog["kepoi_name"], catalog["kepler_name"])
+    ]
+    query = query.lower()
+    prefix = [i for i, row in enumerate(names) if any(name.startswith(query) for name in row)]
+    substring = [i for i, row in enumerate(names) if i not in prefix and any(query in name for name in row)]
+    return catalog["kepoi_name"].iloc[prefix + substring].tolist()
+
+
+@pytest.mark.parametrize("query", ["K0075", "228", "kepler-2", "2.0"])
+def test_listing_search(small_catalog, query):
+    response = TestClient(app_module.app).get("/exoplanets", params={"q": query})
+
+    expected = _names_matching(small_catalog, query)
+    assert expected
+    assert [row["kepoi_name"] for row in response.json()] == expected
+    assert response.headers["X-Total-Count"] == str(len(expected))
+
+
+def test_listing_pages_round_trip(small_catalog):
+    client = TestClient(app_module.app)
+    names, cursor, pages = [], None, 0
+
+    while True:
+        params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/exoplanets", params=params)
+        assert response.status_code == 200
+        names += [row["kepoi_name"] for row in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert names == small_catalog["kepoi_name"].tolist()
+    assert client.get("/exoplanets", params={"limit": 7, "cursor": "oops"}).status_code == 400
+
+
+def test_listing_projects_fields(small_catalog):
+    client = TestClient(app_module.app)
+
+    comma = client.get("/exoplanets", params={"limit": 2, "fields": "kepoi_name,koi_teq"})
+    repeated = client.get("/exoplanets", params=[("limit", 2), ("fields", "kepoi_name"), ("fields", "koi_teq")])
+    unknown = client.get("/exoplanets", params={"fields": "kepoi_name,nope"})
+
+    expected = small_catalog[["kepoi_name", "koi_teq"]].head(2).to_dict(orient="records")
+    assert comma.json() == expected
+    assert repeated.json() == expected
+    assert unknown.status_code == 400 and "nope" in unknown.json()["detail"]
+
+
+def test_metrics_threshold_redecides_stored_probabilities(small_catalog):
+    client = TestClient(app_module.app)
+    low, high = small_catalog["kepoi_name"].iloc[7], small_catalog["kepoi_name"].iloc[12]
+    prob = {low: 7 / 19, high: 12 / 19}  # the fixture's linspace(0, 1, 20)
+
+    def decide(threshold=None):
+        params = {"kepoi_name": [low, high], **({} if threshold is None else {"threshold": threshold})}
+        rows = client.get("/exoplanets/metrics", params=params).json()
+        return {row["kepoi_name"]: (row["is_exoplanet"], row["is_exoplanet_confidence"]) for row in rows}
+
+    assert decide() == {low: (False, pytest.approx(1 - prob[low])), high: (True, pytest.approx(prob[high]))}
+    assert decide(0.3) == {low: (True, pytest.approx(prob[low])), high: (True, pytest.approx(prob[high]))}
+    assert decide(0.7) == {low: (False, pytest.approx(1 - prob[low])), high: (False, pytest.approx(1 - prob[high]))}
+
+
+@pytest.mark.parametrize("threshold", ["-0.1", "1.5", "nan"])
+def test_metrics_rejects_out_of_range_threshold(small_catalog, threshold):
+    response = TestClient(app_module.app).get("/exoplanets/metrics", params={"threshold": threshold})
+
+    assert response.status_code == 400
+    assert "threshold" in response.json()["detail"]
+
+
+def test_threshold_sweep_shape(small_catalog):
+    client = TestClient(app_module.app)
+
+    response = client.get("/model/threshold-sweep")
+    sweep = response.json()
+
+    assert response.status_code == 200
+    assert set(sweep) == {"thresholds", "count", "precision", "recall", "total", "labelled", "positives"}
+    assert sweep["total"] == len(small_catalog)
+    n = len(sweep["thresholds"])
+    assert n == len(sweep["count"]) == len(sweep["precision"]) == len(sweep["recall"]) == len(small_catalog)
+    assert sweep["thresholds"] == sorted(sweep["thresholds"], reverse=True)
+    assert sweep["count"] == list(range(1, n + 1))
+    assert client.get("/model/threshold-sweep", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def _float32_header(body):
+    length = int.from_bytes(body[:4], "little")
+    return json.loads(body[4:4 + length])
+
+
+def test_scene_is_served_as_float32_columns(small_catalog):
+    client = TestClient(app_module.app)
+
+    response = client.get("/exoplanets/scene")
+    cached = client.get("/exoplanets/scene", headers={"If-None-Match": response.headers["ETag"]})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == FLOAT32_MEDIA_TYPE
+    assert _float32_header(response.content)["rows"] == len(small_catalog)
+    assert cached.status_code == 304
+
+
+def test_arrow_without_pyarrow_falls_back_or_is_406(small_catalog, monkeypatch):
+    monkeypatch.setattr(exoplanet_metrics, "pyarrow", None)
+    client = TestClient(app_module.app)
+
+    fallback = client.get("/exoplanets/scene", headers={"Accept": f"{ARROW_MEDIA_TYPE}, {FLOAT32_MEDIA_TYPE};q=0.5"})
+    assert fallback.status_code == 200
+    assert fallback.headers["Content-Type"] == FLOAT32_MEDIA_TYPE
+
+    for path in ("/exoplanets/scene", "/exoplanets/metrics"):
+        response = client.get(path, headers={"Accept": ARROW_MEDIA_TYPE})
+        assert response.status_code == 406
+        assert "pyarrow" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("accept, media_type", [
+    (f"application/json, {FLOAT32_MEDIA_TYPE};q=0.1", "application/json"),
+    (f"{FLOAT32_MEDIA_TYPE};q=0.9, application/json", "application/json"),
+    (f"{FLOAT32_MEDIA_TYPE}, application/json;q=0.5", FLOAT32_MEDIA_TYPE),
+    (f"{FLOAT32_MEDIA_TYPE}, */*", FLOAT32_MEDIA_TYPE),
+])
+def test_metrics_accept_honours_q_values(small_catalog, accept, media_type):
+    names = small_catalog["kepoi_name"].head(3).tolist()
+    response = TestClient(app_module.app).get("/exoplanets/metrics", params={"kepoi_name": names}, headers={"Accept": accept})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == media_type
+    if media_type == FLOAT32_MEDIA_TYPE:
+        assert _float32_header(response.content)["rows"] == 3
+    else:
+        assert [row["kepoi_name"] for row in response.json()] == names
@@ -0,0 +1,299 @@
+"""
+Benchmarks for the backend hot paths.
+
+    python -m backend.bench                      # run everything, write bench-results/<commit>.json
+    python -m backend.bench -k predict_batch     # only names containing predict_batch
+    python -m backend.bench --compare bench-results/<older>.json
+
+Each benchmark is a setup function registered with @benchmark that returns
+the callable to time (setup cost is not measured). Like timeit/asv, the
+callable is run in loops long enough to beat timer resolution and the
+loops are repeated; results keep the median and min seconds per call,
+plus the commit they were measured at, so two result files can be
+compared and slowdowns beyond a tolerance reported.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = Path(__file__).resolve().parent
+CSV_PATH = BACKEND_DIR / "data" / "koi.csv"
+RESULTS_DIR = BACKEND_DIR.parent / "bench-results"
+MODEL_PATH = BACKEND_DIR / "model" / "artifacts" / "rf_model.joblib"
+
+# name -> (setup, needs the trained model)
+BENCHMARKS: Dict[str, Tuple[Callable[[], Callable[[], Any]], bool]] = {}
+
+class Skip(Exception):
+    """Raised by a setup function when its benchmark can't run here."""
+
+def benchmark(name: str, *, needs_model: bool = False):
+    def register(setup: Callable[[], Callable[[], Any]]):
+        BENCHMARKS[name] = (setup, needs_model)
+        return setup
+    return register
+
+def measure(fn: Callable[[], Any], *, repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    """
+    Time fn(): pick loops so one sample takes at least min_time (starting at
+    1, x10 each step), then take `repeat` samples.
+
+    Returns:
+      {"median_s", "min_s", "stdev_s", "loops", "repeat"} in seconds per call
+    """
+    fn()  # warm-up: lazy imports, caches, first-touch of mapped pages
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 10 ** 6:
+            break
+        loops *= 10
+
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "loops": loops,
+        "repeat": len(samples),
+    }
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment() -> Dict[str, Any]:
+    import numpy
+    import pandas
+
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp_utc": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+    }
+
+def run(
+    names: Optional[List[str]] = None,
+    *,
+    repeat: int = 5,
+    min_time: float = 0.05,
+    log: Callable[[str], None] = lambda line: None,
+) -> Dict[str, Any]:
+    """
+    Run the named benchmarks (default: all registered) and return the
+    results document: environment() plus {"benchmarks": {name: measure(...)}}.
+    Skipped benchmarks are listed under "skipped" with the reason.
+    """
+    results: Dict[str, Any] = {}
+    skipped: Dict[str, str] = {}
+    for name in names if names is not None else list(BENCHMARKS):
+        setup, needs_model = BENCHMARKS[name]
+        try:
+            if needs_model and not MODEL_PATH.exists():
+                raise Skip("rf_model.joblib is not checked in")
+            fn = setup()
+        except Skip as exc:
+            skipped[name] = str(exc)
+            log(f"{name:<48} skipped: {exc}")
+            continue
+        results[name] = measure(fn, repeat=repeat, min_time=min_time)
+        log(f"{name:<48} {results[name]['median_s'] * 1e3:10.3f} ms")
+    return {**environment(), "benchmarks": results, "skipped": skipped}
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], tolerance: float = 1.2) -> List[Dict[str, Any]]:
+    """
+    Benchmarks present in both result documents, with ratio = new / old
+    median. "regression" is set where the ratio exceeds tolerance.
+    """
+    rows = []
+    for name, result in new["benchmarks"].items():
+        before = old["benchmarks"].get(name)
+        if before is None:
+            continue
+        ratio = result["median_s"] / before["median_s"] if before["median_s"] else float("inf")
+        rows.append({
+            "name": name,
+            "old_s": before["median_s"],
+            "new_s": result["median_s"],
+            "ratio": ratio,
+            "regression": ratio > tolerance,
+        })
+    return rows
+
+
+# --- catalog ---
+
+@benchmark("catalog.read_csv")
+def _read_csv():
+    import pandas as pd
+    return lambda: pd.read_csv(CSV_PATH, comment="#")
+
+@benchmark("catalog.load_columnar")
+def _load_columnar():
+    from backend.catalog.columnar import load_catalog
+    load_catalog(CSV_PATH)  # build the columnar copy outside the timing
+    return lambda: load_catalog(CSV_PATH)
+
+@benchmark("catalog.snapshot", needs_model=True)
+def _snapshot():
+    from backend.catalog.snapshot import CatalogSnapshot
+    CatalogSnapshot(CSV_PATH)  # predictions are scored once and cached on disk
+    return lambda: CatalogSnapshot(CSV_PATH)
+
+# --- model ---
+
+def _catalog_rows(n: int):
+    import pandas as pd
+    data = pd.read_csv(CSV_PATH, comment="#")
+    return data.sample(n=n, replace=n > len(data), random_state=0).reset_index(drop=True)
+
+@benchmark("model.preprocess", needs_model=True)
+def _preprocess():
+    from backend.model.runtime.predict_one import _load_artifacts, DEFAULT_ARTIFACTS_DIR
+    from backend.model.runtime.preprocessing import preprocess
+    scaler, mean_values = _load_artifacts(DEFAULT_ARTIFACTS_DIR)
+    row = _catalog_rows(1).iloc[0].dropna().to_dict()
+    return lambda: preprocess(user_input=row, mean_values=mean_values, scaler=scaler)
+
+def _register_predict_row(engine: str) -> None:
+    @benchmark(f"model.predict_row[{engine}]", needs_model=True)
+    def setup():
+        from backend.model.runtime.predict_one import predict_row
+        row = _catalog_rows(1).iloc[0].dropna().to_dict()
+        # uncached: this measures the model, not PREDICTION_CACHE
+        return lambda: predict_row(row, engine=engine, use_cache=False)
+
+def _register_predict_batch(rows: int, engine: Optional[str]) -> None:
+    # engine None: whatever predict_batch picks by default
+    @benchmark(f"model.predict_batch[{rows},{engine or 'default'}]", needs_model=True)
+    def setup():
+        from backend.model.runtime.predict_one import predict_batch
+        frame = _catalog_rows(rows)
+        kwargs = {} if engine is None else {"engine": engine}
+        return lambda: predict_batch(frame, **kwargs)
+
+for _engine in ("sklearn", "flat"):
+    _register_predict_row(_engine)
+for _engine in ("sklearn", "flat", None):
+    for _rows in (1, 100, 10000):
+        _register_predict_batch(_rows, _engine)
+
+# --- API, in process through httpx's ASGI transport ---
+
+def _api_get(path: str, params=None):
+    import httpx
+    from backend.app import app, get_catalog
+    from backend.model.runtime.predict_one import load_model
+
+    # ASGITransport doesn't run the lifespan hook, so load what it would
+    load_model()
+    get_catalog()
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+    def get():
+        response = loop.run_until_complete(client.get(path, params=params))
+        response.raise_for_status()
+        return response.content
+    return get
+
+@benchmark("api.exoplanets", needs_model=True)
+def _api_listing():
+    return _api_get("/exoplanets")
+
+@benchmark("api.exoplanets_metrics[100]", needs_model=True)
+def _api_metrics_100():
+    names = _catalog_rows(100)["kepoi_name"].tolist()
+    return _api_get("/exoplanets/metrics", {"kepoi_name": names})
+
+@benchmark("api.exoplanets_metrics[2000]", needs_model=True)
+def _api_metrics_2000():
+    # about the most names that fit in one query string (httpx caps it at 64 KiB)
+    names = _catalog_rows(2000)["kepoi_name"].tolist()
+    return _api_get("/exoplanets/metrics", {"kepoi_name": names})
+
+# --- game aspect ---
+
+@benchmark("game.planet_lifeform_format")
+def _format_pipeline():
+    from backend.profiles import add_game_aspect_to_path
+    add_game_aspect_to_path()
+    from formatter import format_to_json
+    from game_objects.determine_lifeform import Lifeform
+    from game_objects.determine_planet_attributes import Planet
+
+    row = _catalog_rows(1).iloc[0].to_dict()
+    output = Path(tempfile.mkdtemp(prefix="bench-")) / "planet_profile.json"
+
+    def pipeline():
+        planet = Planet(row)
+        lifeform = Lifeform(row, 0, str((0, 0, 0)), "None", "None", planet.get_environment())
+        return format_to_json(planet, lifeform, output)
+    return pipeline
+
+@benchmark("game.iter_profiles[catalog]")
+def _iter_profiles():
+    import pandas as pd
+    from backend.profiles import iter_profiles
+    data = pd.read_csv(CSV_PATH, comment="#")
+    return lambda: sum(1 for _ in iter_profiles(data))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m backend.bench", description="Benchmark the backend hot paths.")
+    parser.add_argument("-k", dest="pattern", help="only benchmarks whose name contains this")
+    parser.add_argument("-o", "--output", type=Path, help="results file (default: bench-results/<commit>.json)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per sample (default 0.05)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.2, help="new/old median ratio counted as a regression")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    options = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not options.pattern or options.pattern in name]
+    if options.list:
+        print("\n".join(names))
+        sys.exit(0)
+
+    document = run(names, repeat=options.repeat, min_time=options.min_time, log=print)
+    output = options.output or RESULTS_DIR / f"{(document['commit'] or 'unknown')[:12]}{'-dirty' if document['dirty'] else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"results -> {output}")
+
+    if options.compare:
+        rows = compare(json.loads(options.compare.read_text()), document, options.tolerance)
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<48} {row['old_s'] * 1e3:10.3f} -> {row['new_s'] * 1e3:10.3f} ms  x{row['ratio']:.2f}{flag}")
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
@@ -0,0 +1,37 @@
+from backend import bench
+
+
+def test_run_measures_and_records_skips(monkeypatch):
+    calls = []
+
+    def setup_skipped():
+        raise bench.Skip("not here")
+
+    monkeypatch.setitem(bench.BENCHMARKS, "toy.append", (lambda: lambda: calls.append(1), False))
+    monkeypatch.setitem(bench.BENCHMARKS, "toy.skipped", (setup_skipped, False))
+
+    document = bench.run(["toy.append", "toy.skipped"], repeat=3, min_time=0.001)
+
+    result = document["benchmarks"]["toy.append"]
+    assert result["repeat"] == 3
+    assert 0 < result["min_s"] <= result["median_s"]
+    # warm-up + calibration + 2 more samples of `loops` calls
+    assert len(calls) >= 1 + 3 * result["loops"]
+    assert document["skipped"] == {"toy.skipped": "not here"}
+    assert {"commit", "python", "platform"} <= document.keys()
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    old = {"benchmarks": {"a": {"median_s": 1.0}, "b": {"median_s": 1.0}, "gone": {"median_s": 1.0}}}
+    new = {"benchmarks": {"a": {"median_s": 1.1}, "b": {"median_s": 1.5}, "added": {"median_s": 1.0}}}
+
+    rows = {row["name"]: row for row in bench.compare(old, new, tolerance=1.2)}
+
+    assert set(rows) == {"a", "b"}
+    assert not rows["a"]["regression"]
+    assert rows["b"]["regression"] and rows["b"]["ratio"] == 1.5
+
+
+def test_benchmarks_are_grouped_by_area():
+    assert all(name.split(".")[0] in {"catalog", "model", "api", "game"} for name in bench.BENCHMARKS)
+    assert "model.predict_batch[10000,flat]" in bench.BENCHMARKS
@@ -0,0 +1,36 @@
+from backend.cache import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_or_compute_counts_hits_and_misses():
+    cache = LRUCache(maxsize=4)
+    calls = []
+
+    for _ in range(3):
+        value, hit = cache.get_or_compute("k", lambda: calls.append(1) or 42)
+
+    assert value == 42 and hit is True
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    now = [0.0]
+    cache = LRUCache(maxsize=4, ttl=10, clock=lambda: now[0])
+    cache.put("k", 1)
+
+    now[0] = 9.9
+    assert cache.get("k") == 1
+    now[0] = 10.0
+    assert cache.get("k") is None and "k" not in cache
+    assert cache.stats()["expirations"] == 1 and cache.stats()["misses"] == 1
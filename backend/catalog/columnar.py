@@ -0,0 +1,177 @@
+"""
+Columnar binary copy of the KOI catalog.
+
+``build_columnar`` converts the archive CSV into one ``.npy`` file per column
+plus a manifest; ``load_columnar`` memory-maps the numeric columns read-only,
+so every worker process shares the same page-cache pages and startup skips
+the CSV parse. Text columns are small and are loaded into object arrays.
+
+The copy lives next to the CSV (``koi.csv`` -> ``koi.columns/``) and is
+rebuilt whenever the CSV changes:
+
+    python -m backend.catalog.columnar /path/to/koi.csv
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from backend.catalog.files import file_sha256, file_stamp, same_file
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+def columnar_path(csv_path: Union[str, Path]) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(f"{csv_path.stem}.columns")
+
+def _read_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        manifest = json.loads((path / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+def _write_columns(data: pd.DataFrame, out_dir: Path) -> list:
+    columns = []
+    for number, name in enumerate(data.columns):
+        series = data[name]
+        entry = {"name": name, "file": f"{number:03d}.npy", "kind": "numeric", "na_file": None}
+        if series.dtype == "object":
+            # fixed-width unicode keeps the file mmap-able and pickle-free
+            missing = series.isna().to_numpy()
+            values = series.where(~missing, "").astype(str).to_numpy(dtype=str)
+            entry["kind"] = "text"
+            if missing.any():
+                entry["na_file"] = f"{number:03d}.na.npy"
+                np.save(out_dir / entry["na_file"], missing)
+        else:
+            values = series.to_numpy()
+        np.save(out_dir / entry["file"], values)
+        columns.append(entry)
+    return columns
+
+def build_columnar(
+    csv_path: Union[str, Path],
+    out_dir: Optional[Union[str, Path]] = None,
+    *,
+    data: Optional[pd.DataFrame] = None,
+) -> Path:
+    """
+    Write the columnar copy of csv_path and return its directory.
+
+    data is the already-parsed CSV, if the caller has it. The copy is
+    written to a temporary sibling directory and renamed into place, so a
+    concurrent reader sees either the old copy or the new one.
+    """
+    csv_path = Path(csv_path).resolve()
+    out_dir = Path(out_dir) if out_dir is not None else columnar_path(csv_path)
+    if data is None:
+        data = pd.read_csv(csv_path, comment="#")
+
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{out_dir.name}.", dir=out_dir.parent))
+    try:
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "rows": len(data),
+            "columns": _write_columns(data, staging),
+            "source": {"name": csv_path.name, **file_stamp(csv_path), "sha256": file_sha256(csv_path)},
+        }
+        (staging / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+        if out_dir.exists():
+            retired = Path(tempfile.mkdtemp(prefix=f".{out_dir.name}.old.", dir=out_dir.parent))
+            os.replace(out_dir, retired / out_dir.name)
+            os.replace(staging, out_dir)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.replace(staging, out_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return out_dir
+
+def load_columnar(path: Union[str, Path], *, mmap: bool = True) -> pd.DataFrame:
+    """
+    Load a columnar copy written by build_columnar.
+
+    Numeric columns are read-only memory maps (mmap=False reads them into
+    memory instead); the DataFrame is built without copying them.
+    """
+    path = Path(path)
+    manifest = _read_manifest(path)
+    if manifest is None:
+        raise ValueError(f"Not a columnar catalog: {path}")
+
+    columns = {}
+    for entry in manifest["columns"]:
+        if entry["kind"] == "text":
+            values = np.load(path / entry["file"]).astype(object)
+            if entry["na_file"]:
+                values[np.load(path / entry["na_file"])] = np.nan
+        else:
+            values = np.load(path / entry["file"], mmap_mode="r" if mmap else None)
+            # plain ndarray view over the map, so pandas treats it like any column
+            values = values.view(np.ndarray)
+        columns[entry["name"]] = values
+    return pd.DataFrame(columns, copy=False)
+
+def load_catalog(
+    csv_path: Union[str, Path],
+    *,
+    cache_dir: Optional[Union[str, Path]] = None,
+    mmap: bool = True,
+) -> pd.DataFrame:
+    """
+    The catalog in csv_path, read from its columnar copy when that is still
+    current and parsed from the CSV (refreshing the copy) otherwise.
+    """
+    csv_path = Path(csv_path).resolve()
+    path = Path(cache_dir) / f"{csv_path.stem}.columns" if cache_dir is not None else columnar_path(csv_path)
+
+    manifest = _read_manifest(path)
+    if manifest is not None and same_file(csv_path, manifest.get("source")):
+        return load_columnar(path, mmap=mmap)
+
+    data = pd.read_csv(csv_path, comment="#")
+    try:
+        build_columnar(csv_path, path, data=data)
+    except OSError as exc:
+        # Read-only deployments still work, they just parse the CSV on every start
+        logger.warning("Could not write columnar catalog %s: %s", path, exc)
+        return data
+    # serve from the maps so this process shares pages with the other workers
+    return load_columnar(path, mmap=mmap)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m backend.catalog.columnar /path/to/koi.csv [out_dir]")
+        sys.exit(64)
+
+    csv_path = Path(sys.argv[1]).expanduser().resolve()
+    out_dir = build_columnar(csv_path, sys.argv[2] if len(sys.argv) > 2 else None)
+
+    start = time.perf_counter()
+    pd.read_csv(csv_path, comment="#")
+    csv_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    data = load_columnar(out_dir)
+    mmap_ms = (time.perf_counter() - start) * 1e3
+    print(f"Wrote {len(data)} rows x {len(data.columns)} columns to {out_dir}")
+    print(f"read_csv {csv_ms:.1f} ms, load_columnar {mmap_ms:.1f} ms")
@@ -0,0 +1,77 @@
+import mmap
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.catalog import columnar as columnar_module
+from backend.catalog.columnar import build_columnar, columnar_path, load_catalog, load_columnar
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "koi.csv"
+    path.write_text(
+        "# comment\n"
+        "kepid,kepoi_name,kepler_name,koi_period,koi_prad\n"
+        "10797460,K00752.01,Kepler-227 b,9.49,2.26\n"
+        "10797460,K00752.02,,54.4,\n"
+        "10811496,K00753.01,,19.9,14.6\n"
+    )
+    return path
+
+
+def _mapped(values):
+    while isinstance(values, np.ndarray) and values.base is not None:
+        values = values.base
+    return isinstance(values, mmap.mmap)
+
+
+def test_round_trip_matches_csv(csv_path):
+    out_dir = build_columnar(csv_path)
+    assert out_dir == columnar_path(csv_path)
+
+    expected = pd.read_csv(csv_path, comment="#")
+    pd.testing.assert_frame_equal(load_columnar(out_dir), expected)
+    pd.testing.assert_frame_equal(load_columnar(out_dir, mmap=False), expected)
+
+
+def test_numeric_columns_are_read_only_maps(csv_path):
+    data = load_columnar(build_columnar(csv_path))
+
+    for column in ("kepid", "koi_period", "koi_prad"):
+        values = data[column].to_numpy()
+        assert _mapped(values)
+        assert not values.flags.writeable
+    assert data["kepler_name"].isna().tolist() == [False, True, True]
+
+
+def test_load_catalog_reuses_copy_until_csv_changes(csv_path, monkeypatch):
+    load_catalog(csv_path)
+    assert columnar_path(csv_path).is_dir()
+
+    parses = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(columnar_module.pd, "read_csv", lambda *a, **k: parses.append(1) or read_csv(*a, **k))
+
+    # touched but unchanged: matched by content hash
+    os.utime(csv_path, ns=(1, 1))
+    assert len(load_catalog(csv_path)) == 3
+    assert parses == []
+
+    csv_path.write_text(csv_path.read_text() + "10848459,K00754.01,,1.73,33.5\n")
+    assert len(load_catalog(csv_path)) == 4
+    assert parses == [1]
+    assert len(load_catalog(csv_path)) == 4
+    assert parses == [1]
+
+
+def test_load_catalog_without_write_access(csv_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(columnar_module, "build_columnar", fail)
+    data = load_catalog(csv_path)
+
+    pd.testing.assert_frame_equal(data, pd.read_csv(csv_path, comment="#"))
+    assert not columnar_path(csv_path).exists()
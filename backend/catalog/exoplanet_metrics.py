@@ -0,0 +1,183 @@
+"""
+Vectorized /exoplanets/metrics payloads.
+
+The response fields are computed column-wise from the selected catalog
+rows and encoded straight to JSON bytes, instead of a to_dict() per row,
+an ExoplanetMetrics instance per row and FastAPI's jsonable_encoder pass
+over them. The output decodes to the same JSON as the pydantic path:
+same keys in the same order, floats as floats, names as strings.
+
+orjson is used when it's installed and the standard json module otherwise.
+
+For the 3D scene there are two binary encodings that load straight into
+typed arrays without parsing every value:
+
+- FLOAT32_MEDIA_TYPE, packed little-endian Float32 columns (always available):
+    uint32 LE   header length H
+    H bytes     UTF-8 JSON {"rows": n, "columns": [...], "names_bytes": m},
+                space-padded so the columns start 4-byte aligned
+    4*n bytes   per column, in header order (booleans as 0/1)
+    m bytes     the n kepoi_names, UTF-8, joined by "\n"
+- ARROW_MEDIA_TYPE, an Arrow IPC stream of every field (needs pyarrow).
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import json
+
+import numpy as np
+import pandas as pd
+
+from backend.catalog.thresholds import apply_threshold
+
+try:
+    import orjson
+except ImportError:  # optional: only makes encoding faster
+    orjson = None
+
+try:
+    import pyarrow
+except ImportError:  # optional: only needed for Arrow responses
+    pyarrow = None
+
+# ExoplanetMetrics fields, in order
+METRIC_FIELDS = [
+    "kepoi_name",
+    "kepler_name",
+    "orbital_period",
+    "planet_radius",
+    "stellar_radius",
+    "orbital_radius",
+    "temperature",
+    "stellar_temperature",
+    "is_exoplanet",
+    "is_exoplanet_confidence",
+]
+FORMATS = ("records", "columns")
+
+FLOAT32_MEDIA_TYPE = "application/vnd.exoplanet.float32-columns"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+# what the scene renders from; every numeric METRIC_FIELDS column
+SCENE_FIELDS = METRIC_FIELDS[2:]
+
+# catalog columns metric_columns reads
+SOURCE_COLUMNS = [
+    "kepoi_name", "kepler_name", "koi_period", "koi_prad", "koi_srad", "koi_dor", "koi_teq", "koi_steff",
+    "is_candidate", "confidence", "prob_candidate",
+]
+
+def metric_columns(frame: pd.DataFrame, threshold: Optional[float] = None) -> Dict[str, List[Any]]:
+    """
+    The METRIC_FIELDS columns for the (NaN-filled) catalog rows in frame,
+    as Python lists ready for encoding. With threshold, is_exoplanet and
+    is_exoplanet_confidence are re-decided from prob_candidate.
+    """
+    def floats(column: str) -> np.ndarray:
+        return frame[column].to_numpy(dtype=float)
+
+    if threshold is None:
+        is_candidate = frame["is_candidate"].to_numpy(dtype=bool)
+        confidence = floats("confidence")
+    else:
+        is_candidate, confidence = apply_threshold(frame["prob_candidate"], threshold)
+
+    return {
+        "kepoi_name": frame["kepoi_name"].astype(str).tolist(),
+        "kepler_name": frame["kepler_name"].astype(str).tolist(),
+        "orbital_period": floats("koi_period").tolist(),
+        "planet_radius": floats("koi_prad").tolist(),
+        "stellar_radius": floats("koi_srad").tolist(),
+        "orbital_radius": (floats("koi_dor") * floats("koi_srad")).tolist(),
+        "temperature": floats("koi_teq").tolist(),
+        "stellar_temperature": floats("koi_steff").tolist(),
+        "is_exoplanet": is_candidate.tolist(),
+        "is_exoplanet_confidence": confidence.tolist(),
+    }
+
+def _dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def encode_metrics(columns: Dict[str, List[Any]], fmt: str = "records") -> bytes:
+    """
+    JSON bytes for metric_columns() output.
+
+    "records" is the usual list of objects; "columns" is
+    {"columns": [field names], "rows": [[values in field order], ...]},
+    which skips repeating every key on every row.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+    rows = zip(*(columns[field] for field in METRIC_FIELDS))
+    if fmt == "columns":
+        return _dumps({"columns": METRIC_FIELDS, "rows": [list(row) for row in rows]})
+    return _dumps([dict(zip(METRIC_FIELDS, row)) for row in rows])
+
+def encode_float32(columns: Dict[str, List[Any]], fields: List[str] = SCENE_FIELDS) -> bytes:
+    """Packed Float32 columns (layout in the module docstring) for metric_columns() output."""
+    rows = len(columns["kepoi_name"])
+    names = "\n".join(columns["kepoi_name"]).encode("utf-8")
+    header = json.dumps({"rows": rows, "columns": list(fields), "names_bytes": len(names)}).encode("utf-8")
+    header += b" " * (-(4 + len(header)) % 4)
+
+    packed = np.empty((len(fields), rows), dtype="<f4")
+    for position, field in enumerate(fields):
+        packed[position] = columns[field]
+    return len(header).to_bytes(4, "little") + header + packed.tobytes() + names
+
+def encode_arrow(columns: Dict[str, List[Any]]) -> bytes:
+    """Arrow IPC stream with every METRIC_FIELDS column. Raises RuntimeError without pyarrow."""
+    if pyarrow is None:
+        raise RuntimeError("pyarrow is not installed")
+    table = pyarrow.table({field: columns[field] for field in METRIC_FIELDS})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _quality(params: List[str]) -> float:
+    """The q parameter of one Accept entry (1 when absent, 0 when unreadable)."""
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return min(max(float(value), 0.0), 1.0)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+class NotAcceptable(ValueError):
+    """Accept only allows representations this server can't produce (406)."""
+
+def binary_media_type(accept: str) -> Optional[str]:
+    """
+    The binary encoding the Accept header prefers over JSON, if any: Arrow
+    when pyarrow is installed, else packed Float32. None means JSON.
+
+    The binary type needs q > 0 and a higher q than application/json; if
+    JSON is only covered by a wildcard (*/*, application/*), an equal q
+    will do, since the explicitly named type is the more specific one.
+    Without pyarrow an Arrow request falls back to Float32 or JSON when the
+    header accepts them, and raises NotAcceptable when it doesn't.
+    """
+    quality: Dict[str, float] = {}
+    for part in accept.split(","):
+        media_type, *params = part.split(";")
+        media_type = media_type.strip().lower()
+        if media_type:
+            quality[media_type] = max(quality.get(media_type, 0.0), _quality(params))
+
+    candidates = [FLOAT32_MEDIA_TYPE]
+    if pyarrow is not None:
+        candidates.insert(0, ARROW_MEDIA_TYPE)
+    # highest q wins; Arrow first on a tie
+    best = max(candidates, key=lambda media_type: quality.get(media_type, 0.0))
+    best_q = quality.get(best, 0.0)
+    json_explicit = "application/json" in quality
+    json_q = quality["application/json"] if json_explicit else max(quality.get("*/*", 0.0), quality.get("application/*", 0.0))
+
+    if best_q > 0 and (best_q > json_q or (best_q == json_q and not json_explicit)):
+        return best
+    if pyarrow is None and quality.get(ARROW_MEDIA_TYPE, 0.0) > 0 and best_q <= 0 and json_q <= 0:
+        raise NotAcceptable(f"{ARROW_MEDIA_TYPE} needs pyarrow, which is not installed; accept {FLOAT32_MEDIA_TYPE} or JSON")
+    return None
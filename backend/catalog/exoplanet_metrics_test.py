@@ -0,0 +1,154 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from backend.app import ExoplanetMetrics
+from backend.catalog import exoplanet_metrics
+from backend.catalog.exoplanet_metrics import (
+    ARROW_MEDIA_TYPE,
+    FLOAT32_MEDIA_TYPE,
+    METRIC_FIELDS,
+    SCENE_FIELDS,
+    NotAcceptable,
+    binary_media_type,
+    encode_arrow,
+    encode_float32,
+    encode_metrics,
+    metric_columns,
+)
+
+
+@pytest.fixture
+def frame():
+    # filled the way KoiStore fills it: "" for text, 0 for numbers; koi_steff as ints
+    return pd.DataFrame({
+        "kepoi_name": ["K00001.01", "K00002.01", "K00003.01"],
+        "kepler_name": ["Kepler-1 b", "", "Kepler-3 é"],
+        "koi_period": [2.47, 1e-05, 123456789.125],
+        "koi_prad": [13.04, 0.0, 1.1],
+        "koi_srad": [0.927, 1.2, 0.0],
+        "koi_dor": [50.0, 0.1, 3.3],
+        "koi_teq": [793.0, 0.0, 1500.5],
+        "koi_steff": np.array([5455, 6000, 0], dtype=np.int64),
+        "is_candidate": [True, False, True],
+        "confidence": [0.91, 0.6, 0.5],
+        "prob_candidate": [0.91, 0.4, 0.5],
+    })
+
+
+def _pydantic_payload(frame):
+    return jsonable_encoder([
+        ExoplanetMetrics(
+            kepoi_name=record["kepoi_name"],
+            kepler_name=record["kepler_name"],
+            orbital_period=record["koi_period"],
+            planet_radius=record["koi_prad"],
+            stellar_radius=record["koi_srad"],
+            orbital_radius=record["koi_dor"] * record["koi_srad"],
+            temperature=record["koi_teq"],
+            stellar_temperature=record["koi_steff"],
+            is_exoplanet=record["is_candidate"],
+            is_exoplanet_confidence=record["confidence"],
+        )
+        for record in frame.to_dict(orient="records")
+    ])
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_records_match_the_pydantic_response(frame, monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(exoplanet_metrics, "orjson", None)
+    elif exoplanet_metrics.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    payload = json.loads(encode_metrics(metric_columns(frame)))
+
+    expected = _pydantic_payload(frame)
+    assert payload == expected
+    assert [list(record) for record in payload] == [METRIC_FIELDS] * len(frame)
+    assert all(type(a) is type(b) for got, want in zip(payload, expected) for a, b in zip(got.values(), want.values()))
+
+
+def test_columns_format_has_rows_in_field_order(frame):
+    payload = json.loads(encode_metrics(metric_columns(frame), "columns"))
+
+    assert payload["columns"] == METRIC_FIELDS
+    assert [dict(zip(payload["columns"], row)) for row in payload["rows"]] == _pydantic_payload(frame)
+
+
+def test_threshold_redecides_from_prob_candidate(frame):
+    columns = metric_columns(frame, threshold=0.45)
+
+    assert columns["is_exoplanet"] == [True, False, True]
+    assert columns["is_exoplanet_confidence"] == pytest.approx([0.91, 0.6, 0.5])
+    assert metric_columns(frame, threshold=0.95)["is_exoplanet"] == [False, False, False]
+
+
+def test_empty_selection_and_unknown_format(frame):
+    assert encode_metrics(metric_columns(frame.iloc[:0])) == b"[]"
+    with pytest.raises(ValueError):
+        encode_metrics(metric_columns(frame), "xml")
+
+
+def _decode_float32(body):
+    header_length = int.from_bytes(body[:4], "little")
+    header = json.loads(body[4:4 + header_length])
+    offset = 4 + header_length
+    assert offset % 4 == 0
+    rows = header["rows"]
+    columns = {
+        field: np.frombuffer(body, dtype="<f4", count=rows, offset=offset + 4 * rows * position)
+        for position, field in enumerate(header["columns"])
+    }
+    names = body[offset + 4 * rows * len(header["columns"]):]
+    assert len(names) == header["names_bytes"]
+    return header, columns, names.decode("utf-8").split("\n") if rows else []
+
+
+def test_float32_columns_round_trip(frame):
+    columns = metric_columns(frame)
+    header, decoded, names = _decode_float32(encode_float32(columns))
+
+    assert header["rows"] == 3
+    assert header["columns"] == SCENE_FIELDS
+    assert names == columns["kepoi_name"]
+    for field in SCENE_FIELDS:
+        np.testing.assert_array_equal(decoded[field], np.asarray(columns[field], dtype=np.float32))
+    assert decoded["is_exoplanet"].tolist() == [1.0, 0.0, 1.0]
+
+    header, decoded, names = _decode_float32(encode_float32(metric_columns(frame.iloc[:0])))
+    assert header["rows"] == 0 and names == [] and decoded["orbital_period"].size == 0
+
+
+def test_accept_negotiation(monkeypatch):
+    assert binary_media_type("") is None
+    assert binary_media_type("application/json, */*") is None
+    assert binary_media_type(FLOAT32_MEDIA_TYPE) == FLOAT32_MEDIA_TYPE
+    assert binary_media_type(f"{FLOAT32_MEDIA_TYPE}; q=0") is None
+    # JSON preferred: q-values are honoured, not just q=0
+    assert binary_media_type(f"application/json, {FLOAT32_MEDIA_TYPE};q=0.1") is None
+    assert binary_media_type(f"{FLOAT32_MEDIA_TYPE};q=0.9, application/json") is None
+    assert binary_media_type(f"{FLOAT32_MEDIA_TYPE}, application/json;q=0.5") == FLOAT32_MEDIA_TYPE
+    # a named type beats a wildcard of the same q
+    assert binary_media_type(f"{FLOAT32_MEDIA_TYPE}, */*") == FLOAT32_MEDIA_TYPE
+    assert binary_media_type(f"{FLOAT32_MEDIA_TYPE};q=0.5, */*") is None
+
+    monkeypatch.setattr(exoplanet_metrics, "pyarrow", None)
+    assert binary_media_type(f"{ARROW_MEDIA_TYPE}, {FLOAT32_MEDIA_TYPE}") == FLOAT32_MEDIA_TYPE
+    assert binary_media_type(f"{ARROW_MEDIA_TYPE}, application/json;q=0.5") is None
+    with pytest.raises(NotAcceptable):
+        binary_media_type(ARROW_MEDIA_TYPE)
+    with pytest.raises(RuntimeError):
+        encode_arrow({})
+
+
+def test_arrow_stream_has_every_field(frame):
+    pyarrow = pytest.importorskip("pyarrow")
+
+    table = pyarrow.ipc.open_stream(encode_arrow(metric_columns(frame))).read_all()
+
+    assert table.column_names == METRIC_FIELDS
+    assert table.to_pylist() == _pydantic_payload(frame)
@@ -0,0 +1,32 @@
+"""
+File fingerprints shared by the on-disk catalog caches.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_stamp(path: Path) -> Dict[str, Any]:
+    """Cheap identity of a file: mtime and size."""
+    stat = Path(path).stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def same_file(path: Path, recorded: Optional[Dict[str, Any]]) -> bool:
+    """
+    True if path still matches a recorded {"mtime_ns", "size", "sha256"}.
+    The content hash is only computed when mtime/size disagree (e.g. the
+    file was re-copied into a container without changing).
+    """
+    if not recorded:
+        return False
+    stamp = file_stamp(path)
+    if stamp["mtime_ns"] == recorded.get("mtime_ns") and stamp["size"] == recorded.get("size"):
+        return True
+    return recorded.get("sha256") == file_sha256(path)
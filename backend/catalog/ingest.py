@@ -0,0 +1,148 @@
+"""
+Incremental ingestion of a new catalog release.
+
+A new cumulative release mostly repeats the previous one, so instead of
+rescoring every KOI the release is diffed against the loaded snapshot by
+kepoi_name: predictions are reused for rows whose model features didn't
+change and only added or feature-changed rows go through the model. The
+result is a complete new CatalogSnapshot that the app swaps in whole.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, Union
+import logging
+
+import numpy as np
+import pandas as pd
+
+from backend.catalog.columnar import load_catalog
+from backend.catalog.predictions import PREDICTION_COLUMNS, save_predictions, score_catalog
+from backend.catalog.snapshot import CatalogSnapshot
+from backend.model.runtime.predict_one import DEFAULT_ARTIFACTS_DIR, feature_names
+
+logger = logging.getLogger(__name__)
+
+# columns the snapshot adds to the CSV's, never part of a diff
+DERIVED_COLUMNS = ["orbital_radius", *PREDICTION_COLUMNS]
+
+class ReleaseDiff:
+    """
+    kepoi_names added, removed and changed (any column) between two
+    releases, plus the ones that need the model: added rows and rows whose
+    model feature columns changed.
+    """
+
+    def __init__(self, added: List[str], removed: List[str], changed: List[str], rescore: List[str]):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.rescore = rescore
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "rescored": len(self.rescore),
+        }
+
+def _row_hashes(frame: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """One uint64 per row over columns; numbers compared as float64, so int/float dtype drift isn't a change."""
+    normalized = pd.DataFrame({
+        column: frame[column].astype(float) if pd.api.types.is_numeric_dtype(frame[column]) else frame[column].astype(str).where(frame[column].notna())
+        for column in columns
+    })
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+def _changed(old: pd.DataFrame, new: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """Mask over new's rows (aligned with old row for row) that differ in any of columns."""
+    if not columns:
+        return np.zeros(len(new), dtype=bool)
+    return _row_hashes(old, columns) != _row_hashes(new, columns)
+
+def diff_release(old: pd.DataFrame, new: pd.DataFrame, features: Iterable[str]) -> ReleaseDiff:
+    """
+    Compare two catalogs (raw rows, one per kepoi_name) column by column.
+
+    Only columns both releases have are compared; a column one of them
+    lacks marks every shared row changed, and every row for rescoring if
+    it is a model feature.
+    """
+    old_names = old["kepoi_name"].astype(str)
+    new_names = new["kepoi_name"].astype(str)
+    old_positions = pd.Series(np.arange(len(old)), index=old_names.to_numpy())
+    shared = new_names.isin(old_positions.index).to_numpy()
+
+    old_columns = [c for c in old.columns if c not in DERIVED_COLUMNS]
+    new_columns = [c for c in new.columns if c not in DERIVED_COLUMNS]
+    common = [c for c in new_columns if c in old_columns]
+    features = set(features)
+
+    old_rows = old.iloc[old_positions[new_names[shared]].to_numpy()]
+    new_rows = new[shared]
+    if set(old_columns) == set(new_columns):
+        changed = _changed(old_rows, new_rows, common)
+    else:
+        changed = np.ones(len(new_rows), dtype=bool)
+    if features & set(old_columns) == features & set(new_columns):
+        feature_changed = _changed(old_rows, new_rows, [c for c in common if c in features])
+    else:
+        feature_changed = np.ones(len(new_rows), dtype=bool)
+
+    shared_names = new_names[shared]
+    added = new_names[~shared].tolist()
+    return ReleaseDiff(
+        added=added,
+        removed=sorted(set(old_names) - set(new_names)),
+        changed=shared_names[changed].tolist(),
+        rescore=added + shared_names[feature_changed].tolist(),
+    )
+
+def ingest_release(
+    previous: CatalogSnapshot,
+    csv_path: Union[str, Path],
+    *,
+    artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR,
+) -> Tuple[CatalogSnapshot, ReleaseDiff]:
+    """
+    Build the snapshot for the release in csv_path from previous.
+
+    Steps:
+      1) Load the release (refreshing its columnar copy)
+      2) Diff it against previous by kepoi_name
+      3) Score only diff.rescore; every other row keeps its prediction
+      4) Save the merged predictions as the release's prediction cache, so
+         a restart doesn't rescore either
+      5) Build the new snapshot's indexes from the merged table
+
+    previous is only read, so it can keep serving until the caller swaps.
+
+    Returns:
+      (new snapshot, diff)
+    """
+    data = load_catalog(csv_path)
+    diff = diff_release(previous.store.raw, data, feature_names(artifacts_dir))
+
+    names = data["kepoi_name"].astype(str)
+    rescore = names.isin(diff.rescore).to_numpy()
+    kept = previous.predictions.reindex(names[~rescore])
+    logger.info("Release %s: %s", Path(csv_path).name, diff.summary())
+
+    scored = score_catalog(data[rescore], artifacts_dir=artifacts_dir)
+    predictions = pd.concat([kept, scored]).reindex(names)
+    save_predictions(csv_path, predictions, artifacts_dir=artifacts_dir)
+
+    return CatalogSnapshot(csv_path, data=data, predictions=predictions), diff
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Usage: python -m backend.catalog.ingest /path/to/old.csv /path/to/new.csv")
+        sys.exit(64)
+
+    old = pd.read_csv(Path(sys.argv[1]).expanduser(), comment="#")
+    new = pd.read_csv(Path(sys.argv[2]).expanduser(), comment="#")
+    diff = diff_release(old, new, feature_names())
+    print(diff.summary())
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.catalog import ingest
+from backend.catalog.ingest import diff_release, ingest_release
+from backend.catalog.snapshot import CatalogSnapshot
+
+HEADER = "kepid,kepoi_name,kepler_name,koi_disposition,koi_period,koi_dor,koi_srad,ra,dec\n"
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["kepoi_name", "kepler_name", "koi_period", "koi_steff"])
+
+
+def test_diff_separates_feature_and_other_changes():
+    old = _frame([
+        ["K1", "Kepler-1 b", 1.0, 5000],
+        ["K2", np.nan, 2.0, 5000],
+        ["K3", np.nan, 3.0, 5000],
+        ["K4", np.nan, 4.0, 5000],
+    ])
+    new = _frame([
+        ["K5", np.nan, 5.0, 5000],
+        ["K3", "Kepler-3 b", 3.0, 5000],   # name assigned: changed, same features
+        ["K2", np.nan, 2.5, 5000],         # feature changed
+        ["K1", "Kepler-1 b", 1.0, 5000.0],  # int -> float only: unchanged
+    ])
+
+    diff = diff_release(old, new, ["koi_period", "koi_steff"])
+
+    assert diff.added == ["K5"]
+    assert diff.removed == ["K4"]
+    assert sorted(diff.changed) == ["K2", "K3"]
+    assert sorted(diff.rescore) == ["K2", "K5"]
+
+
+def test_new_feature_column_rescores_everything():
+    old = _frame([["K1", np.nan, 1.0, 5000]])
+    new = old.assign(koi_prad=1.0)
+
+    diff = diff_release(old, new, ["koi_period", "koi_prad"])
+
+    assert diff.changed == ["K1"] and diff.rescore == ["K1"]
+    assert diff_release(old, new, ["koi_period"]).rescore == []
+
+
+@pytest.fixture
+def scoring(monkeypatch):
+    scored = []
+
+    def fake_score_catalog(data, *, artifacts_dir, threshold=0.5):
+        scored.extend(data["kepoi_name"])
+        prob = (data["koi_period"] / 10).to_numpy()
+        return pd.DataFrame(
+            {"is_candidate": prob >= threshold, "confidence": np.maximum(prob, 1 - prob), "prob_candidate": prob},
+            index=data["kepoi_name"].astype(str),
+        )
+
+    monkeypatch.setattr(ingest, "score_catalog", fake_score_catalog)
+    monkeypatch.setattr(ingest, "feature_names", lambda artifacts_dir=None: ["koi_period"])
+    monkeypatch.setattr(ingest, "save_predictions", lambda *args, **kwargs: None)
+    return scored
+
+
+def test_ingest_rescores_only_the_delta(tmp_path, scoring):
+    old_csv = tmp_path / "old" / "koi.csv"
+    old_csv.parent.mkdir()
+    old_csv.write_text(HEADER + "1,K1,,CANDIDATE,1.0,10,1\n2,K2,,CONFIRMED,2.0,10,1\n3,K3,,CANDIDATE,3.0,10,1\n")
+    data = pd.read_csv(old_csv)
+    previous = CatalogSnapshot(old_csv, data=data, predictions=ingest.score_catalog(data, artifacts_dir=None))
+    scoring.clear()
+
+    new_csv = tmp_path / "new" / "koi.csv"
+    new_csv.parent.mkdir()
+    new_csv.write_text(HEADER + "1,K1,Kepler-1 b,CANDIDATE,1.0,10,1\n3,K3,,CANDIDATE,9.0,10,1\n4,K4,,CANDIDATE,4.0,10,1\n")
+    snapshot, diff = ingest_release(previous, new_csv)
+
+    assert sorted(scoring) == ["K3", "K4"]
+    assert diff.summary() == {"added": 1, "removed": 1, "changed": 2, "rescored": 2}
+    assert list(snapshot.store.raw["kepoi_name"]) == ["K1", "K3", "K4"]
+    assert snapshot.store.raw["prob_candidate"].tolist() == pytest.approx([0.1, 0.9, 0.4])
+    assert snapshot.store.record("K1")["kepler_name"] == "Kepler-1 b"
+    # the previous snapshot is untouched and can keep serving
+    assert list(previous.store.raw["kepoi_name"]) == ["K1", "K2", "K3"]
@@ -0,0 +1,154 @@
+"""
+Precomputed model predictions for the KOI catalog.
+
+The catalog is static between archive releases, so every KOI is scored once
+(at startup, or offline with ``python -m backend.catalog.predictions``) and the
+table is cached next to the CSV. The cache is reused until the CSV content or
+model/artifacts/version.json changes.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import json
+import logging
+import os
+import pandas as pd
+
+from backend.catalog.files import file_sha256, file_stamp, same_file
+from backend.model.runtime.predict_one import DEFAULT_ARTIFACTS_DIR, predict_batch
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_COLUMNS = ["is_candidate", "confidence", "prob_candidate"]
+
+def _cache_paths(csv_path: Path, cache_dir: Optional[Path]):
+    cache_dir = Path(cache_dir) if cache_dir is not None else csv_path.parent
+    stem = cache_dir / csv_path.stem
+    return stem.with_suffix(".predictions.csv"), stem.with_suffix(".predictions.json")
+
+def _cache_key(artifacts_dir: Path, threshold: float) -> Dict[str, Any]:
+    """What the cached table depends on besides the CSV itself (recorded as "source")."""
+    return {
+        "model_version": file_sha256(artifacts_dir / "version.json"),
+        "threshold": threshold,
+    }
+
+def _read_cache(table_path: Path, meta_path: Path, csv_path: Path, key: Dict[str, Any]):
+    if not (table_path.exists() and meta_path.exists()):
+        return None
+    try:
+        meta = json.loads(meta_path.read_text())
+    except ValueError:
+        return None
+
+    if meta.get("model_version") != key["model_version"] or meta.get("threshold") != key["threshold"]:
+        return None
+
+    source = meta.get("source")
+    if not same_file(csv_path, source):
+        return None
+    stamp = file_stamp(csv_path)
+    if any(source.get(field) != value for field, value in stamp.items()):
+        # Touched but unchanged: record the new stamp so the next start skips the hash
+        _write_meta(meta_path, {**meta, "source": {**source, **stamp}})
+
+    return pd.read_csv(table_path, index_col="kepoi_name")
+
+def _write_meta(meta_path: Path, meta: Dict[str, Any]) -> None:
+    # replaced atomically: other workers poll it (see cached_release)
+    tmp_path = meta_path.with_name(f".{meta_path.name}.{os.getpid()}")
+    tmp_path.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_path, meta_path)
+
+def cached_release(csv_path: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None) -> Optional[str]:
+    """
+    sha256 of the release the on-disk prediction table for csv_path was
+    built from, or None if there is no readable table. A worker that
+    ingests a new release rewrites it, so the others can notice.
+    """
+    _, meta_path = _cache_paths(Path(csv_path).resolve(), cache_dir)
+    try:
+        return json.loads(meta_path.read_text())["source"]["sha256"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def score_catalog(
+    data: pd.DataFrame,
+    *,
+    artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR,
+    threshold: float = 0.5,
+) -> pd.DataFrame:
+    """
+    Score every row of the catalog in one batch.
+
+    Returns:
+      DataFrame indexed by kepoi_name with columns is_candidate, confidence, prob_candidate
+    """
+    predictions = predict_batch(data, artifacts_dir=artifacts_dir, threshold=threshold)
+    predictions.index = data["kepoi_name"].astype(str)
+    return predictions[PREDICTION_COLUMNS]
+
+def load_predictions(
+    csv_path: Union[str, Path],
+    data: pd.DataFrame,
+    *,
+    artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR,
+    threshold: float = 0.5,
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> pd.DataFrame:
+    """
+    Return the prediction table for the catalog read from csv_path, reusing
+    the on-disk cache when it is still valid and rebuilding it otherwise.
+
+    data is the already-parsed catalog; it is only scored on a cache miss.
+    """
+    csv_path = Path(csv_path).resolve()
+    artifacts_dir = Path(artifacts_dir).resolve()
+    table_path, meta_path = _cache_paths(csv_path, cache_dir)
+    key = _cache_key(artifacts_dir, threshold)
+
+    cached = _read_cache(table_path, meta_path, csv_path, key)
+    if cached is not None:
+        return cached[PREDICTION_COLUMNS]
+
+    logger.info("Scoring %d KOIs from %s", len(data), csv_path.name)
+    predictions = score_catalog(data, artifacts_dir=artifacts_dir, threshold=threshold)
+    save_predictions(csv_path, predictions, artifacts_dir=artifacts_dir, threshold=threshold, cache_dir=cache_dir)
+    return predictions
+
+def save_predictions(
+    csv_path: Union[str, Path],
+    predictions: pd.DataFrame,
+    *,
+    artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR,
+    threshold: float = 0.5,
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> None:
+    """
+    Store predictions (indexed by kepoi_name) as the on-disk cache for
+    csv_path, e.g. after they were built incrementally from an older table.
+    """
+    csv_path = Path(csv_path).resolve()
+    artifacts_dir = Path(artifacts_dir).resolve()
+    table_path, meta_path = _cache_paths(csv_path, cache_dir)
+    key = _cache_key(artifacts_dir, threshold)
+    source = {"name": csv_path.name, **file_stamp(csv_path), "sha256": file_sha256(csv_path)}
+    try:
+        predictions.to_csv(table_path, index_label="kepoi_name")
+        _write_meta(meta_path, {**key, "source": source, "rows": len(predictions)})
+    except OSError as exc:
+        # Read-only deployments still work, they just rescore on every start
+        logger.warning("Could not write prediction cache %s: %s", table_path, exc)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m backend.catalog.predictions /path/to/koi.csv")
+        sys.exit(64)
+
+    csv_path = Path(sys.argv[1]).expanduser().resolve()
+    data = pd.read_csv(csv_path, comment="#")
+    predictions = load_predictions(csv_path, data)
+    print(f"{len(predictions)} KOIs scored, {int(predictions['is_candidate'].sum())} candidates")
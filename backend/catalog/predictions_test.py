@@ -0,0 +1,89 @@
+import json
+import os
+import pandas as pd
+import pytest
+
+from backend.catalog import predictions as predictions_module
+from backend.catalog.predictions import cached_release, load_predictions
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    csv_path = tmp_path / "koi.csv"
+    csv_path.write_text("# comment\nkepoi_name,koi_period\nK00001.01,1.5\nK00002.01,3.0\n")
+    artifacts_dir = tmp_path / "artifacts"
+    artifacts_dir.mkdir()
+    (artifacts_dir / "version.json").write_text(json.dumps({"timestamp_utc": "v1"}))
+    return csv_path, artifacts_dir
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    calls = []
+
+    def fake_predict_batch(df, *, artifacts_dir, threshold):
+        calls.append(len(df))
+        prob = df["koi_period"] / 10
+        return pd.DataFrame(
+            {"is_candidate": prob >= threshold, "confidence": prob, "prob_candidate": prob, "threshold": threshold},
+            index=df.index,
+        )
+
+    monkeypatch.setattr(predictions_module, "predict_batch", fake_predict_batch)
+    return calls
+
+
+def _load(csv_path, artifacts_dir):
+    data = pd.read_csv(csv_path, comment="#")
+    return load_predictions(csv_path, data, artifacts_dir=artifacts_dir)
+
+
+def test_second_load_is_served_from_cache(catalog, scored):
+    csv_path, artifacts_dir = catalog
+
+    first = _load(csv_path, artifacts_dir)
+    second = _load(csv_path, artifacts_dir)
+
+    assert scored == [2]
+    assert second.loc["K00002.01", "prob_candidate"] == pytest.approx(0.3)
+    pd.testing.assert_frame_equal(first, second, check_index_type=False)
+
+
+def test_touching_the_csv_without_changes_keeps_cache(catalog, scored):
+    csv_path, artifacts_dir = catalog
+    _load(csv_path, artifacts_dir)
+
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    _load(csv_path, artifacts_dir)
+
+    assert scored == [2]
+    meta = json.loads(csv_path.with_suffix(".predictions.json").read_text())
+    assert meta["source"]["mtime_ns"] == stat.st_mtime_ns + 10**9
+
+
+def test_new_csv_or_model_version_rescored(catalog, scored):
+    csv_path, artifacts_dir = catalog
+    _load(csv_path, artifacts_dir)
+
+    with open(csv_path, "a") as f:
+        f.write("K00003.01,6.0\n")
+    assert len(_load(csv_path, artifacts_dir)) == 3
+
+    (artifacts_dir / "version.json").write_text(json.dumps({"timestamp_utc": "v2"}))
+    _load(csv_path, artifacts_dir)
+
+    assert scored == [2, 3, 3]
+
+
+def test_cached_release_tracks_the_scored_csv(catalog, scored):
+    csv_path, artifacts_dir = catalog
+    assert cached_release(csv_path) is None
+
+    _load(csv_path, artifacts_dir)
+    first = cached_release(csv_path)
+    csv_path.write_text("kepoi_name,koi_period\nK00001.01,2.5\n")
+    _load(csv_path, artifacts_dir)
+
+    assert first is not None
+    assert cached_release(csv_path) not in (None, first)
@@ -0,0 +1,112 @@
+"""
+Range and cone queries over the KOI catalog.
+
+Numeric range predicates are answered from per-column sorted arrays
+(two searchsorted calls per predicate), and cone searches on ra/dec from a
+haversine BallTree, so neither needs a scan over the table. Missing values
+never match a predicate.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import numpy as np
+import pandas as pd
+
+Range = Tuple[str, Optional[float], Optional[float]]
+
+def parse_range(spec: str) -> Range:
+    """
+    Parse "column:low:high" into (column, low, high). Either bound may be
+    left empty for an open range, e.g. "koi_prad::1.8". Bounds are inclusive
+    and must be finite ("nan" or "inf" would silently match nothing or everything).
+    """
+    parts = spec.split(":")
+    if len(parts) != 3 or not parts[0]:
+        raise ValueError(f"Range must look like column:low:high, got {spec!r}")
+    column, low, high = parts
+    try:
+        bounds = [float(bound) if bound else None for bound in (low, high)]
+    except ValueError:
+        raise ValueError(f"Range bounds must be numbers, got {spec!r}")
+    if any(bound is not None and not math.isfinite(bound) for bound in bounds):
+        raise ValueError(f"Range bounds must be finite, got {spec!r}")
+    return column, bounds[0], bounds[1]
+
+class QueryIndex:
+    """
+    Sorted-column and sky indexes over a catalog DataFrame.
+
+    Results are sorted row positions into data (i.e. catalog order). Column
+    indexes are built the first time a column is queried.
+    """
+
+    def __init__(self, data: pd.DataFrame, *, ra_column: str = "ra", dec_column: str = "dec"):
+        self._data = data.copy(deep=False)
+        self._data.index = pd.RangeIndex(len(self._data))
+        self.numeric_columns = set(self._data.select_dtypes(include="number").columns)
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        self._sky_positions = np.empty(0, dtype=np.int64)
+        self._sky_tree = None
+        if ra_column in self._data.columns and dec_column in self._data.columns:
+            coords = self._data[[dec_column, ra_column]].to_numpy(dtype=float)
+            valid = ~np.isnan(coords).any(axis=1)
+            self._sky_positions = np.flatnonzero(valid)
+            if valid.any():
+                # imported here so importing the app doesn't pull in sklearn
+                from sklearn.neighbors import BallTree
+
+                # haversine expects (latitude, longitude) in radians
+                self._sky_tree = BallTree(np.radians(coords[valid]), metric="haversine")
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _column(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        if column not in self.numeric_columns:
+            raise KeyError(f"Not a numeric column: {column!r}")
+        index = self._sorted.get(column)
+        if index is None:
+            values = self._data[column].to_numpy(dtype=float)
+            present = np.flatnonzero(~np.isnan(values))
+            order = present[np.argsort(values[present], kind="stable")]
+            index = self._sorted[column] = (values[order], order)
+        return index
+
+    def range(self, column: str, low: Optional[float] = None, high: Optional[float] = None) -> np.ndarray:
+        """Positions with low <= column <= high."""
+        values, order = self._column(column)
+        start = 0 if low is None else np.searchsorted(values, low, side="left")
+        stop = len(values) if high is None else np.searchsorted(values, high, side="right")
+        return np.sort(order[start:stop])
+
+    def cone(self, ra: float, dec: float, radius: float) -> np.ndarray:
+        """Positions within radius degrees of (ra, dec), also in degrees."""
+        if self._sky_tree is None:
+            return np.empty(0, dtype=np.int64)
+        center = np.radians([[dec, ra]])
+        hits = self._sky_tree.query_radius(center, r=np.radians(radius))[0]
+        return np.sort(self._sky_positions[hits])
+
+    def query(
+        self,
+        ranges: Sequence[Range] = (),
+        cone: Optional[Tuple[float, float, float]] = None,
+    ) -> np.ndarray:
+        """
+        Positions matching every range predicate and, if given, the
+        (ra, dec, radius) cone. With no predicates every row matches.
+        """
+        matches: List[np.ndarray] = [self.range(column, low, high) for column, low, high in ranges]
+        if cone is not None:
+            matches.append(self.cone(*cone))
+        if not matches:
+            return np.arange(len(self._data))
+
+        matches.sort(key=len)
+        result = matches[0]
+        for positions in matches[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, positions, assume_unique=True)
+        return result
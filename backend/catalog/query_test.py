@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.catalog.query import QueryIndex, parse_range
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    rng = np.random.default_rng(0)
+    n = 2000
+    data = pd.DataFrame({
+        "koi_teq": rng.uniform(100, 1500, n),
+        "koi_prad": rng.uniform(0.3, 20, n),
+        "ra": rng.uniform(280, 300, n),
+        "dec": rng.uniform(36, 52, n),
+    })
+    data.loc[::50, "koi_teq"] = np.nan
+    return data
+
+
+def test_ranges_match_a_full_scan(catalog):
+    index = QueryIndex(catalog)
+
+    got = index.query([("koi_teq", 240, 320), ("koi_prad", None, 1.8)])
+    expected = np.flatnonzero(catalog["koi_teq"].between(240, 320) & (catalog["koi_prad"] <= 1.8))
+
+    assert got.tolist() == expected.tolist()
+
+
+def test_missing_values_never_match(catalog):
+    index = QueryIndex(catalog)
+
+    assert len(index.range("koi_teq")) == catalog["koi_teq"].notna().sum()
+
+
+def test_cone_matches_great_circle_distance(catalog):
+    index = QueryIndex(catalog)
+    ra0, dec0 = np.radians(290.0), np.radians(44.0)
+    ra, dec = np.radians(catalog["ra"]), np.radians(catalog["dec"])
+    separation = np.degrees(np.arccos(np.clip(
+        np.sin(dec) * np.sin(dec0) + np.cos(dec) * np.cos(dec0) * np.cos(ra - ra0), -1, 1
+    )))
+
+    got = index.query([("koi_prad", 1, None)], cone=(290.0, 44.0, 2.0))
+
+    assert got.tolist() == np.flatnonzero((separation <= 2.0) & (catalog["koi_prad"] >= 1)).tolist()
+
+
+def test_parse_range():
+    assert parse_range("koi_prad::1.8") == ("koi_prad", None, 1.8)
+    assert parse_range("koi_teq:240:") == ("koi_teq", 240.0, None)
+    with pytest.raises(ValueError):
+        parse_range("koi_teq:hot:")
+    for spec in ("koi_teq:nan:", "koi_teq::inf", "koi_teq:-inf:300"):
+        with pytest.raises(ValueError):
+            parse_range(spec)
@@ -0,0 +1,117 @@
+"""
+Name search over the KOI catalog.
+
+Two prebuilt indexes over the lowercased kepoi_name/kepler_name values:
+  - a sorted key list, searched with bisect for prefix matches
+  - a trigram -> positions inverted index for substring matches
+
+A query costs O(log N) plus the size of the smallest trigram posting list,
+instead of a scan over every name.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+GRAM = 3
+
+def _grams(text: str) -> set:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+class NameIndex:
+    """
+    Prefix and substring search over catalog names.
+
+    Results are catalog positions: names starting with the query first, then
+    the remaining substring matches, each group in catalog order. Queries
+    shorter than three characters only match prefixes.
+    """
+
+    def __init__(self, kepoi_names: Iterable[str], kepler_names: Iterable[str]):
+        self._names: List[Tuple[str, ...]] = []
+        keyed: List[Tuple[str, int]] = []
+        postings: Dict[str, List[int]] = {}
+
+        for position, names in enumerate(zip(kepoi_names, kepler_names)):
+            lowered = tuple(str(name).lower() for name in names if isinstance(name, str) and name)
+            self._names.append(lowered)
+            grams = set()
+            for name in lowered:
+                keyed.append((name, position))
+                grams |= _grams(name)
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+
+        keyed.sort()
+        self._keys = [key for key, _ in keyed]
+        self._key_positions = np.fromiter((position for _, position in keyed), dtype=np.int64, count=len(keyed))
+        # positions were appended in catalog order, so each posting list is already sorted
+        self._postings = {gram: np.asarray(positions, dtype=np.int64) for gram, positions in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def prefix(self, query: str) -> np.ndarray:
+        """Sorted positions whose kepoi_name or kepler_name starts with query."""
+        query = query.lower()
+        lo = bisect_left(self._keys, query)
+        hi = bisect_left(self._keys, query + "\uffff", lo)
+        return np.unique(self._key_positions[lo:hi])
+
+    def _candidates(self, query: str) -> np.ndarray:
+        """Sorted positions sharing every trigram of query."""
+        grams = _grams(query)
+        if not grams:
+            raise ValueError("substring search needs at least 3 characters")
+
+        lists = sorted((self._postings.get(gram) for gram in grams), key=lambda p: 0 if p is None else len(p))
+        if lists[0] is None:
+            return np.empty(0, dtype=np.int64)
+        candidates = lists[0]
+        for positions in lists[1:]:
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+            if not len(candidates):
+                break
+        return candidates
+
+    def _verify(self, query: str, candidates: np.ndarray) -> np.ndarray:
+        # sharing every trigram doesn't guarantee a contiguous match
+        names = self._names
+        return np.fromiter(
+            (p for p in candidates if any(query in name for name in names[p])),
+            dtype=np.int64,
+        )
+
+    def substring(self, query: str) -> np.ndarray:
+        """Sorted positions whose kepoi_name or kepler_name contains query (len >= 3)."""
+        query = query.lower()
+        return self._verify(query, self._candidates(query))
+
+    def search(self, query: str) -> np.ndarray:
+        """Prefix matches first, then other substring matches."""
+        starts = self.prefix(query)
+        if len(query) < GRAM:
+            return starts
+        query = query.lower()
+        # prefix hits are already known matches, only the rest need checking
+        others = np.setdiff1d(self._candidates(query), starts, assume_unique=True)
+        return np.concatenate([starts, self._verify(query, others)])
+
+def paginate(positions: np.ndarray, cursor: Optional[str], limit: int):
+    """
+    Slice one page out of a result list.
+
+    The cursor is the opaque string returned as next_cursor by the previous
+    page (an offset into the result list). Returns (page, next_cursor), with
+    next_cursor None on the last page.
+    """
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    end = offset + limit
+    next_cursor = str(end) if end < len(positions) else None
+    return positions[offset:end], next_cursor
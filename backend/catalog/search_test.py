@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from backend.catalog.search import NameIndex, paginate
+
+
+def _index():
+    return NameIndex(
+        ["K00752.01", "K00752.02", "K01227.01", "K00070.01"],
+        ["Kepler-227 b", "Kepler-227 c", "", "Kepler-20 c"],
+    )
+
+
+def test_prefix_matches_either_name_case_insensitively():
+    index = _index()
+
+    assert index.prefix("k0075").tolist() == [0, 1]
+    assert index.prefix("KEPLER-2").tolist() == [0, 1, 3]
+
+
+def test_search_ranks_prefix_hits_before_substring_hits():
+    index = _index()
+
+    assert index.search("227").tolist() == [0, 1, 2]
+    assert index.search("K01227").tolist() == [2]
+    assert index.search("20 c").tolist() == [3]
+
+
+def test_trigram_candidates_are_verified():
+    index = NameIndex(["abc-bcd", "xabcd"], ["", ""])
+
+    # both rows contain "abc" and "bcd", only one contains "abcd"
+    assert index.search("abcd").tolist() == [1]
+
+
+def test_short_queries_only_match_prefixes():
+    assert _index().search("c").tolist() == []
+
+
+def test_paginate_walks_all_results():
+    positions = np.arange(5)
+
+    page, cursor = paginate(positions, None, 2)
+    pages = [page.tolist()]
+    while cursor:
+        page, cursor = paginate(positions, cursor, 2)
+        pages.append(page.tolist())
+
+    assert pages == [[0, 1], [2, 3], [4]]
+    with pytest.raises(ValueError):
+        paginate(positions, "-1", 2)
@@ -0,0 +1,89 @@
+"""
+Everything the API serves from one load of the catalog.
+
+Building a snapshot reads the catalog, attaches the model predictions and
+builds the lookup indexes; the app keeps one, builds it at startup
+rather than at import, and replaces it whole when a new release is
+ingested (backend/catalog/ingest.py).
+"""
+from __future__ import annotations
+from functools import cached_property
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+from backend.catalog.columnar import load_catalog
+from backend.catalog.exoplanet_metrics import FLOAT32_MEDIA_TYPE, SOURCE_COLUMNS, encode_float32, metric_columns
+from backend.catalog.predictions import cached_release, load_predictions
+from backend.catalog.query import QueryIndex
+from backend.catalog.search import NameIndex
+from backend.catalog.store import KoiStore
+from backend.catalog.thresholds import disposition_labels, threshold_sweep
+from backend.responses import PreencodedBody, PreencodedJSON
+
+class CatalogSnapshot:
+    """
+    The catalog read from csv_path with predictions attached, plus its
+    indexes and the pre-encoded listing. Treated as read-only once built.
+
+    data (as load_catalog returns it) and predictions (indexed by
+    kepoi_name) can be passed in when the caller already has them, as
+    incremental ingestion does.
+    """
+
+    def __init__(
+        self,
+        csv_path: Union[str, Path],
+        *,
+        data: Optional[pd.DataFrame] = None,
+        predictions: Optional[pd.DataFrame] = None,
+    ):
+        self.csv_path = Path(csv_path)
+        if data is None:
+            # numeric columns are memory-mapped from a binary copy of the csv
+            # (rebuilt when the csv changes), so workers share one set of pages
+            data = load_catalog(csv_path)
+        # create orbital radius column
+        data["orbital_radius"] = data["koi_dor"] * data["koi_srad"]
+        if predictions is None:
+            # score every KOI once; cached next to the csv until the csv or model version changes
+            predictions = load_predictions(csv_path, data)
+        self.predictions = predictions
+        # the release recorded with the on-disk predictions (None if they
+        # couldn't be written); when it changes another worker has ingested one
+        self.release = cached_release(csv_path)
+        # added column by column: join() would copy every mapped column
+        for column in self.predictions.columns:
+            data[column] = self.predictions[column].reindex(data["kepoi_name"]).to_numpy()
+        self.data = data
+
+        # index by name so lookups don't scan the table; NaNs are filled per lookup
+        self.store = KoiStore(data)
+        # prefix/trigram indexes for /exoplanets?q=
+        self.names = NameIndex(data["kepoi_name"], data["kepler_name"])
+        # sorted-column and sky indexes for /exoplanets/query (built on the unfilled data)
+        self.queries = QueryIndex(data)
+        # the listing only changes with the catalog, so encode (and gzip) it once
+        self.listing = PreencodedJSON([
+            {
+                "kepler_name": record.kepler_name,
+                "kepoi_name": record.kepoi_name,
+            }
+            for record in self.store.rows(columns=["kepler_name", "kepoi_name"]).itertuples()
+        ])
+
+    @cached_property
+    def threshold_sweep(self) -> PreencodedJSON:
+        """
+        Precision/recall/count over every threshold, from the stored
+        probabilities and koi_disposition labels; encoded on first use.
+        """
+        data = self.store.raw
+        labels = disposition_labels(data["koi_disposition"]) if "koi_disposition" in data.columns else None
+        return PreencodedJSON(threshold_sweep(data["prob_candidate"].to_numpy(), labels))
+
+    @cached_property
+    def scene(self) -> PreencodedBody:
+        """Every KOI's render parameters as packed Float32 columns; encoded on first use."""
+        return PreencodedBody(encode_float32(metric_columns(self.store.rows(columns=SOURCE_COLUMNS))), FLOAT32_MEDIA_TYPE)
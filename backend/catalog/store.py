@@ -0,0 +1,135 @@
+"""
+In-memory KOI catalog indexed by name.
+
+Lookups go through dictionaries built at load, so fetching k KOIs costs
+O(k log k) instead of a cast and scan over the whole catalog. NaNs are
+filled (text columns -> "", numeric columns -> 0, the same defaults the API
+has always returned) in the rows a lookup returns, never in the catalog
+itself: its numeric columns are memory maps shared between workers, and
+filling them would give every worker a private copy.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import pandas as pd
+
+def fill_missing(frame: pd.DataFrame) -> pd.DataFrame:
+    """frame with NaNs filled in place: "" in text columns, 0 elsewhere."""
+    for column in frame.columns[frame.isna().any().to_numpy()]:
+        fill_value = "" if frame[column].dtype == "object" else 0
+        frame[column] = frame[column].fillna(fill_value)
+    return frame
+
+class KoiStore:
+    """
+    Read-only view over the catalog with kepoi_name, kepler_name and kepid indexes.
+
+    Lookups return rows in catalog order with duplicates and unknown names
+    dropped, matching the old boolean-mask filtering.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        # shallow copy: columns may be read-only memory maps shared with
+        # other workers, so they are never copied or written here
+        frame = data.copy(deep=False)
+        frame.index = pd.RangeIndex(len(frame))
+        # the whole catalog, unfilled; use rows() for NaN-filled rows
+        self.raw = frame
+
+        self._by_kepoi_name: Dict[str, int] = {
+            str(name): position for position, name in enumerate(frame["kepoi_name"])
+        }
+        self._by_kepler_name: Dict[str, int] = {
+            name: position
+            for position, name in enumerate(frame["kepler_name"])
+            if isinstance(name, str) and name
+        }
+        self._by_kepid: Dict[int, List[int]] = {}
+        if "kepid" in frame.columns:
+            for position, kepid in enumerate(frame["kepid"]):
+                if pd.notna(kepid):
+                    self._by_kepid.setdefault(int(kepid), []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __contains__(self, kepoi_name: object) -> bool:
+        return kepoi_name in self._by_kepoi_name
+
+    def rows(self, positions: Optional[Sequence[int]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        NaN-filled copy of the rows at positions (every row by default),
+        restricted to columns if given. Only the selection is copied.
+        """
+        rows = slice(None) if positions is None else positions
+        if columns is None:
+            selected = self.raw.iloc[rows]
+        else:
+            indexer = self.raw.columns.get_indexer(columns)
+            if (indexer < 0).any():
+                raise KeyError(f"Unknown columns: {[c for c, i in zip(columns, indexer) if i < 0]}")
+            selected = self.raw.iloc[rows, indexer]
+        return fill_missing(selected.copy())
+
+    def _rows(self, positions: Iterable[int]) -> pd.DataFrame:
+        return self.rows(sorted(set(positions)))
+
+    def positions(self, kepoi_names: Iterable[str]) -> List[int]:
+        """Catalog positions of the known names, sorted and de-duplicated."""
+        lookup = self._by_kepoi_name
+        return sorted({lookup[name] for name in kepoi_names if name in lookup})
+
+    def get(self, kepoi_names: Iterable[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Rows for the given kepoi_names (only columns, if given)."""
+        return self.rows(self.positions(kepoi_names), columns)
+
+    def record(self, kepoi_name: str) -> Optional[Dict[str, Any]]:
+        """The unfilled row for kepoi_name as a dict, or None if unknown."""
+        position = self._by_kepoi_name.get(kepoi_name)
+        if position is None:
+            return None
+        return self.raw.iloc[position].to_dict()
+
+    def get_by_kepler_name(self, kepler_names: Iterable[str]) -> pd.DataFrame:
+        """Rows for the given kepler_names (e.g. "Kepler-227 b")."""
+        lookup = self._by_kepler_name
+        return self._rows(lookup[name] for name in kepler_names if name in lookup)
+
+    def get_by_kepid(self, kepids: Iterable[int]) -> pd.DataFrame:
+        """All KOIs orbiting the given Kepler target stars."""
+        lookup = self._by_kepid
+        return self._rows(
+            position for kepid in kepids for position in lookup.get(int(kepid), ())
+        )
+
+
+if __name__ == "__main__":
+    # Micro-benchmark: boolean-mask filtering vs. indexed lookup
+    import sys
+    import timeit
+    from pathlib import Path
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m backend.catalog.store /path/to/koi.csv")
+        sys.exit(64)
+
+    data = pd.read_csv(Path(sys.argv[1]).expanduser().resolve(), comment="#")
+    store = KoiStore(data)
+    names = data["kepoi_name"].astype(str).sample(frac=1.0, random_state=0).tolist()
+
+    def mask_lookup(requested):
+        selected = data[data["kepoi_name"].astype(str).isin(requested)].copy()
+        for column in selected.columns:
+            if selected[column].dtype == "object":
+                selected[column] = selected[column].fillna("")
+            else:
+                selected[column] = selected[column].fillna(0)
+        return selected
+
+    print(f"{len(store)} KOIs")
+    print(f"{'names':>6} {'mask (ms)':>10} {'store (ms)':>11}")
+    for k in (1, 100, 5000):
+        requested = names[:k]
+        runs = 20
+        mask_ms = timeit.timeit(lambda: mask_lookup(requested), number=runs) / runs * 1e3
+        store_ms = timeit.timeit(lambda: store.get(requested), number=runs) / runs * 1e3
+        print(f"{k:>6} {mask_ms:>10.3f} {store_ms:>11.3f}")
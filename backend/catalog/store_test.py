@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from backend.catalog.store import KoiStore
+
+
+def _store():
+    return KoiStore(pd.DataFrame({
+        "kepid": [10, 10, 20, 30],
+        "kepoi_name": ["K00001.01", "K00001.02", "K00002.01", "K00003.01"],
+        "kepler_name": ["Kepler-1 b", np.nan, "Kepler-2 b", np.nan],
+        "koi_teq": [300.0, np.nan, 500.0, 700.0],
+    }))
+
+
+def test_get_returns_catalog_order_without_duplicates_or_unknowns():
+    rows = _store().get(["K00003.01", "K00001.01", "nope", "K00003.01"])
+
+    assert rows["kepoi_name"].tolist() == ["K00001.01", "K00003.01"]
+
+
+def test_nans_are_filled_in_the_returned_rows():
+    store = _store()
+    rows = store.get(["K00001.02"])
+
+    assert rows.iloc[0]["kepler_name"] == ""
+    assert rows.iloc[0]["koi_teq"] == 0
+    assert store.rows([1], ["koi_teq"]).columns.tolist() == ["koi_teq"]
+    assert np.isnan(store.raw["koi_teq"].iloc[1])
+
+
+def test_catalog_columns_are_not_copied():
+    teq = np.array([300.0, np.nan, 500.0, 700.0])
+    teq.flags.writeable = False  # like a read-only memory map
+    data = pd.DataFrame({"kepoi_name": ["K1", "K2", "K3", "K4"], "kepler_name": ["a", "b", "c", "d"], "koi_teq": teq}, copy=False)
+    store = KoiStore(data)
+
+    assert np.shares_memory(store.raw["koi_teq"].to_numpy(), teq)
+    assert store.get(["K2"])["koi_teq"].tolist() == [0.0]
+
+
+def test_secondary_indexes():
+    store = _store()
+
+    assert store.get_by_kepler_name(["Kepler-2 b", ""])["kepoi_name"].tolist() == ["K00002.01"]
+    assert store.get_by_kepid([10])["kepoi_name"].tolist() == ["K00001.01", "K00001.02"]
+    assert "K00002.01" in store and len(store) == 4
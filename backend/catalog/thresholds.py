@@ -0,0 +1,83 @@
+"""
+Threshold decisions over stored model probabilities.
+
+The catalog keeps prob_candidate for every KOI, so choosing a different
+threshold never needs the model: is_candidate/confidence are one vectorized
+comparison away, and the precision/recall curve over every threshold is one
+sort plus cumulative sums.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# koi_disposition -> training label (model/artifacts/version.json);
+# FALSE POSITIVE rows weren't part of training and count as unlabelled
+LABELS = {"CANDIDATE": 1, "CONFIRMED": 0}
+
+def apply_threshold(prob_candidate: Any, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decide every probability at threshold.
+
+    Returns:
+      (is_candidate, confidence) arrays, where confidence is the probability
+      of the predicted class, as predict_row/predict_batch compute them
+    """
+    prob = np.asarray(prob_candidate, dtype=float)
+    is_candidate = prob >= threshold
+    return is_candidate, np.where(is_candidate, prob, 1.0 - prob)
+
+def disposition_labels(disposition: pd.Series) -> np.ndarray:
+    """1.0 for CANDIDATE, 0.0 for CONFIRMED, NaN for anything else."""
+    return disposition.astype(str).str.upper().map(LABELS).to_numpy(dtype=float, na_value=np.nan)
+
+def threshold_sweep(prob_candidate: Any, labels: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Precision, recall and candidate count at every distinct threshold.
+
+    Steps:
+      1) Sort the probabilities once, highest first
+      2) Cumulative sums give, at each position, how many KOIs (and how many
+         labelled positives/negatives) score at least that probability
+      3) Keep the last position of every run of equal probabilities, so each
+         threshold t reports the rows with prob_candidate >= t
+
+    labels is 1/0 per row (NaN = unlabelled, ignored by precision/recall);
+    without labels only the counts are returned. Precision is None where no
+    labelled row is flagged, recall where there are no labelled positives.
+
+    Returns:
+      {"thresholds", "count", "precision", "recall", "total", "labelled", "positives"}
+      with the curves ordered by descending threshold
+    """
+    prob = np.asarray(prob_candidate, dtype=float)
+    order = np.argsort(-prob, kind="stable")
+    sorted_prob = prob[order]
+    # last index of each run of equal probabilities
+    ends = np.flatnonzero(np.append(sorted_prob[1:] != sorted_prob[:-1], True)) if len(prob) else np.empty(0, int)
+
+    result: Dict[str, Any] = {
+        "thresholds": sorted_prob[ends].tolist(),
+        "count": (ends + 1).tolist(),
+        "total": int(len(prob)),
+    }
+    if labels is None:
+        return result
+
+    sorted_labels = np.asarray(labels, dtype=float)[order]
+    labelled = ~np.isnan(sorted_labels)
+    true_positives = np.cumsum(sorted_labels == 1)[ends]
+    flagged_labelled = np.cumsum(labelled)[ends]
+    positives = int(np.sum(sorted_labels == 1))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = true_positives / flagged_labelled
+        recall = true_positives / positives if positives else np.full(len(ends), np.nan)
+
+    result.update({
+        "precision": [None if np.isnan(p) else float(p) for p in precision],
+        "recall": [None if np.isnan(r) else float(r) for r in recall],
+        "labelled": int(labelled.sum()),
+        "positives": positives,
+    })
+    return result
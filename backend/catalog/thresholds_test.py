@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from backend.catalog.thresholds import apply_threshold, disposition_labels, threshold_sweep
+
+
+def test_apply_threshold_matches_predict_batch_decision():
+    is_candidate, confidence = apply_threshold([0.2, 0.5, 0.9], 0.5)
+
+    assert is_candidate.tolist() == [False, True, True]
+    np.testing.assert_allclose(confidence, [0.8, 0.5, 0.9])
+
+
+def test_disposition_labels():
+    labels = disposition_labels(pd.Series(["CANDIDATE", "CONFIRMED", "FALSE POSITIVE", None]))
+
+    assert labels[:2].tolist() == [1.0, 0.0]
+    assert np.isnan(labels[2:]).all()
+
+
+def test_sweep_matches_brute_force():
+    rng = np.random.default_rng(0)
+    # few distinct values, so thresholds have ties
+    prob = rng.integers(0, 20, size=500) / 20
+    labels = rng.choice([0.0, 1.0, np.nan], size=500)
+
+    sweep = threshold_sweep(prob, labels)
+
+    assert sweep["thresholds"] == sorted(set(prob.tolist()), reverse=True)
+    assert sweep["total"] == 500
+    assert sweep["labelled"] == int((~np.isnan(labels)).sum())
+    for t, count, precision, recall in zip(sweep["thresholds"], sweep["count"], sweep["precision"], sweep["recall"]):
+        flagged = prob >= t
+        assert count == flagged.sum()
+        tp = (flagged & (labels == 1)).sum()
+        assert precision == tp / (flagged & ~np.isnan(labels)).sum()
+        assert recall == tp / (labels == 1).sum()
+
+
+def test_sweep_without_labels_or_labelled_hits():
+    assert threshold_sweep([0.3, 0.7, 0.7]) == {"thresholds": [0.7, 0.3], "count": [2, 3], "total": 3}
+
+    sweep = threshold_sweep([0.9, 0.1], [np.nan, 0.0])
+    assert sweep["precision"] == [None, 0.0]
+    assert sweep["recall"] == [None, None]
+    assert threshold_sweep([])["thresholds"] == []
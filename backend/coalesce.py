@@ -0,0 +1,146 @@
+"""
+Request coalescing for model scoring.
+
+Many concurrent requests that each score one or two rows cost one model
+call each, and per-call overhead dominates. PredictionCoalescer holds rows
+for up to `window` seconds (or until `max_rows` are pending), scores them
+with a single batch call and hands every request its own slice back.
+"""
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+
+import pandas as pd
+
+BatchFn = Callable[[pd.DataFrame], pd.DataFrame]
+
+class _BatchFailed(Exception):
+    """batch_fn raised error (as opposed to run failing to call it)."""
+
+    def __init__(self, error: Exception):
+        super().__init__(error)
+        self.error = error
+
+class PredictionCoalescer:
+    """
+    Batches predict() calls made within one window into one batch_fn call.
+
+    batch_fn scores a DataFrame of raw rows and returns one result row per
+    input row, in order (e.g. predict_batch). run executes it off the event
+    loop (e.g. InferencePool.run); by default the loop's executor is used.
+    A request with max_rows or more rows is scored on its own. If batch_fn
+    raises, the batch's requests are retried one by one, so its error only
+    reaches the request that caused it. Errors from run itself (a full
+    pool, a timeout) go straight to every request in the batch: retrying
+    would only add load to a pool that is already overloaded.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        *,
+        window: float = 0.002,
+        max_rows: int = 256,
+        run: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        if max_rows <= 0:
+            raise ValueError("max_rows must be positive")
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_rows = max_rows
+        self._run = run
+        self._pending: List[Tuple[List[Dict[str, Any]], asyncio.Future]] = []
+        self._pending_rows = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # the loop only keeps weak references to tasks; hold in-flight batches here
+        self._tasks: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+
+    def _call_batch_fn(self, frame: pd.DataFrame) -> pd.DataFrame:
+        try:
+            return self.batch_fn(frame)
+        except Exception as exc:
+            raise _BatchFailed(exc) from exc
+
+    async def _score(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score rows in one batch_fn call; raises _BatchFailed if batch_fn raised."""
+        # DataFrame(), not from_records: a list of {} must stay one row per dict
+        frame = pd.DataFrame(rows, index=range(len(rows)))
+        if self._run is not None:
+            result = await self._run(self._call_batch_fn, frame)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(None, self._call_batch_fn, frame)
+        self.batches += 1
+        self.rows += len(rows)
+        return result.to_dict(orient="records")
+
+    async def predict(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Results for rows, in order, scored together with other pending requests."""
+        self.requests += 1
+        if not rows:
+            return []
+        if len(rows) >= self.max_rows:
+            try:
+                return await self._score(rows)
+            except _BatchFailed as failed:
+                raise failed.error
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((rows, future))
+        self._pending_rows += len(rows)
+        if self._pending_rows >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        if pending:
+            task = asyncio.ensure_future(self._score_pending(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _score_pending(self, pending: List[Tuple[List[Dict[str, Any]], asyncio.Future]]) -> None:
+        try:
+            results = await self._score([row for rows, _ in pending for row in rows])
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        except _BatchFailed as failed:
+            if len(pending) > 1:
+                # one bad request mustn't fail the others: score each on its own
+                await asyncio.gather(*(self._score_pending([request]) for request in pending))
+                return
+            _, future = pending[0]
+            if not future.done():
+                future.set_exception(failed.error)
+            return
+        except Exception as exc:
+            # run couldn't score the batch (PoolFull, timeout): no request is to blame
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        start = 0
+        for rows, future in pending:
+            if not future.done():
+                future.set_result(results[start:start + len(rows)])
+            start += len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1e3,
+            "max_rows": self.max_rows,
+            "requests": self.requests,
+            "batches": self.batches,
+            "rows": self.rows,
+            "rows_per_batch": self.rows / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+
+import pandas as pd
+
+from backend.coalesce import PredictionCoalescer
+
+
+def _double(calls):
+    def batch_fn(frame):
+        calls.append(len(frame))
+        return pd.DataFrame({"out": frame["x"] * 2}, index=frame.index)
+    return batch_fn
+
+
+def test_concurrent_requests_share_one_batch():
+    calls = []
+    coalescer = PredictionCoalescer(_double(calls), window=0.05)
+
+    async def main():
+        return await asyncio.gather(*[coalescer.predict([{"x": i}, {"x": -i}]) for i in range(10)])
+
+    results = asyncio.run(main())
+
+    assert calls == [20]
+    assert results[3] == [{"out": 6}, {"out": -6}]
+    assert coalescer.stats()["rows_per_batch"] == 20
+
+
+def test_flushes_early_at_max_rows():
+    calls = []
+    coalescer = PredictionCoalescer(_double(calls), window=10.0, max_rows=4)
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(*[coalescer.predict([{"x": i}]) for i in range(8)]), timeout=1.0
+        )
+
+    results = asyncio.run(main())
+
+    assert calls == [4, 4]
+    assert [r[0]["out"] for r in results] == [0, 2, 4, 6, 8, 10, 12, 14]
+
+
+def test_large_request_is_scored_alone():
+    calls = []
+    coalescer = PredictionCoalescer(_double(calls), window=10.0, max_rows=3)
+
+    async def main():
+        return await coalescer.predict([{"x": 1}, {"x": 2}, {"x": 3}])
+
+    assert [r["out"] for r in asyncio.run(main())] == [2, 4, 6]
+    assert calls == [3]
+
+
+def test_errors_only_reach_the_failing_request():
+    calls = []
+
+    def fails_on_negative(frame):
+        calls.append(len(frame))
+        if (frame["x"] < 0).any():
+            raise ValueError("bad row")
+        return pd.DataFrame({"out": frame["x"] * 2}, index=frame.index)
+
+    coalescer = PredictionCoalescer(fails_on_negative, window=0.01)
+
+    async def main():
+        requests = [coalescer.predict([{"x": 1}]), coalescer.predict([{"x": -1}]), coalescer.predict([{"x": 2}, {"x": 3}])]
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    first, failed, last = asyncio.run(main())
+
+    assert first == [{"out": 2}]
+    assert isinstance(failed, ValueError)
+    assert last == [{"out": 4}, {"out": 6}]
+    assert calls == [4, 1, 1, 2]
+
+
+def test_run_errors_reach_every_request_without_retries():
+    calls = []
+
+    class Overloaded(Exception):
+        pass
+
+    async def full_pool(fn, frame):
+        calls.append(len(frame))
+        raise Overloaded()
+
+    coalescer = PredictionCoalescer(_double([]), window=0.01, run=full_pool)
+
+    async def main():
+        requests = [coalescer.predict([{"x": 1}]), coalescer.predict([{"x": 2}]), coalescer.predict([{"x": 3}])]
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, Overloaded) for result in results)
+    assert calls == [3]
+
+
+def test_in_flight_batches_are_referenced_until_done():
+    release = threading.Event()
+
+    def blocking(frame):
+        release.wait(1.0)
+        return pd.DataFrame({"out": frame["x"]}, index=frame.index)
+
+    coalescer = PredictionCoalescer(blocking, window=0.001)
+
+    async def main():
+        request = asyncio.ensure_future(coalescer.predict([{"x": 1}]))
+        await asyncio.sleep(0.05)
+        in_flight = len(coalescer._tasks)
+        release.set()
+        result = await request
+        await asyncio.sleep(0)
+        return in_flight, result
+
+    in_flight, result = asyncio.run(main())
+    assert in_flight == 1 and result == [{"out": 1}]
+    assert not coalescer._tasks
+
+
+def test_empty_rows_are_still_scored():
+    calls = []
+
+    def batch_fn(frame):
+        calls.append(frame.shape)
+        return pd.DataFrame({"out": [len(frame.columns)] * len(frame)}, index=frame.index)
+
+    coalescer = PredictionCoalescer(batch_fn, window=0.001)
+    results = asyncio.run(coalescer.predict([{}, {}]))
+
+    assert calls == [(2, 0)]
+    assert results == [{"out": 0}, {"out": 0}]
@@ -0,0 +1,88 @@
+"""
+Chunked scoring of streamed CSV uploads.
+
+The upload is consumed a bounded number of bytes at a time: every chunk of
+complete records is parsed (with the header prepended), scored and encoded
+on its own, so neither the upload nor the response is ever held in full.
+
+A chunk that can't be scored once the response has started ends the
+stream with error_record(), since the status can no longer change.
+"""
+from __future__ import annotations
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+import io
+import json
+
+import pandas as pd
+
+# columns echoed back so results can be matched to input rows
+ID_COLUMNS = ["kepid", "kepoi_name", "kepler_name"]
+RESULT_COLUMNS = ["is_candidate", "confidence", "prob_candidate"]
+FORMATS = ("csv", "ndjson")
+
+def split_complete(buffer: bytes) -> Tuple[bytes, bytes]:
+    """
+    Split buffer after its last complete CSV record: (complete, rest).
+    A newline inside a quoted field doesn't end a record.
+    """
+    end = buffer.rfind(b"\n")
+    while end != -1 and buffer.count(b'"', 0, end) % 2:
+        end = buffer.rfind(b"\n", 0, end)
+    return buffer[:end + 1], buffer[end + 1:]
+
+async def read_header(chunks: AsyncIterator[bytes]) -> Tuple[Optional[bytes], bytes]:
+    """
+    Read up to the first line that isn't a '#' comment (the archive CSVs
+    start with a comment block). Returns (header line or None, remaining bytes).
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            if line.strip() and not line.lstrip().startswith(b"#"):
+                return line + b"\n", buffer
+    if buffer.strip() and not buffer.lstrip().startswith(b"#"):
+        return buffer + b"\n", b""
+    return None, b""
+
+def parse_header(header: bytes) -> List[str]:
+    return list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+
+def score_chunk(
+    header: bytes,
+    body: bytes,
+    first_row: int,
+    predict: Callable[[pd.DataFrame], pd.DataFrame],
+    fmt: str = "csv",
+) -> Tuple[str, int]:
+    """
+    Parse header + body, score it with predict and encode the results.
+
+    Returns (encoded text, rows in the chunk). Each output row carries its
+    0-based position in the upload ("row"), any ID_COLUMNS present in the
+    input and the prediction fields. The CSV header is only written for the
+    chunk starting at row 0.
+    """
+    frame = pd.read_csv(io.BytesIO(header + body), comment="#")
+    if frame.empty:
+        return "", 0
+
+    predictions = predict(frame)
+    out = frame[[c for c in ID_COLUMNS if c in frame.columns]].copy()
+    out.insert(0, "row", range(first_row, first_row + len(frame)))
+    for column in RESULT_COLUMNS:
+        out[column] = predictions[column].to_numpy()
+
+    if fmt == "ndjson":
+        return out.to_json(orient="records", lines=True).rstrip("\n") + "\n", len(out)
+    return out.to_csv(index=False, header=first_row == 0), len(out)
+
+def error_record(message: str, fmt: str = "csv") -> str:
+    """
+    Last line of a stream that failed part way: {"error": message} in
+    NDJSON, a "# error: message" comment line in CSV.
+    """
+    if fmt == "ndjson":
+        return json.dumps({"error": message}) + "\n"
+    return "# error: " + " ".join(message.splitlines()) + "\n"
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import pandas as pd
+
+from backend.csv_stream import read_header, score_chunk, split_complete
+
+
+def _fake_predict(frame):
+    prob = frame["koi_period"] / 10
+    return pd.DataFrame({"is_candidate": prob >= 0.5, "confidence": prob, "prob_candidate": prob})
+
+
+def test_split_complete_keeps_partial_record():
+    assert split_complete(b"1,2\n3,4\n5,") == (b"1,2\n3,4\n", b"5,")
+    assert split_complete(b"no newline yet") == (b"", b"no newline yet")
+
+
+def test_split_complete_ignores_newlines_in_quotes():
+    complete, rest = split_complete(b'1,"a\nb"\n2,"c\nd')
+    assert complete == b'1,"a\nb"\n'
+    assert rest == b'2,"c\nd'
+
+
+def test_read_header_skips_comment_block():
+    async def chunks():
+        for piece in (b"# archive\n# export", b"\nkepoi_name,koi_pe", b"riod\nK1,2.0\n"):
+            yield piece
+
+    header, rest = asyncio.run(read_header(chunks()))
+    assert header == b"kepoi_name,koi_period\n"
+    assert rest == b"K1,2.0\n"
+
+
+def test_score_chunk_numbers_rows_and_writes_header_once():
+    header = b"kepoi_name,koi_period,koi_prad\n"
+
+    first, count = score_chunk(header, b"K1,2.0,1\nK2,8.0,1\n", 0, _fake_predict)
+    later, _ = score_chunk(header, b"K3,6.0,1\n", 2, _fake_predict)
+
+    assert count == 2
+    assert first.splitlines()[0] == "row,kepoi_name,is_candidate,confidence,prob_candidate"
+    assert first.splitlines()[2].startswith("1,K2,True,0.8")
+    assert later.splitlines() == ["2,K3,True,0.6,0.6"]
+
+
+def test_score_chunk_ndjson():
+    text, _ = score_chunk(b"kepid,koi_period\n", b"7,1.0\n", 5, _fake_predict, fmt="ndjson")
+
+    assert [json.loads(line) for line in text.splitlines()] == [
+        {"row": 5, "kepid": 7, "is_candidate": False, "confidence": 0.1, "prob_candidate": 0.1}
+    ]
@@ -0,0 +1,83 @@
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from formatter import build_profile
+from game_objects.determine_lifeform import generate_lifeforms
+from game_objects.determine_planet_attributes import classify_environment, classify_habitability
+
+# Streams planet profiles for a whole catalog instead of one JSON file per planet.
+
+DEFAULT_CHUNKSIZE = 2000
+
+def iter_profiles(df, environments=None):
+    """
+    Yields one profile per row of df, in order, as
+    {"kepoi_name", "kepler_name", **build_profile(...)}.
+
+    Habitability, environment and lifeform traits are computed column-wise
+    for the whole frame; only the final dict assembly is per row.
+    environments is passed through to generate_lifeforms.
+    """
+    habitable = classify_habitability(df).tolist()
+    environment = classify_environment(df).tolist()
+    traits = generate_lifeforms(df, environments)
+    trait_rows = zip(
+        traits["size"].tolist(),
+        traits["color"].tolist(),
+        traits["environment"].tolist(),
+        traits["communication"].tolist(),
+        traits["diet"].tolist(),
+    )
+    kepoi_names = df["kepoi_name"].tolist() if "kepoi_name" in df else [None] * len(df)
+    kepler_names = df["kepler_name"].tolist() if "kepler_name" in df else [None] * len(df)
+
+    for kepoi_name, kepler_name, is_habitable, env, (size, color, life_env, communication, diet) in zip(
+        kepoi_names, kepler_names, habitable, environment, trait_rows
+    ):
+        profile = build_profile(is_habitable, env, {
+            "size": size,
+            "coloration": color,
+            "lifeform environment": life_env,
+            "communication method": communication,
+            "diet": diet,
+        })
+        yield {
+            "kepoi_name": kepoi_name,
+            "kepler_name": kepler_name if isinstance(kepler_name, str) else None,
+            **profile,
+        }
+
+def iter_catalog_profiles(csv_path, chunksize=DEFAULT_CHUNKSIZE, environments=None):
+    """
+    Reads the catalog csv chunksize rows at a time and yields profiles, so
+    memory stays flat no matter how large the catalog is.
+    """
+    for chunk in pd.read_csv(csv_path, comment="#", chunksize=chunksize):
+        yield from iter_profiles(chunk, environments)
+
+def export_profiles(csv_path, output_path="planet_profiles.jsonl", chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Writes a profile for every planet in csv_path to a single JSON Lines
+    file (one compact JSON object per line). Returns the number of profiles.
+    """
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    with open(output_file, "w", buffering=1 << 20) as f:
+        for profile in iter_catalog_profiles(csv_path, chunksize):
+            f.write(json.dumps(profile, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python exporter.py /path/to/cumulative.csv [output.jsonl]")
+        sys.exit(64)
+
+    output = sys.argv[2] if len(sys.argv) > 2 else "planet_profiles.jsonl"
+    print(f"Wrote {export_profiles(sys.argv[1], output)} profiles to {output}")
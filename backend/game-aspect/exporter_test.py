@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from exporter import export_profiles, iter_profiles
+from formatter import format_to_json
+from game_objects.determine_lifeform import Lifeform, classify_lifeform_environment
+from game_objects.determine_planet_attributes import Planet
+
+CSV_FILE_NAME = Path(__file__).resolve().parent / "cumulative_2025.10.04_13.06.32.csv"
+
+
+def test_profiles_match_format_to_json(tmp_path):
+    df = pd.read_csv(CSV_FILE_NAME).iloc[300:400]
+    environments = classify_lifeform_environment(df)
+
+    for (_, row), env, profile in zip(df.iterrows(), environments, iter_profiles(df)):
+        row = row.to_dict()
+        expected = format_to_json(Planet(row), Lifeform(row, 0, "", "", "", env), output_path=tmp_path / "p.json")
+
+        assert profile["kepoi_name"] == row["kepoi_name"]
+        assert {k: v for k, v in profile.items() if k not in ("kepoi_name", "kepler_name")} == expected
+
+
+def test_export_writes_one_line_per_planet_across_chunks(tmp_path):
+    csv_path = tmp_path / "catalog.csv"
+    pd.read_csv(CSV_FILE_NAME).head(25).to_csv(csv_path, index=False)
+    output = tmp_path / "profiles.jsonl"
+
+    count = export_profiles(csv_path, output, chunksize=10)
+
+    lines = output.read_text().splitlines()
+    assert count == len(lines) == 25
+    assert all("text_description" in json.loads(line) for line in lines)
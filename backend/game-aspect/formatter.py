@@ -1,6 +1,9 @@
 import json;
 from pathlib import Path;
 
+# Lifeform parameter names, in output order
+PROFILE_TRAITS = ["size", "coloration", "lifeform environment", "communication method", "diet"]
+
 def format_to_json(exoplanet, lifeform, output_path = "planet_profile.json"):
     """
     Takes Exoplanet and Lifeform objects and formats a JSON containing:
@@ -9,22 +12,54 @@ def format_to_json(exoplanet, lifeform, output_path = "planet_profile.json"):
     - optional placeholder images
     """
 
-    # --- Build Text Description -- #
+    # --- Evaluate each attribute once --- #
+    habitable = exoplanet.get_habitable()
     environment_text = exoplanet.get_environment()
-    if exoplanet.get_habitable():
+    traits = None
+    if habitable:
+        traits = {
+            "size": lifeform.get_size(),
+            "coloration": lifeform.get_color(),
+            "lifeform environment": lifeform.get_environment(),
+            "communication method": lifeform.get_communication_method(),
+            "diet": lifeform.get_diet(),
+        }
+
+    data = build_profile(habitable, environment_text, traits)
+
+    # --- Save JSON to file ---
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w") as f:
+        json.dump(data, f, indent=4)
+
+    return data
+
+def build_profile(habitable, environment_text, traits):
+    """
+    Assembles the profile dictionary from already computed attributes.
+
+    traits maps each PROFILE_TRAITS name to its value; it is ignored (and
+    every lifeform parameter is None) when the planet is not habitable.
+    """
+    if not habitable:
+        traits = dict.fromkeys(PROFILE_TRAITS)
+
+    # --- Build Text Description -- #
+    if habitable:
         habitability_text = "This planet is habitable and may support life"
         life_text = (
         #    f"Lifeform: {lifeform.lifeform}\n"
-            f"Size: {lifeform.get_size()}\n"
+            f"Size: {traits['size']}\n"
         #    f"Strength: {lifeform.strength}\n"
-            f"Coloration: {lifeform.get_color()}\n"
+            f"Coloration: {traits['coloration']}\n"
         #    f"Migration pattern: {lifeform.migration}\n"
         #    f"Radiation shielding: {'Yes' if lifeform.radiationSheilding else 'No'}\n"
         #    f"Breathing method: {lifeform.breathingMethod}\n"
         #    f"Locomotion: {lifeform.locomotion}\n"
-            f"Lifeform environment: {lifeform.get_environment()}"
-            f"Communication method: {lifeform.get_communication_method()}\n"
-            f"Diet: {lifeform.get_diet()}"
+            f"Lifeform environment: {traits['lifeform environment']}"
+            f"Communication method: {traits['communication method']}\n"
+            f"Diet: {traits['diet']}"
         )
     else:
         habitability_text = "This planet is not habitable."
@@ -42,29 +77,23 @@ def format_to_json(exoplanet, lifeform, output_path = "planet_profile.json"):
         #},
         "parameters": {
             "exoplanet": {
-                "habitable": exoplanet.get_habitable(),
-                "environment": exoplanet.get_environment()
+                "habitable": habitable,
+                "environment": environment_text
             },
             "lifeform": {
                 #"lifeform": lifeform.lifeform if exoplanet.habitable else None,
-                "size": lifeform.get_size() if exoplanet.get_habitable() else None,
+                "size": traits["size"],
                 #"strength": lifeform.strength if exoplanet.habitable else None,
-                "coloration": lifeform.get_color() if exoplanet.get_habitable() else None,
+                "coloration": traits["coloration"],
                 #"migration": lifeform.migration if exoplanet.habitable else None,
                 #"radiationSheilding": lifeform.radiationSheilding if exoplanet.habitable else None,
                 #"breathingMethod": lifeform.breathingMethod if exoplanet.habitable else None,
                 #"locomotion": lifeform.locomotion if exoplanet.habitable else None,
-                "lifeform environment": lifeform.get_environment() if exoplanet.get_habitable() else None,
-                "communication method": lifeform.get_communication_method() if exoplanet.get_habitable() else None,
-                "diet": lifeform.get_diet() if exoplanet.get_habitable() else None
+                "lifeform environment": traits["lifeform environment"],
+                "communication method": traits["communication method"],
+                "diet": traits["diet"]
             }
         }
     }
 
-    # --- Save JSON to file ---
-    output_file = Path(output_path)
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, "w") as f:
-        json.dump(data, f, indent=4)
-
     return data
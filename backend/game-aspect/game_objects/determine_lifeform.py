@@ -1,6 +1,141 @@
 import pandas as pd
 import numpy as np
-import math
+
+# --- Column-wise trait generation ---
+# These operate on a whole DataFrame of cumulative-table rows at once;
+# Lifeform computes its trait bundle through them with its row as
+# one-element columns.
+
+# Environment multiplier on lifeform size
+ENV_SIZE_FACTORS = {
+    "aquatic": 1.3,
+    "forest": 1.0,
+    "desert": 0.8,
+    "terrestrial": 1.0
+}
+
+TRAITS = ["size", "color", "environment", "communication", "diet"]
+LIFEFORM_COLUMNS = ["koi_prad", "koi_teq", "koi_insol", "koi_steff"]
+
+def _column(df, name, default):
+    """
+    Float array for df[name] with NaNs (or the whole column, if absent)
+    replaced by default.
+    """
+    if name not in df:
+        return np.full(len(df), default, dtype=float)
+    values = np.asarray(df[name], dtype=float)
+    return np.where(np.isnan(values), default, values)
+
+def _row_columns(row, columns):
+    """
+    A single dict/Series row as {column: 1-element array}, with absent keys
+    as NaN. Much cheaper than building a one-row DataFrame.
+    """
+    return {name: np.array([row.get(name, np.nan)], dtype=float) for name in columns}
+
+def classify_lifeform_environment(df):
+    """
+    Vectorized Lifeform.get_environment: the most likely environment type
+    for each row, from koi_teq, koi_prad and koi_insol ('unknown' when any
+    of them is missing).
+
+    Returns
+    -------
+    np.ndarray of str, one entry per row.
+    """
+    teq = _column(df, "koi_teq", np.nan)
+    prad = _column(df, "koi_prad", np.nan)
+    insol = _column(df, "koi_insol", np.nan)
+
+    temperate = (teq > 200) & (teq < 320)
+    environment = np.select(
+        [
+            teq >= 700,                                    # volcanic / molten world
+            prad > 3.0,                                    # gas giant
+            (teq <= 200) | (insol < 0.1),                  # ice world
+            (teq > 320) | (insol > 2.0),                   # desert world
+            (prad >= 1.5) & (prad <= 3.0) & temperate,     # aquatic world
+            (prad < 1.5) & temperate,                      # earth-like terrestrial world
+        ],
+        ["volcanic", "gas_giant", "ice", "desert", "aquatic", "terrestrial"],
+        default="unknown",
+    ).astype(object)
+    environment[np.isnan(teq) | np.isnan(prad) | np.isnan(insol)] = "unknown"
+    return environment
+
+def generate_lifeforms(df, environments=None, base_size=2.0):
+    """
+    Compute every lifeform trait for all rows in one pass.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Rows of the Kepler cumulative table.
+    environments : scalar, array-like or None
+        Environment used for size, communication and diet (the Lifeform
+        constructor's ``environment``). None uses each row's classified
+        lifeform environment.
+    base_size : float
+        Base lifeform size before planet adjustments.
+
+    Returns
+    -------
+    pandas.DataFrame indexed like df with columns
+    size, color, environment, communication, diet.
+    """
+    return pd.DataFrame(_traits(df, environments, base_size), index=df.index, columns=TRAITS)
+
+def _traits(df, environments, base_size):
+    """generate_lifeforms as a dict of per-trait arrays."""
+    environment = classify_lifeform_environment(df)
+    if environments is None:
+        size_environment = environment
+    else:
+        size_environment = np.broadcast_to(np.asarray(environments, dtype=object), environment.shape)
+    aquatic = size_environment == "aquatic"
+
+    # --- Size: planet radius, temperature and insolation ---
+    planet_radius = _column(df, "koi_prad", 1.0)
+    planet_temp = _column(df, "koi_teq", 288.0)
+    stellar_energy = _column(df, "koi_insol", 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gravity_factor = (1 / planet_radius) ** 0.5
+        temp_factor = (288 / planet_temp) ** 0.3
+        energy_factor = np.log10(stellar_energy + 1) * 0.8 + 0.6
+    env_factor = np.array([ENV_SIZE_FACTORS.get(env, 1.0) for env in size_environment], dtype=float)
+    size = np.maximum(base_size * gravity_factor * temp_factor * env_factor * energy_factor, 0.1)
+
+    # --- Color: stellar temperature and insolation ---
+    star_temp = _column(df, "koi_steff", 5500)
+    insolation = stellar_energy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.clip((star_temp - 3000) / 4000 * 255, 0, 255).astype(int)
+        g = np.clip((1 / (insolation + 1)) * 200, 0, 255).astype(int)
+        b = np.clip((insolation / 2) * 100, 0, 255).astype(int)
+    color = [str(rgb) for rgb in zip(r.tolist(), g.tolist(), b.tolist())]
+
+    # --- Communication: environment, temperature and size ---
+    communication = np.select(
+        [aquatic, planet_temp > 350, size > 3],
+        ["sonar or pressure waves", "electromagnetic or chemical signals", "low-frequency sound"],
+        default="vocal communication",
+    ).astype(object)
+
+    # --- Diet: environment, energy availability and temperature ---
+    diet = np.select(
+        [aquatic & (size > 3), aquatic, stellar_energy > 2, planet_temp < 250],
+        ["omnivore", "herbivore", "carnivore", "herbivore"],
+        default="omnivore",
+    ).astype(object)
+
+    return {
+        "size": size,
+        "color": color,
+        "environment": environment,
+        "communication": communication,
+        "diet": diet,
+    }
 
 class Lifeform:
 
@@ -18,9 +153,10 @@ class Lifeform:
         self._color = color
         self._communication = communication
         self._diet = diet
+        self._traits = None
 
     # --- Getters and Setters ---
-    
+
     def set_size(self, size):
         self.size = size
 
@@ -39,6 +175,7 @@ class Lifeform:
     def set_base_size(self, value):
         if value > 0:
             self._base_size = value
+            self._traits = None
         else:
             raise ValueError("Base size must be positive.")
 
@@ -48,92 +185,41 @@ class Lifeform:
     def get_base_size(self):
         return self._base_size
 
+    def get_traits(self):
+        """
+        All generated traits (size, color, environment, communication, diet),
+        computed together once per lifeform and reused by every getter.
+        """
+        if self._traits is None:
+            columns = _row_columns(self.row, LIFEFORM_COLUMNS)
+            traits = _traits(columns, [self._environment], self._base_size)
+            self._traits = {name: values[0] for name, values in traits.items()}
+            self._traits["size"] = float(self._traits["size"])
+        return self._traits
+
     def get_size(self):
         """
         Estimate lifeform size using planet radius, temperature, and insolation.
         """
-        row = self.row
-        planet_radius = row.get("koi_prad", 1.0)
-        planet_temp = row.get("koi_teq", 288.0)
-        stellar_energy = row.get("koi_insol", 1.0)
-
-        # Replace NaNs with defaults
-        if pd.isna(planet_radius): planet_radius = 1.0
-        if pd.isna(planet_temp): planet_temp = 288.0
-        if pd.isna(stellar_energy): stellar_energy = 1.0
-
-        # Gravity factor approximation
-        gravity_factor = (1 / planet_radius) ** 0.5
-
-        # Temperature factor — cooler planets → smaller, slower life
-        temp_factor = (288 / planet_temp) ** 0.3
-
-        # Stellar energy affects available biomass
-        energy_factor = math.log10(stellar_energy + 1) * 0.8 + 0.6
-
-        # Environment adjustment
-        env_factor = {
-            "aquatic": 1.3,
-            "forest": 1.0,
-            "desert": 0.8,
-            "terrestrial": 1.0
-        }.get(self._environment, 1.0)
-
-        size = self._base_size * gravity_factor * temp_factor * env_factor * energy_factor
-        return max(size, 0.1)
+        return self.get_traits()["size"]
 
     def get_color(self):
         """
         Generate a color based on stellar temperature and insolation.
         """
-        row = self.row
-        star_temp = row.get("koi_steff", 5500)
-        insolation = row.get("koi_insol", 1.0)
-
-        if pd.isna(star_temp): star_temp = 5500
-        if pd.isna(insolation): insolation = 1.0
-
-        r = int(min(max((star_temp - 3000) / 4000 * 255, 0), 255))
-        g = int(min(max((1 / (insolation + 1)) * 200, 0), 255))
-        b = int(min(max((insolation / 2) * 100, 0), 255))
-
-        return str((r, g, b))
+        return self.get_traits()["color"]
 
     def get_communication_method(self):
         """
         Determine communication method based on environment and planet temp.
         """
-        temp = self.row.get("koi_teq", 288)
-        size = self.get_size()
-
-        if self._environment == "aquatic":
-            return "sonar or pressure waves"
-        elif temp > 350:
-            return "electromagnetic or chemical signals"
-        elif size > 3:
-            return "low-frequency sound"
-        else:
-            return "vocal communication"
+        return self.get_traits()["communication"]
 
     def get_diet(self):
         """
         Infer diet type from temperature and energy availability.
         """
-        temp = self.row.get("koi_teq", 288)
-        insol = self.row.get("koi_insol", 1.0)
-        size = self.get_size()
-
-        if self._environment == "aquatic":
-            if size > 3:
-                return "omnivore"
-            else:
-                return "herbivore"
-        elif insol > 2:
-            return "carnivore"
-        elif temp < 250:
-            return "herbivore"
-        else:
-            return "omnivore"
+        return self.get_traits()["diet"]
 
     def get_environment(self):
         """
@@ -145,44 +231,7 @@ class Lifeform:
             - koi_prad: Planetary radius (Earth radii)
             - koi_insol: Stellar flux relative to Earth
         """
-
-        # Safely extract relevant attributes
-        teq = self.row.get('koi_teq', np.nan)
-        prad = self.row.get('koi_prad', np.nan)
-        insol = self.row.get('koi_insol', np.nan)
-
-        # Handle missing or NaN data
-        if np.isnan(teq) or np.isnan(prad) or np.isnan(insol):
-            self.environment = 'unknown'
-            return self.environment
-
-        # Volcanic / molten world — very high surface temp
-        if teq >= 700:
-            self.environment = 'volcanic'
-
-        # Gas giant — large radius, low or moderate temp
-        elif prad > 3.0:
-            self.environment = 'gas_giant'
-
-        # Ice world — low temp or low insolation
-        elif teq <= 200 or insol < 0.1:
-            self.environment = 'ice'
-
-        # Desert world — hot and high solar flux
-        elif teq > 320 or insol > 2.0:
-            self.environment = 'desert'
-
-        # Aquatic world — medium-large, temperate zone
-        elif 1.5 <= prad <= 3.0 and 200 < teq < 320:
-            self.environment = 'aquatic'
-
-        # Earth-like terrestrial world — small and temperate
-        elif prad < 1.5 and 200 < teq < 320:
-            self.environment = 'terrestrial'
-
-        else:
-            self.environment = 'unknown'
-
+        self.environment = self.get_traits()["environment"]
         return self.environment
 
     def __str__(self):
@@ -194,9 +243,10 @@ class Lifeform:
                 f"  Communication: {self.get_communication_method()}\n"
                 f"  Diet: {self.get_diet()}")
 
-# --- Example usage ---
-df = pd.read_csv("cumulative_2025.10.04_13.06.32.csv")
-first_planet = df.iloc[0]
+if __name__ == "__main__":
+    # --- Example usage ---
+    df = pd.read_csv("cumulative_2025.10.04_13.06.32.csv")
+    first_planet = df.iloc[0]
 
-creature = Lifeform(first_planet, 0, str((0,0,0)), "None", "None", 0)
-print(creature)
+    creature = Lifeform(first_planet, 0, str((0,0,0)), "None", "None", 0)
+    print(creature)
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 import pandas as pd
 from formatter import format_to_json
 
@@ -33,6 +34,113 @@ from formatter import format_to_json
 #     def get_environment(self):
 #         return self.environment
 
+# --- Column-wise classification ---
+# These operate on a whole DataFrame of cumulative-table rows at once;
+# Planet delegates to them with its row as one-element columns.
+
+PLANET_COLUMNS = ["koi_teq", "koi_prad", "koi_insol", "koi_steff", "pl_bmasse"]
+
+def _column(df, name, default):
+    """
+    Float array for df[name] with NaNs (or the whole column, if absent)
+    replaced by default.
+    """
+    if name not in df:
+        return np.full(len(df), default, dtype=float)
+    values = np.asarray(df[name], dtype=float)
+    return np.where(np.isnan(values), default, values)
+
+def _row_columns(row, columns):
+    """
+    A single dict/Series row as {column: 1-element array}, with absent keys
+    as NaN. Much cheaper than building a one-row DataFrame.
+    """
+    return {name: np.array([row.get(name, np.nan)], dtype=float) for name in columns}
+
+def classify_habitability(df):
+    """
+    Vectorized habitability check, see Planet.get_habitable for the criteria.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Rows of the Kepler cumulative table.
+
+    Returns
+    -------
+    np.ndarray of bool, one entry per row.
+    """
+    koi_teq = _column(df, "koi_teq", 288)
+    koi_prad = _column(df, "koi_prad", 1.0)
+    koi_insol = _column(df, "koi_insol", 1.0)
+    koi_steff = _column(df, "koi_steff", 5778)
+
+    # Approximate planet mass using radius^3.7 (negative radii give NaN, which fails every check)
+    with np.errstate(invalid="ignore"):
+        pl_bmasse = koi_prad ** 3.7
+
+    return (
+        (koi_teq >= 240) & (koi_teq <= 320)               # liquid water range
+        & (koi_prad >= 0.5) & (koi_prad <= 1.8)           # size
+        & (pl_bmasse >= 0.3) & (pl_bmasse <= 5.0)         # mass
+        & (koi_insol >= 0.35) & (koi_insol <= 1.75)       # stellar energy flux
+        & (koi_steff >= 3700) & (koi_steff <= 7200)       # F, G or K star
+    )
+
+# ENVIRONMENTS[planet_type, temp_class]
+# planet_type: 0 Rocky, 1 Mini-Neptune, 2 Giant, 3 Unclassified
+# temp_class:  0 Cold, 1 Temperate, 2 Hot
+ENVIRONMENTS = np.array([
+    ["Frozen rocky", "Earth-like", "Hot rocky"],
+    ["Cold Mini-Neptune", "Temperate Mini-Neptune", "Hot Mini-Neptune"],
+    ["Ice Giant", "Gas Giant", "Hot Jupiter"],
+    ["Unclassified", "Unclassified", "Unclassified"],
+], dtype=object)
+
+def classify_environment(df):
+    """
+    Vectorized environment classification, see Planet.get_environment for
+    the classes.
+
+    Planet type: Rocky (radius < 1.8 and mass < 5), Mini-Neptune
+    (1.8 <= radius < 3.5), Giant (radius >= 3.5 or mass >= 10).
+    Temperature: Cold (< 180 K), Temperate (<= 320 K), Hot.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Rows of the Kepler cumulative table (pl_bmasse is used when present).
+
+    Returns
+    -------
+    np.ndarray of str, one entry per row.
+    """
+    pl_rade = _column(df, "koi_prad", 1.0)
+    pl_eqt = _column(df, "koi_teq", 288)
+
+    # Estimate mass from radius where it is not given
+    with np.errstate(invalid="ignore"):
+        estimated_mass = np.select(
+            [pl_rade < 1.8, pl_rade < 3.5],
+            [pl_rade ** 3, pl_rade ** 2.06],   # rocky M ~ R^3, mini-Neptune M ~ R^2.06
+            default=10.0,                      # giant planets: default mass
+        )
+    pl_bmasse = _column(df, "pl_bmasse", np.nan)
+    pl_bmasse = np.where(np.isnan(pl_bmasse), estimated_mass, pl_bmasse)
+
+    planet_type = np.select(
+        [
+            (pl_rade < 1.8) & (pl_bmasse < 5),
+            (pl_rade >= 1.8) & (pl_rade < 3.5),
+            (pl_rade >= 3.5) | (pl_bmasse >= 10),
+        ],
+        [0, 1, 2],
+        default=3,
+    )
+    temp_class = np.select([pl_eqt < 180, pl_eqt <= 320], [0, 1], default=2)
+
+    return ENVIRONMENTS[planet_type, temp_class]
+
 class Planet:
 
     def __init__(self, csv_row):
@@ -44,47 +152,14 @@ class Planet:
         NASA Kepler 'cumulative' table columns.
 
         Output: Boolean — True if potentially habitable, False otherwise.
-        """
-
-        row = self.row
-
-        # Extract key attributes with fallback defaults
-        koi_teq = row.get("koi_teq", 288)      # equilibrium temp (K)
-        koi_prad = row.get("koi_prad", 1.0)    # radius (Earth radii)
-        koi_insol = row.get("koi_insol", 1.0)  # insolation (Earth flux)
-        koi_steff = row.get("koi_steff", 5778) # star temp (K)
-
-        # Handle NaN values
-        if pd.isna(koi_teq): koi_teq = 288
-        if pd.isna(koi_prad): koi_prad = 1.0
-        if pd.isna(koi_insol): koi_insol = 1.0
-        if pd.isna(koi_steff): koi_steff = 5778
-
-        # Approximate planet mass using radius^3.7 (rough Earth-like scaling)
-        pl_bmasse = koi_prad ** 3.7
 
-        # --- 1. Temperature check (liquid water range) ---
-        if koi_teq < 240 or koi_teq > 320:
-            return False
-
-        # --- 2. Size and mass check ---
-        if not (0.5 <= koi_prad <= 1.8):
-            return False
-        if not (0.3 <= pl_bmasse <= 5.0):
-            return False
-
-        # --- 3. Stellar energy flux ---
-        # Earth insolation = 1.0; habitable range roughly 0.35–1.75
-        if not (0.35 <= koi_insol <= 1.75):
-            return False
-
-        # --- 4. Stellar temperature check ---
-        # Prefer F, G, or K stars (3700–7200 K)
-        if not (3700 <= koi_steff <= 7200):
-            return False
-
-        # All conditions passed → potentially habitable
-        return True
+        Criteria (missing values fall back to Earth/Sun defaults):
+          1. Equilibrium temperature 240-320 K (liquid water range)
+          2. Radius 0.5-1.8 Earth radii and mass (radius^3.7) 0.3-5 Earth masses
+          3. Insolation 0.35-1.75 Earth flux
+          4. Stellar temperature 3700-7200 K (F, G or K star)
+        """
+        return bool(classify_habitability(_row_columns(self.row, PLANET_COLUMNS))[0])
 
     def get_environment(self):
         """
@@ -116,102 +191,30 @@ class Planet:
                 Hot Jupiter — large/giant, hot
             Unclassified — any planet that doesn’t fit the above thresholds (rare or extreme/missing data)
         """
-        row = self.row
-
-        # --- Extract values with defaults ---
-        # Radius in Earth radii
-        pl_rade = row.get("koi_prad", 1.0)
-        pl_rade = float(pl_rade) if not pd.isna(pl_rade) else 1.0
-
-        # Equilibrium temperature in K
-        pl_eqt = row.get("koi_teq", 288)
-        pl_eqt = float(pl_eqt) if not pd.isna(pl_eqt) else 288
-
-        # Mass in Earth masses
-        pl_bmasse = row.get("pl_bmasse", None)
-        if pl_bmasse is None or pd.isna(pl_bmasse):
-            # Estimate mass from radius
-            if pl_rade < 1.8:
-                # Rocky planet approximation: M ~ R^3
-                pl_bmasse = pl_rade ** 3
-            elif pl_rade < 3.5:
-                # Mini-Neptune approximation: M ~ R^2.06
-                pl_bmasse = pl_rade ** 2.06
-            else:
-                # Giant planets: default mass
-                pl_bmasse = 10.0
-        else:
-            pl_bmasse = float(pl_bmasse)
-
-        # --- Planet type by size and mass ---
-        if pl_rade < 1.8 and pl_bmasse < 5:
-            planet_type = "Rocky"
-        elif 1.8 <= pl_rade < 3.5:
-            planet_type = "Mini-Neptune"
-        elif pl_rade >= 3.5 or pl_bmasse >= 10:
-            planet_type = "Giant"
-        else:
-            planet_type = "Unclassified"
-
-        # --- Thermal class based on equilibrium temperature ---
-        if pl_eqt < 180:
-            temp_class = "Cold"
-        elif pl_eqt <= 320:
-            temp_class = "Temperate"
-        else:
-            temp_class = "Hot"
-
-        # --- Combine into concise environment classes ---
-        if planet_type == "Rocky":
-            if temp_class == "Cold":
-                env = "Frozen rocky"
-            elif temp_class == "Temperate":
-                env = "Earth-like"
-            else:
-                env = "Hot rocky"
-        elif planet_type == "Mini-Neptune":
-            if temp_class == "Cold":
-                env = "Cold Mini-Neptune"
-            elif temp_class == "Temperate":
-                env = "Temperate Mini-Neptune"
-            else:
-                env = "Hot Mini-Neptune"
-        elif planet_type == "Giant":
-            if temp_class == "Cold":
-                env = "Ice Giant"
-            elif temp_class == "Temperate":
-                env = "Gas Giant"
-            else:
-                env = "Hot Jupiter"
-        else:
-            env = "Unclassified"
-
-        return env
+        return str(classify_environment(_row_columns(self.row, PLANET_COLUMNS))[0])
     
     def __str__(self):
         planet_name = self.row.get("kepler_name", "Unknown planet")
         return f"{planet_name}: Habitable? {self.get_habitable()}"
 
-df = pd.read_csv("cumulative_2025.10.04_13.06.32.csv")
-first_planet = df.iloc[0]
-
-# planet = Planet(first_planet)
-# print(planet)
-
-# print("testing get_environment: \n")
-# for i in range(500):
-#     row_dict = df.iloc[i].to_dict()
-#     planet = Planet(row_dict)
-#     if planet.get_habitable(): 
-#         env = planet.get_environment()
-#         print(f"Row {i+1}: {env}")
-
-## for testing purposes row 330 should be habitable / earthlike
+if __name__ == "__main__":
+    df = pd.read_csv("cumulative_2025.10.04_13.06.32.csv")
+    first_planet = df.iloc[0]
 
-# row_dict = df.iloc[330].to_dict()
-# planet = Planet(row_dict)
-# print(planet.get_habitable())
-# print(planet.get_environment())
+    # planet = Planet(first_planet)
+    # print(planet)
 
+    # print("testing get_environment: \n")
+    # for i in range(500):
+    #     row_dict = df.iloc[i].to_dict()
+    #     planet = Planet(row_dict)
+    #     if planet.get_habitable(): 
+    #         env = planet.get_environment()
+    #         print(f"Row {i+1}: {env}")
 
+    ## for testing purposes row 330 should be habitable / earthlike
 
+    # row_dict = df.iloc[330].to_dict()
+    # planet = Planet(row_dict)
+    # print(planet.get_habitable())
+    # print(planet.get_environment())
@@ -0,0 +1,126 @@
+import math
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from game_objects.determine_lifeform import Lifeform, generate_lifeforms
+
+CSV_FILE_NAME = Path(__file__).resolve().parent / "cumulative_2025.10.04_13.06.32.csv"
+
+
+# --- Reference per-row implementations (the original scalar logic) ---
+
+def reference_size(row, environment, base_size=2.0):
+    planet_radius = row.get("koi_prad", 1.0)
+    planet_temp = row.get("koi_teq", 288.0)
+    stellar_energy = row.get("koi_insol", 1.0)
+    if pd.isna(planet_radius): planet_radius = 1.0
+    if pd.isna(planet_temp): planet_temp = 288.0
+    if pd.isna(stellar_energy): stellar_energy = 1.0
+    gravity_factor = (1 / planet_radius) ** 0.5
+    temp_factor = (288 / planet_temp) ** 0.3
+    energy_factor = math.log10(stellar_energy + 1) * 0.8 + 0.6
+    env_factor = {"aquatic": 1.3, "forest": 1.0, "desert": 0.8, "terrestrial": 1.0}.get(environment, 1.0)
+    return max(base_size * gravity_factor * temp_factor * env_factor * energy_factor, 0.1)
+
+
+def reference_color(row):
+    star_temp = row.get("koi_steff", 5500)
+    insolation = row.get("koi_insol", 1.0)
+    if pd.isna(star_temp): star_temp = 5500
+    if pd.isna(insolation): insolation = 1.0
+    r = int(min(max((star_temp - 3000) / 4000 * 255, 0), 255))
+    g = int(min(max((1 / (insolation + 1)) * 200, 0), 255))
+    b = int(min(max((insolation / 2) * 100, 0), 255))
+    return str((r, g, b))
+
+
+def reference_communication(row, environment, size):
+    temp = row.get("koi_teq", 288)
+    if environment == "aquatic":
+        return "sonar or pressure waves"
+    elif temp > 350:
+        return "electromagnetic or chemical signals"
+    elif size > 3:
+        return "low-frequency sound"
+    return "vocal communication"
+
+
+def reference_diet(row, environment, size):
+    temp = row.get("koi_teq", 288)
+    insol = row.get("koi_insol", 1.0)
+    if environment == "aquatic":
+        return "omnivore" if size > 3 else "herbivore"
+    elif insol > 2:
+        return "carnivore"
+    elif temp < 250:
+        return "herbivore"
+    return "omnivore"
+
+
+def reference_environment(row):
+    teq = row.get("koi_teq", np.nan)
+    prad = row.get("koi_prad", np.nan)
+    insol = row.get("koi_insol", np.nan)
+    if np.isnan(teq) or np.isnan(prad) or np.isnan(insol):
+        return "unknown"
+    if teq >= 700:
+        return "volcanic"
+    elif prad > 3.0:
+        return "gas_giant"
+    elif teq <= 200 or insol < 0.1:
+        return "ice"
+    elif teq > 320 or insol > 2.0:
+        return "desert"
+    elif 1.5 <= prad <= 3.0 and 200 < teq < 320:
+        return "aquatic"
+    elif prad < 1.5 and 200 < teq < 320:
+        return "terrestrial"
+    return "unknown"
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return pd.read_csv(CSV_FILE_NAME)
+
+
+@pytest.mark.parametrize("environment", [0, "aquatic", "desert"])
+def test_traits_match_per_row_logic_over_full_catalog(catalog, environment):
+    traits = generate_lifeforms(catalog, environment)
+    rows = catalog.to_dict(orient="records")
+
+    sizes = [reference_size(row, environment) for row in rows]
+    np.testing.assert_allclose(traits["size"], sizes, rtol=1e-12)
+    assert traits["color"].tolist() == [reference_color(row) for row in rows]
+    assert traits["environment"].tolist() == [reference_environment(row) for row in rows]
+    assert traits["communication"].tolist() == [
+        reference_communication(row, environment, size) for row, size in zip(rows, sizes)
+    ]
+    assert traits["diet"].tolist() == [reference_diet(row, environment, size) for row, size in zip(rows, sizes)]
+
+
+def test_default_environment_is_the_classified_one(catalog):
+    sample = catalog.head(200)
+
+    traits = generate_lifeforms(sample)
+
+    assert traits["size"].tolist() == generate_lifeforms(sample, traits["environment"])["size"].tolist()
+
+
+def test_lifeform_computes_traits_once(catalog, monkeypatch):
+    import game_objects.determine_lifeform as module
+
+    calls = []
+    real = module._traits
+    monkeypatch.setattr(module, "_traits", lambda *a, **k: calls.append(1) or real(*a, **k))
+    lifeform = Lifeform(catalog.iloc[330].to_dict(), 0, "", "", "", "aquatic")
+
+    for _ in range(3):
+        lifeform.get_size(), lifeform.get_color(), lifeform.get_environment()
+        lifeform.get_communication_method(), lifeform.get_diet()
+    assert len(calls) == 1
+
+    lifeform.set_base_size(4.0)
+    assert lifeform.get_size() == pytest.approx(reference_size(catalog.iloc[330].to_dict(), "aquatic", 4.0))
+    assert len(calls) == 2
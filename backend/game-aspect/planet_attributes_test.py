@@ -0,0 +1,99 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from game_objects.determine_planet_attributes import (
+    Planet,
+    classify_environment,
+    classify_habitability,
+)
+
+CSV_FILE_NAME = Path(__file__).resolve().parent / "cumulative_2025.10.04_13.06.32.csv"
+
+
+# --- Reference per-row implementations (the original scalar logic) ---
+
+def reference_habitable(row):
+    koi_teq = row.get("koi_teq", 288)
+    koi_prad = row.get("koi_prad", 1.0)
+    koi_insol = row.get("koi_insol", 1.0)
+    koi_steff = row.get("koi_steff", 5778)
+    if pd.isna(koi_teq): koi_teq = 288
+    if pd.isna(koi_prad): koi_prad = 1.0
+    if pd.isna(koi_insol): koi_insol = 1.0
+    if pd.isna(koi_steff): koi_steff = 5778
+    if koi_teq < 240 or koi_teq > 320:
+        return False
+    if not (0.5 <= koi_prad <= 1.8):
+        return False
+    if not (0.3 <= koi_prad ** 3.7 <= 5.0):
+        return False
+    if not (0.35 <= koi_insol <= 1.75):
+        return False
+    return 3700 <= koi_steff <= 7200
+
+
+def reference_environment(row):
+    pl_rade = row.get("koi_prad", 1.0)
+    pl_rade = float(pl_rade) if not pd.isna(pl_rade) else 1.0
+    pl_eqt = row.get("koi_teq", 288)
+    pl_eqt = float(pl_eqt) if not pd.isna(pl_eqt) else 288
+    pl_bmasse = row.get("pl_bmasse", None)
+    if pl_bmasse is None or pd.isna(pl_bmasse):
+        if pl_rade < 1.8:
+            pl_bmasse = pl_rade ** 3
+        elif pl_rade < 3.5:
+            pl_bmasse = pl_rade ** 2.06
+        else:
+            pl_bmasse = 10.0
+
+    if pl_rade < 1.8 and pl_bmasse < 5:
+        planet_type = "Rocky"
+    elif 1.8 <= pl_rade < 3.5:
+        planet_type = "Mini-Neptune"
+    elif pl_rade >= 3.5 or pl_bmasse >= 10:
+        planet_type = "Giant"
+    else:
+        planet_type = "Unclassified"
+
+    temp_class = "Cold" if pl_eqt < 180 else "Temperate" if pl_eqt <= 320 else "Hot"
+    names = {
+        "Rocky": {"Cold": "Frozen rocky", "Temperate": "Earth-like", "Hot": "Hot rocky"},
+        "Mini-Neptune": {"Cold": "Cold Mini-Neptune", "Temperate": "Temperate Mini-Neptune", "Hot": "Hot Mini-Neptune"},
+        "Giant": {"Cold": "Ice Giant", "Temperate": "Gas Giant", "Hot": "Hot Jupiter"},
+    }
+    return names.get(planet_type, {}).get(temp_class, "Unclassified")
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return pd.read_csv(CSV_FILE_NAME)
+
+
+def test_habitability_matches_per_row_logic_over_full_catalog(catalog):
+    expected = [reference_habitable(row) for row in catalog.to_dict(orient="records")]
+
+    assert classify_habitability(catalog).tolist() == expected
+
+
+def test_environment_matches_per_row_logic_over_full_catalog(catalog):
+    expected = [reference_environment(row) for row in catalog.to_dict(orient="records")]
+
+    assert classify_environment(catalog).tolist() == expected
+
+
+def test_environment_uses_given_mass_and_defaults():
+    df = pd.DataFrame({"koi_prad": [1.0, 1.0, np.nan], "pl_bmasse": [20.0, np.nan, np.nan]})
+    expected = [reference_environment(row) for row in df.to_dict(orient="records")]
+
+    assert classify_environment(df).tolist() == expected == ["Gas Giant", "Earth-like", "Earth-like"]
+    assert classify_habitability(pd.DataFrame(index=range(2))).tolist() == [True, True]
+
+
+def test_planet_delegates_to_column_functions(catalog):
+    row = catalog.iloc[330].to_dict()
+    planet = Planet(row)
+
+    assert planet.get_habitable() is True
+    assert planet.get_environment() == "Earth-like"
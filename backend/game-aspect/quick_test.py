@@ -4,11 +4,12 @@ from game_objects.determine_lifeform import Lifeform
 from game_objects.determine_planet_attributes import Planet
 
 
-df = pd.read_csv("cumulative_2025.10.04_13.06.32.csv")
-row_dict = df.iloc[331].to_dict()
-planet = Planet(row_dict)
-print(planet.get_habitable())
-print(planet.get_environment())
-lifeform = Lifeform(row_dict, 0, str((0,0,0)), "None", "None", 0)
+if __name__ == "__main__":
+    df = pd.read_csv("cumulative_2025.10.04_13.06.32.csv")
+    row_dict = df.iloc[331].to_dict()
+    planet = Planet(row_dict)
+    print(planet.get_habitable())
+    print(planet.get_environment())
+    lifeform = Lifeform(row_dict, 0, str((0,0,0)), "None", "None", 0)
 
-format_to_json(planet, lifeform)
+    format_to_json(planet, lifeform)
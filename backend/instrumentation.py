@@ -0,0 +1,297 @@
+"""
+Request timing, Prometheus metrics and an opt-in sampling profiler.
+
+- stage(name) times a block of request work; the durations go back to the
+  client as a Server-Timing header (shown in the browser's network panel).
+  Timings follow the request through InferencePool jobs via contextvars.
+- Counter/Histogram/Registry render the Prometheus text format, so /metrics
+  can be scraped without a client library.
+- SamplingProfiler samples every thread's stack while one request runs and
+  returns the counts as folded stacks (flamegraph.pl / speedscope input).
+
+InstrumentationMiddleware ties them together for the app.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import bisect
+import collections
+import math
+import os
+import secrets
+import sys
+import threading
+import time
+
+# --- per-request stage timings ---
+
+class RequestTimings:
+    """Durations of the named stages of one request, in the order they ran."""
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages.append((name, seconds))
+
+    def header(self, total: Optional[float] = None) -> str:
+        """Server-Timing value, durations in milliseconds; repeated stages are summed."""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for name, seconds in self.stages:
+                totals[name] = totals.get(name, 0.0) + seconds
+        if total is not None:
+            totals["total"] = total
+        return ", ".join(f"{name};dur={seconds * 1e3:.3f}" for name, seconds in totals.items())
+
+_TIMINGS: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as stage `name` of the current request (no-op outside one)."""
+    timings = _TIMINGS.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+# --- Prometheus text format ---
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Counter:
+    """Monotonic counter, one series per combination of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Cumulative-bucket histogram (seconds by default), per label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._series[key] = (counts, total + value)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class Registry:
+    """
+    Metrics to render on /metrics. Besides Counter/Histogram instances,
+    collect() takes callbacks read at scrape time, for numbers other
+    objects already keep (cache and pool stats).
+    """
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+        # (name, help, kind, labelnames, callback returning {label values: value})
+        self._callbacks: List[Tuple[str, str, str, Tuple[str, ...], Callable[[], Dict[Tuple[str, ...], float]]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collect(self, name: str, help: str, kind: str, labelnames: Sequence[str], callback: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        self._callbacks.append((name, help, kind, tuple(labelnames), callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}", *metric.samples()]
+        for name, help, kind, labelnames, callback in self._callbacks:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_labels(labelnames, key)} {_number(value)}" for key, value in sorted(callback().items())]
+        return "\n".join(lines) + "\n"
+
+# --- sampling profiler ---
+
+class SamplingProfiler:
+    """
+    Samples the stack of every other thread every `interval` seconds between
+    start() and stop(). Requests running concurrently show up too, so
+    profile one request on an otherwise quiet worker where possible.
+    """
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.samples = 0
+        self._counts: collections.Counter = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the folded stacks ("frame;frame;... count" per line)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self._counts.most_common())
+
+# --- ASGI middleware ---
+
+class InstrumentationMiddleware:
+    """
+    Times every HTTP request: counts and latency per route template and
+    status go to the registry, and the stage timings to a Server-Timing
+    header.
+
+    When profile_token is set, a request carrying "X-Profile: <token>" is
+    run under a SamplingProfiler; the folded stacks are handed to
+    store_profile, which returns an id sent back as X-Profile-Id.
+    """
+
+    def __init__(
+        self,
+        app,
+        registry: Registry,
+        *,
+        profile_token: Optional[str] = None,
+        store_profile: Optional[Callable[[str], str]] = None,
+    ):
+        self.app = app
+        self.profile_token = profile_token
+        self.store_profile = store_profile
+        self.requests = registry.counter(
+            "http_requests_total", "HTTP requests by route template, method and status.", ("method", "route", "status")
+        )
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "Time to the response start, by route template.", ("method", "route")
+        )
+
+    def _profiling(self, scope) -> bool:
+        if not self.profile_token or self.store_profile is None:
+            return False
+        for name, value in scope.get("headers", ()):
+            if name == b"x-profile":
+                return secrets.compare_digest(value, self.profile_token.encode())
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _TIMINGS.set(timings)
+        profiler = SamplingProfiler() if self._profiling(scope) else None
+        if profiler is not None:
+            profiler.start()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - start
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.header(total=elapsed).encode()))
+                if profiler is not None:
+                    headers.append((b"x-profile-id", self.store_profile(profiler.stop()).encode()))
+                message = {**message, "headers": headers}
+                self.latency.observe(elapsed, method=scope["method"], route=self._route(scope))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            self.requests.inc(method=scope["method"], route=self._route(scope), status=status)
+            _TIMINGS.reset(token)
+
+    @staticmethod
+    def _route(scope) -> str:
+        # the template ("/exoplanets/{kepoi_name}/profile"), not the raw path, to bound label cardinality
+        route = scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
@@ -0,0 +1,99 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.instrumentation import InstrumentationMiddleware, Registry, RequestTimings, SamplingProfiler, stage
+
+
+def _app(**options):
+    registry = Registry()
+    profiles = {}
+
+    def store_profile(folded):
+        profiles[str(len(profiles))] = folded
+        return str(len(profiles) - 1)
+
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware, registry=registry, store_profile=store_profile, **options)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        with stage("lookup"):
+            time.sleep(0.01)
+        with stage("lookup"):
+            pass
+        return {"item_id": item_id}
+
+    return app, registry, profiles
+
+
+def test_server_timing_sums_repeated_stages_and_adds_total():
+    app, _, _ = _app()
+    response = TestClient(app).get("/items/1")
+
+    entries = dict(entry.split(";dur=") for entry in response.headers["server-timing"].split(", "))
+    assert list(entries) == ["lookup", "total"]
+    assert 10 <= float(entries["lookup"]) <= float(entries["total"])
+
+
+def test_stage_outside_a_request_is_a_no_op():
+    with stage("anything"):
+        pass
+    assert RequestTimings().header() == ""
+
+
+def test_requests_are_counted_by_route_template():
+    app, registry, _ = _app()
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    text = registry.render()
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 2' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("engine",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, engine="flat")
+    registry.collect("entries", "Entries.", "gauge", ("cache",), lambda: {("profile",): 3})
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{engine="flat",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{engine="flat",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{engine="flat",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{engine="flat"} 5.55' in lines
+    assert 'entries{cache="profile"} 3' in lines
+    assert "# TYPE latency_seconds histogram" in lines
+
+
+def test_profiling_needs_the_configured_token():
+    app, _, profiles = _app(profile_token="s3cret")
+    client = TestClient(app)
+
+    assert "x-profile-id" not in client.get("/items/1").headers
+    assert "x-profile-id" not in client.get("/items/1", headers={"X-Profile": "guess"}).headers
+
+    response = client.get("/items/1", headers={"X-Profile": "s3cret"})
+    assert profiles[response.headers["x-profile-id"]].strip()
+
+    # never on without a token configured
+    app, _, profiles = _app()
+    assert "x-profile-id" not in TestClient(app).get("/items/1", headers={"X-Profile": ""}).headers
+
+
+def test_sampling_profiler_sees_other_threads():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    folded = profiler.stop()
+
+    assert profiler.samples > 0
+    assert "test_sampling_profiler_sees_other_threads" in folded
@@ -0,0 +1,260 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from backend.catalog.files import file_sha256
+
+# Flat, memory-mappable copy of the RandomForest in rf_model.joblib.
+#
+# sklearn's trees copy their node arrays into private memory when unpickled,
+# so every worker holds its own copy of the forest. Here all trees are
+# concatenated into a few contiguous arrays saved as .npy files next to the
+# model; load_forest memory-maps them read-only, so N workers share one
+# physical copy through the page cache. FlatForest.predict_proba1 evaluates
+# the arrays directly; predict_row/predict_batch pick it for small batches.
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+def forest_path(artifacts_dir: Union[str, Path]) -> Path:
+    return Path(artifacts_dir) / "rf_model.forest"
+
+class FlatForest:
+    """
+    A fitted binary RandomForestClassifier as flat node arrays.
+
+    Node ids are global across trees; roots[t] is the root of tree t.
+    Leaves point to themselves (left == right == own id) and hold
+    value = P(class 1) for that leaf; internal nodes send a row left when
+    X[feature] <= threshold, the same test sklearn applies.
+
+    Arrays:
+      feature    int32   split feature (0 at leaves)
+      threshold  float64 split threshold
+      left/right int32   child node ids
+      value      float64 P(class 1) at the node (only read at leaves)
+      roots      int32   root node id of every tree
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.n_features = int(meta["n_features"])
+        self.max_depth = int(meta["max_depth"])
+        self.classes = list(meta["classes"])
+        self.source_sha256 = meta.get("source_sha256")
+        self._views = None
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    def predict_proba1(self, X) -> np.ndarray:
+        """
+        P(class 1) for every row of X (n_rows, n_features): the mean of the
+        trees' leaf values, as RandomForestClassifier.predict_proba computes it.
+
+        Every (row, tree) pair descends one level per step and drops out of
+        the active set once it reaches a leaf, so a step only touches pairs
+        still descending. A single row skips that bookkeeping and walks each
+        tree directly (_walk_row). X is compared as float32, like sklearn's
+        trees.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected X with shape (n_rows, {self.n_features}), got {X.shape}")
+        if not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity")
+
+        n_rows, n_trees = len(X), self.n_trees
+        if n_rows == 1:
+            return np.array([self._walk_row(X[0])])
+        leaves = np.tile(self.roots, n_rows)
+        rows = np.repeat(np.arange(n_rows), n_trees)
+        active = np.arange(leaves.size)
+        nodes = leaves
+        while active.size:
+            go_left = X[rows[active], self.feature[nodes]] <= self.threshold[nodes]
+            children = np.where(go_left, self.left[nodes], self.right[nodes])
+            descending = children != nodes
+            leaves[active] = children
+            active = active[descending]
+            nodes = children[descending]
+        return self.value[leaves].reshape(n_rows, n_trees).sum(axis=1) / n_trees
+
+    def _walk_row(self, x: np.ndarray) -> float:
+        # one row is latency-bound: a plain loop over memoryviews of the
+        # arrays (still the shared mapping, no copy) beats numpy's per-step
+        # dispatch at this size
+        if self._views is None:
+            self._views = tuple(memoryview(getattr(self, name)) for name in ("feature", "threshold", "left", "right", "value"))
+        feature, threshold, left, right, value = self._views
+        x = x.tolist()
+        total = 0.0
+        for node in self.roots.tolist():
+            while True:
+                child = left[node] if x[feature[node]] <= threshold[node] else right[node]
+                if child == node:
+                    break
+                node = child
+            total += value[node]
+        return total / self.n_trees
+
+    @classmethod
+    def from_model(cls, model, *, source_sha256: Optional[str] = None) -> "FlatForest":
+        """Flatten a fitted sklearn RandomForestClassifier with classes {0, 1}."""
+        classes = [int(c) for c in getattr(model, "classes_", [])]
+        if 1 not in classes or len(classes) != 2:
+            raise ValueError(f"Expected a binary model with label 1, classes_={classes}")
+        idx1 = classes.index(1)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            ids = np.arange(tree.node_count, dtype=np.int64)
+            leaf = tree.children_left == -1
+            # class weights per node; normalised the way DecisionTreeClassifier.predict_proba does
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1)
+            totals[totals == 0.0] = 1.0
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, 0.0, tree.threshold))
+            lefts.append(np.where(leaf, ids, tree.children_left) + offset)
+            rights.append(np.where(leaf, ids, tree.children_right) + offset)
+            values.append(counts[:, idx1] / totals)
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, int(tree.max_depth))
+
+        arrays = {
+            "feature": np.concatenate(features).astype(np.int32),
+            "threshold": np.concatenate(thresholds).astype(np.float64),
+            "left": np.concatenate(lefts).astype(np.int32),
+            "right": np.concatenate(rights).astype(np.int32),
+            "value": np.concatenate(values).astype(np.float64),
+            "roots": np.asarray(roots, dtype=np.int32),
+        }
+        meta = {
+            "n_features": int(model.n_features_in_),
+            "max_depth": max_depth,
+            "classes": classes,
+            "source_sha256": source_sha256,
+        }
+        return cls(arrays, meta)
+
+def export_forest(forest: FlatForest, out_dir: Union[str, Path]) -> Path:
+    """
+    Write forest as one .npy per array plus a manifest. Written to a
+    temporary sibling directory and renamed into place, so readers never
+    see a partial copy.
+    """
+    out_dir = Path(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{out_dir.name}.", dir=out_dir.parent))
+    try:
+        for name in ARRAYS:
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(getattr(forest, name)))
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "n_features": forest.n_features,
+            "max_depth": forest.max_depth,
+            "classes": forest.classes,
+            "n_trees": forest.n_trees,
+            "n_nodes": forest.n_nodes,
+            "source_sha256": forest.source_sha256,
+        }
+        (staging / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+        if out_dir.exists():
+            retired = Path(tempfile.mkdtemp(prefix=f".{out_dir.name}.old.", dir=out_dir.parent))
+            os.replace(out_dir, retired / out_dir.name)
+            os.replace(staging, out_dir)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.replace(staging, out_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return out_dir
+
+def _read_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        manifest = json.loads((path / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+def load_forest(path: Union[str, Path], *, mmap: bool = True) -> FlatForest:
+    """Load a forest written by export_forest; arrays are read-only memory maps unless mmap=False."""
+    path = Path(path)
+    manifest = _read_manifest(path)
+    if manifest is None:
+        raise ValueError(f"Not a flattened forest: {path}")
+    arrays = {
+        name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None).view(np.ndarray)
+        for name in ARRAYS
+    }
+    return FlatForest(arrays, manifest)
+
+def load_or_export_forest(artifacts_dir: Union[str, Path], model=None) -> FlatForest:
+    """
+    The flat copy of artifacts_dir/rf_model.joblib, memory-mapped.
+
+    Re-exported when missing or when rf_model.joblib has changed (compared
+    by sha256). model is the already-unpickled model, if the caller has it.
+    If the artifacts directory is read-only the freshly flattened forest is
+    returned in memory instead.
+    """
+    artifacts_dir = Path(artifacts_dir)
+    model_path = artifacts_dir / "rf_model.joblib"
+    path = forest_path(artifacts_dir)
+    source_sha256 = file_sha256(model_path)
+
+    manifest = _read_manifest(path)
+    if manifest is not None and manifest.get("source_sha256") == source_sha256:
+        return load_forest(path)
+
+    if model is None:
+        import joblib
+
+        model = joblib.load(model_path)
+    forest = FlatForest.from_model(model, source_sha256=source_sha256)
+    try:
+        export_forest(forest, path)
+    except OSError:
+        return forest
+    return load_forest(path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # artifacts are ../artifacts relative to this file
+    artifacts_dir = (Path(__file__).resolve().parent / ".." / "artifacts").resolve()
+    if len(sys.argv) > 1:
+        artifacts_dir = Path(sys.argv[1]).expanduser().resolve()
+
+    forest = load_or_export_forest(artifacts_dir)
+    print(
+        f"{forest.n_trees} trees, {forest.n_nodes} nodes, max depth {forest.max_depth}, "
+        f"{forest.nbytes / 1e6:.1f} MB at {forest_path(artifacts_dir)}"
+    )
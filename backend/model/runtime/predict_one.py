@@ -1,25 +1,44 @@
 from __future__ import annotations
 from pathlib import Path
 from functools import lru_cache
-from typing import Dict, Any, Union
+from typing import Dict, Any, List, Optional, Union
 import json
+import logging
+import os
+import time
 import joblib
+import numpy as np
 import pandas as pd
 
 # Same-folder import
-from .preprocessing import preprocess
+from .preprocessing import fill_batch, fill_vector, preprocess, preprocess_batch, preprocess_vector, standardize
+from .prediction_cache import PREDICTION_CACHE
+from .forest import FlatForest, forest_path, load_or_export_forest
+
+logger = logging.getLogger(__name__)
 
 # Default to ../artifacts/ relative to this file
 DEFAULT_ARTIFACTS_DIR = (Path(__file__).resolve().parent / ".." / "artifacts").resolve()
 
+# "flat": vectorized traversal of the memory-mapped forest arrays, see forest.py
+#         (N workers share one physical copy of the model; fastest for few rows)
+# "sklearn": RandomForestClassifier.predict_proba on rf_model.joblib, unpickled
+#            into private memory the first time it is asked for (fastest for many rows)
+# "auto": flat below FLAT_ENGINE_MAX_ROWS rows, sklearn from there on
+ENGINES = ("auto", "flat", "sklearn")
+
+# measured crossover: flat is ~1.5x faster at 128 rows, even at 192, and
+# sklearn ~5x faster at 10k, where per-level numpy passes over every
+# (row, tree) pair dominate
+FLAT_ENGINE_MAX_ROWS = 192
+
 @lru_cache(maxsize=1)
 def _load_artifacts(artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR):
     """
-    Load and cache model, scaler, feature list, and build training means Series.
+    Load and cache scaler and feature list, and build training means Series.
     """
     artifacts_dir = Path(artifacts_dir).resolve()
 
-    model = joblib.load(artifacts_dir / "rf_model.joblib")
     scaler = joblib.load(artifacts_dir / "scaler.joblib")
     feature_list = json.loads((artifacts_dir / "feature_list.json").read_text())
 
@@ -32,19 +51,127 @@ def _load_artifacts(artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR):
         )
     mean_values = pd.Series(scaler.mean_, index=feature_list)
 
+    return scaler, mean_values
+
+@lru_cache(maxsize=1)
+def _load_sklearn_model(artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR):
+    """
+    Load and cache the sklearn model; only engine="sklearn" needs it.
+    """
+    model = joblib.load(Path(artifacts_dir).resolve() / "rf_model.joblib")
+
     # Determine which column in predict_proba corresponds to class=1
     classes = list(getattr(model, "classes_", []))
     if 1 not in classes:
         raise ValueError(f"Model classes do not contain label 1. classes_={classes}")
     idx_class_1 = classes.index(1)
 
-    return model, scaler, mean_values, idx_class_1
+    return model, idx_class_1
+
+def feature_names(artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR) -> List[str]:
+    """Model input features in training order (feature_list.json)."""
+    return list(_load_artifacts(artifacts_dir)[1].index)
+
+@lru_cache(maxsize=1)
+def _load_forest(artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR) -> FlatForest:
+    """
+    Load and cache the memory-mapped flat copy of the forest (see forest.py),
+    exporting it from rf_model.joblib first if it is missing or stale.
+    The unpickled model is only held while exporting.
+    """
+    return load_or_export_forest(Path(artifacts_dir).resolve())
+
+def _reset_artifacts() -> None:
+    """Forget the loaded artifacts so the next call reloads them from disk."""
+    _load_artifacts.cache_clear()
+    _load_sklearn_model.cache_clear()
+    _load_forest.cache_clear()
+
+def _cached_model_version(artifacts_dir: Union[str, Path]) -> str:
+    # also reloads the artifacts if they changed on disk since the last check
+    return PREDICTION_CACHE.model_version(Path(artifacts_dir).resolve(), on_change=_reset_artifacts)
+
+def _check_engine(engine: str) -> None:
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+
+def choose_engine(engine: str, n_rows: int) -> str:
+    """The engine that scores n_rows rows: engine itself unless it is "auto"."""
+    _check_engine(engine)
+    if engine != "auto":
+        return engine
+    return "flat" if n_rows < FLAT_ENGINE_MAX_ROWS else "sklearn"
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def load_model(artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR) -> Dict[str, Any]:
+    """
+    Eagerly load the scaler and the flat forest (call at startup so the
+    first request doesn't pay for it), and record how long that took and
+    what it cost in resident memory to model_load.json next to version.json.
+    rf_model.joblib is not unpickled here unless the flat copy has to be
+    (re)exported; the first batch of FLAT_ENGINE_MAX_ROWS or more rows
+    loads it for engine="sklearn".
+
+    Returns:
+      {
+        "pid": int,
+        "loaded_at_utc": str,
+        "artifacts_seconds": float,     # scaler + feature list
+        "forest_seconds": float,        # flat forest export/map
+        "rss_mb_before": float | None,
+        "rss_mb_after": float | None,
+        "forest": {"path", "n_trees", "n_nodes", "max_depth", "mb"}
+      }
+    """
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    _load_artifacts(artifacts_dir)
+    artifacts_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    forest = _load_forest(artifacts_dir)
+    forest_seconds = time.perf_counter() - start
+
+    stats = {
+        "pid": os.getpid(),
+        "loaded_at_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "artifacts_seconds": round(artifacts_seconds, 4),
+        "forest_seconds": round(forest_seconds, 4),
+        "rss_mb_before": rss_before,
+        "rss_mb_after": _rss_mb(),
+        "forest": {
+            "path": str(forest_path(Path(artifacts_dir).resolve())),
+            "n_trees": forest.n_trees,
+            "n_nodes": forest.n_nodes,
+            "max_depth": forest.max_depth,
+            "mb": round(forest.nbytes / 1e6, 2),
+        },
+    }
+
+    stats_path = Path(artifacts_dir).resolve() / "model_load.json"
+    try:
+        tmp_path = stats_path.with_name(f".{stats_path.name}.{os.getpid()}")
+        tmp_path.write_text(json.dumps(stats, indent=2))
+        os.replace(tmp_path, stats_path)
+    except OSError as exc:
+        logger.warning("Could not write %s: %s", stats_path, exc)
+    return stats
 
 def predict_row(
     row: Dict[str, Any],
     *,
     artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR,
     threshold: float = 0.5,
+    engine: str = "auto",
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     """
     Run a single-row prediction.
@@ -52,7 +179,11 @@ def predict_row(
     Steps:
       1) Load model/scaler/means from ../artifacts/
       2) Call your teammate's preprocess(row, mean_values, scaler) to produce a (1, n_features) scaled array
-      3) Predict with the RandomForest model
+      3) Predict with the flat forest arrays (engine="sklearn" calls the
+         RandomForest model instead, with the same probabilities to ~1e-12;
+         "auto" means flat for a single row)
+         Skipped when PREDICTION_CACHE already holds P(class=1) for the same
+         filled feature values, model version and engine (use_cache=False bypasses it)
       4) Return boolean label (is_candidate) and confidence
 
     Returns:
@@ -63,17 +194,33 @@ def predict_row(
         "threshold": float
       }
     """
-    model, scaler, mean_values, idx1 = _load_artifacts(artifacts_dir)
+    engine = choose_engine(engine, 1)
+    version = _cached_model_version(artifacts_dir) if use_cache else None
+    scaler, mean_values = _load_artifacts(artifacts_dir)
 
     # Ensure dict input (preprocess expects a dict of user inputs)
     if not isinstance(row, dict):
         raise TypeError("row must be a dict of raw input fields")
 
-    # Your preprocessing function fills missing features with training means and scales the row
-    X_scaled = preprocess(user_input=row, mean_values=mean_values, scaler=scaler)  # shape (1, n_features)
+    proba1 = None
+    if use_cache:
+        key = PREDICTION_CACHE.key(fill_vector(row, mean_values), version, Path(artifacts_dir).resolve(), engine)
+        proba1 = PREDICTION_CACHE.get(key)
+
+    if proba1 is None:
+        if engine == "flat":
+            X_scaled = preprocess_vector(user_input=row, mean_values=mean_values, scaler=scaler)
+            proba1 = float(_load_forest(artifacts_dir).predict_proba1(X_scaled)[0])
+        else:
+            # Your preprocessing function fills missing features with training means and scales the row
+            X_scaled = preprocess(user_input=row, mean_values=mean_values, scaler=scaler)  # shape (1, n_features)
 
-    # Predict probability for class=1 (CANDIDATE)
-    proba1 = float(model.predict_proba(X_scaled)[0, idx1])
+            # Predict probability for class=1 (CANDIDATE)
+            model, idx1 = _load_sklearn_model(artifacts_dir)
+            proba1 = float(model.predict_proba(X_scaled)[0, idx1])
+
+        if use_cache:
+            PREDICTION_CACHE.put(key, proba1)
 
     # Boolean decision and confidence in the predicted class
     is_candidate = proba1 >= threshold
@@ -88,6 +235,83 @@ def predict_row(
 
     return result
 
+def _predict_scaled(X_scaled, engine, artifacts_dir) -> np.ndarray:
+    if engine == "flat":
+        return _load_forest(artifacts_dir).predict_proba1(X_scaled)
+    model, idx1 = _load_sklearn_model(artifacts_dir)
+    return model.predict_proba(X_scaled)[:, idx1].astype(float)
+
+def predict_batch(
+    df: pd.DataFrame,
+    *,
+    artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR,
+    threshold: float = 0.5,
+    engine: str = "auto",
+    use_cache: bool = False,
+) -> pd.DataFrame:
+    """
+    Run predictions for every row of a DataFrame in one model call.
+
+    Same contract as predict_row, applied column-wise:
+      1) Load model/scaler/means from ../artifacts/
+      2) preprocess_batch(df, mean_values, scaler) fills gaps with training means
+         and scales all rows at once
+      3) One model call over the whole (n_rows, n_features) matrix: a
+         flat-forest traversal below FLAT_ENGINE_MAX_ROWS rows and
+         predict_proba from there on (engine="flat"/"sklearn" forces one)
+         With use_cache=True only rows missing from PREDICTION_CACHE are
+         scored (off by default: whole-catalog batches would just churn it)
+      4) Vectorized threshold decision
+
+    Returns:
+      DataFrame with the same index as df and columns
+        is_candidate (bool), confidence (float), prob_candidate (float), threshold (float);
+      attrs["model_rows"] is how many rows the model scored (cache hits excluded)
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("df must be a pandas DataFrame of raw input fields")
+    engine = choose_engine(engine, len(df))
+    version = _cached_model_version(artifacts_dir) if use_cache else None
+    scaler, mean_values = _load_artifacts(artifacts_dir)
+
+    # rows that actually went through the model (cache hits excluded)
+    model_rows = 0
+    if len(df) == 0:
+        proba1 = np.empty(0, dtype=float)
+    elif not use_cache:
+        X_scaled = preprocess_batch(user_inputs=df, mean_values=mean_values, scaler=scaler)
+        proba1 = _predict_scaled(X_scaled, engine, artifacts_dir)
+        model_rows = len(df)
+    else:
+        filled = fill_batch(user_inputs=df, mean_values=mean_values)
+        resolved_dir = Path(artifacts_dir).resolve()
+        keys = [PREDICTION_CACHE.key(values, version, resolved_dir, engine) for values in filled]
+        cached = [PREDICTION_CACHE.get(key) for key in keys]
+        proba1 = np.array([np.nan if p is None else p for p in cached], dtype=float)
+
+        missing = np.flatnonzero(np.isnan(proba1))
+        if missing.size:
+            X_scaled = standardize(filled[missing], scaler)
+            proba1[missing] = _predict_scaled(X_scaled, engine, artifacts_dir)
+            for position in missing:
+                PREDICTION_CACHE.put(keys[position], float(proba1[position]))
+        model_rows = int(missing.size)
+
+    is_candidate = proba1 >= threshold
+    confidence = np.where(is_candidate, proba1, 1.0 - proba1)
+
+    predictions = pd.DataFrame(
+        {
+            "is_candidate": is_candidate,
+            "confidence": confidence,
+            "prob_candidate": proba1,
+            "threshold": float(threshold),
+        },
+        index=df.index,
+    )
+    predictions.attrs["model_rows"] = model_rows
+    return predictions
+
 
 if __name__ == "__main__":
     import json
@@ -0,0 +1,110 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+
+from backend.cache import LRUCache
+
+# Cache of P(class 1) for feature vectors the model has already scored.
+#
+# Entries are keyed by a digest of the 42 feature values in feature_list.json
+# order, after missing values are filled with the training means (so {} and
+# an explicit all-means row share an entry), plus the model version, the
+# artifacts directory and the engine that scored it. The threshold is
+# applied after the lookup, so one entry serves every threshold.
+#
+# The artifact files are re-stat'ed at most every check_interval seconds;
+# when any of them changed the cache is cleared and on_change is called
+# (predict_one uses it to drop its loaded model).
+
+ARTIFACT_FILES = ("rf_model.joblib", "scaler.joblib", "feature_list.json", "version.json")
+
+def feature_digest(values: np.ndarray) -> bytes:
+    """Stable digest of one filled feature vector (float64, training order)."""
+    return hashlib.blake2b(np.ascontiguousarray(values, dtype=np.float64).tobytes(), digest_size=16).digest()
+
+class PredictionCache:
+    """
+    LRU (optionally TTL) cache of prob_candidate per feature vector, cleared
+    when the model artifacts change.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = None, check_interval: float = 1.0):
+        self.entries = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.check_interval = check_interval
+        self.invalidations = 0
+        # artifacts_dir -> (fingerprint, model version, last checked)
+        self._artifacts: Dict[str, Tuple[Tuple, str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(artifacts_dir: Path) -> Tuple:
+        stamps = []
+        for name in ARTIFACT_FILES:
+            try:
+                stat = (artifacts_dir / name).stat()
+                stamps.append((name, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamps.append((name, None, None))
+        return tuple(stamps)
+
+    def model_version(self, artifacts_dir: Union[str, Path], on_change=None) -> str:
+        """
+        Version string for artifacts_dir (sha256 of version.json, short).
+        Clears the cache and calls on_change() if the artifacts changed
+        since the last check.
+        """
+        artifacts_dir = Path(artifacts_dir)
+        key = str(artifacts_dir)
+        now = time.monotonic()
+        known = self._artifacts.get(key)
+        if known is not None and now - known[2] < self.check_interval:
+            return known[1]
+
+        with self._lock:
+            fingerprint = self._fingerprint(artifacts_dir)
+            known = self._artifacts.get(key)
+            if known is not None and known[0] == fingerprint:
+                self._artifacts[key] = (fingerprint, known[1], now)
+                return known[1]
+
+            try:
+                version = hashlib.sha256((artifacts_dir / "version.json").read_bytes()).hexdigest()[:16]
+            except FileNotFoundError:
+                version = "unversioned"
+            if known is not None:
+                # artifacts replaced under a running process
+                self.entries.clear()
+                self.invalidations += 1
+                if on_change is not None:
+                    on_change()
+            self._artifacts[key] = (fingerprint, version, now)
+            return version
+
+    def key(self, values: np.ndarray, model_version: str, artifacts_dir: Union[str, Path], engine: str = "flat") -> Hashable:
+        return (feature_digest(values), model_version, str(artifacts_dir), engine)
+
+    def get(self, key: Hashable) -> Optional[float]:
+        return self.entries.get(key)
+
+    def put(self, key: Hashable, prob_candidate: float) -> None:
+        self.entries.put(key, prob_candidate)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.entries.stats(), "invalidations": self.invalidations}
+
+def _env_ttl() -> Optional[float]:
+    ttl = os.environ.get("PREDICTION_CACHE_TTL")
+    return float(ttl) if ttl else None
+
+PREDICTION_CACHE = PredictionCache(
+    maxsize=int(os.environ.get("PREDICTION_CACHE_SIZE", 4096)),
+    ttl=_env_ttl(),
+)
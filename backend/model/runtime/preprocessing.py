@@ -24,9 +24,9 @@ def preprocess(user_input, mean_values, scaler):
     # Start with training means
     filled_input = mean_values.to_dict()
 
-    # Overwrite with user-provided values
+    # Overwrite with user-provided values; None/NaN count as missing
     for key, val in user_input.items():
-        if key in filled_input:
+        if key in filled_input and not pd.isna(val):
             filled_input[key] = val
 
     # Convert to DataFrame (single sample)
@@ -38,3 +38,98 @@ def preprocess(user_input, mean_values, scaler):
     return scaled
 
 
+def preprocess_batch(user_inputs, mean_values, scaler):
+    """
+    Vectorized counterpart of preprocess() for many rows at once.
+
+    Missing feature columns and NaN cells are filled with the training
+    means, columns that are not model features are ignored, and the whole
+    matrix is scaled at once with the scaler's mean_/scale_.
+
+    Parameters
+    ----------
+    user_inputs : pandas.DataFrame
+        One row per sample, columns named like the training features.
+    mean_values : pandas.Series
+        Mean of each feature from the training set, indexed by feature name.
+    scaler : sklearn.preprocessing.StandardScaler
+        Scaler fitted on the training data.
+
+    Returns
+    -------
+    np.ndarray
+        Scaled feature matrix (n_rows, n_features), ready for model.predict().
+    """
+
+    # Scale with the trained scaler's parameters
+    return standardize(fill_batch(user_inputs, mean_values), scaler)
+
+
+def fill_batch(user_inputs, mean_values):
+    """
+    The unscaled half of preprocess_batch(): the (n_rows, n_features) float
+    matrix in training feature order with gaps filled by the training means.
+    """
+
+    # Align to the training feature order; absent columns come back as NaN
+    filled = user_inputs.reindex(columns=mean_values.index).to_numpy(dtype=float)
+
+    # Fill gaps with the training means, column by column
+    # (np.where rather than DataFrame.fillna, which costs ms even on a few rows)
+    return np.where(np.isnan(filled), mean_values.to_numpy(dtype=float), filled)
+
+
+def preprocess_vector(user_input, mean_values, scaler):
+    """
+    Same result as preprocess() for one row, without building a DataFrame
+    or going through scaler.transform's input validation. Used by the
+    flat-forest engine, where those per-call costs dominate single-row latency.
+
+    Parameters
+    ----------
+    user_input : dict
+        Raw input fields; keys that are not model features are ignored.
+    mean_values : pandas.Series
+        Mean of each feature from the training set, indexed by feature name.
+    scaler : sklearn.preprocessing.StandardScaler
+        Scaler fitted on the training data.
+
+    Returns
+    -------
+    np.ndarray
+        Scaled feature vector (1, n_features).
+    """
+
+    return standardize(fill_vector(user_input, mean_values), scaler).reshape(1, -1)
+
+
+def fill_vector(user_input, mean_values):
+    """
+    The unscaled half of preprocess_vector(): a float vector in training
+    feature order, training means overwritten by the user-provided values.
+    None/NaN values are missing and keep the mean, as in fill_batch().
+    """
+
+    # Start with training means
+    filled = mean_values.to_numpy(dtype=float, copy=True)
+    positions = {name: i for i, name in enumerate(mean_values.index)}
+
+    # Overwrite with user-provided values
+    for key, val in user_input.items():
+        position = positions.get(key)
+        if position is not None and not pd.isna(val):
+            filled[position] = float(val)
+
+    return filled
+
+
+def standardize(values, scaler):
+    """
+    StandardScaler.transform's arithmetic (in place, same operation order,
+    so results are identical) without its per-call input validation.
+    """
+    if scaler.with_mean:
+        values -= scaler.mean_
+    if scaler.with_std:
+        values /= scaler.scale_
+    return values
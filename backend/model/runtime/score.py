@@ -0,0 +1,148 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import os
+import time
+import pandas as pd
+
+from .predict_one import DEFAULT_ARTIFACTS_DIR, ENGINES, predict_batch
+
+# Score a whole CSV (e.g. a Kepler archive release) with the batch path:
+#
+#   python -m backend.model.runtime.score cumulative.csv -o predictions.csv
+#
+# The input is read chunksize rows at a time, chunks are scored across a
+# process pool, and results are appended to the output in input order as
+# they come back, so memory stays flat however large the input is.
+
+DEFAULT_CHUNKSIZE = 5000
+# input columns copied to the output so predictions can be matched back
+ID_COLUMNS = ["kepid", "kepoi_name", "kepler_name"]
+RESULT_COLUMNS = ["is_candidate", "confidence", "prob_candidate"]
+
+def _score_chunk(
+    chunk: pd.DataFrame,
+    artifacts_dir: Union[str, Path],
+    threshold: float,
+    engine: str,
+    keep_columns: bool,
+) -> pd.DataFrame:
+    predictions = predict_batch(chunk, artifacts_dir=artifacts_dir, threshold=threshold, engine=engine)
+    kept = chunk if keep_columns else chunk[[c for c in ID_COLUMNS if c in chunk.columns]]
+    return pd.concat([kept, predictions[RESULT_COLUMNS]], axis=1)
+
+def _peak_rss_mb() -> Dict[str, Optional[float]]:
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return {"main": None, "workers": None}
+    # ru_maxrss is in KiB on Linux; RUSAGE_CHILDREN is the largest reaped worker
+    return {
+        "main": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "workers": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+def score_csv(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    *,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    workers: Optional[int] = None,
+    threshold: float = 0.5,
+    engine: str = "auto",
+    keep_columns: bool = False,
+    artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR,
+) -> Dict[str, Any]:
+    """
+    Score every row of input_path and write the predictions to output_path.
+
+    Steps:
+      1) Read the input with read_csv(comment="#", chunksize=chunksize)
+      2) Score each chunk with predict_batch in a pool of `workers` processes
+         (default: one per CPU; 0 scores in this process), keeping at most
+         2 * workers chunks in flight; engine="auto" picks sklearn for
+         chunks of FLAT_ENGINE_MAX_ROWS rows or more (any DEFAULT_CHUNKSIZE chunk)
+      3) Append each chunk's result to output_path, in input order
+
+    Output columns are the ID_COLUMNS present in the input (every input
+    column with keep_columns=True) plus is_candidate, confidence, prob_candidate.
+
+    Returns:
+      {"rows", "chunks", "seconds", "rows_per_second", "peak_rss_mb": {"main", "workers"}}
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    args = (Path(artifacts_dir).resolve(), threshold, engine, keep_columns)
+
+    start = time.perf_counter()
+    rows = chunks = 0
+
+    with open(output_path, "w", newline="") as out:
+        def write(result: pd.DataFrame) -> None:
+            nonlocal rows, chunks
+            result.to_csv(out, index=False, header=chunks == 0)
+            rows += len(result)
+            chunks += 1
+
+        reader = pd.read_csv(input_path, comment="#", chunksize=chunksize)
+        if workers == 0:
+            for chunk in reader:
+                write(_score_chunk(chunk, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                in_flight = deque()
+                for chunk in reader:
+                    in_flight.append(pool.submit(_score_chunk, chunk, *args))
+                    if len(in_flight) >= 2 * workers:
+                        write(in_flight.popleft().result())
+                while in_flight:
+                    write(in_flight.popleft().result())
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "chunks": chunks,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.model.runtime.score",
+        description="Score every row of a Kepler CSV with the batch model path.",
+    )
+    parser.add_argument("input", type=Path, help="CSV to score ('#' comment lines allowed)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("predictions.csv"))
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count, 0: no pool)")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--engine", choices=ENGINES, default="auto", help="default: by chunk size, sklearn for the default chunksize")
+    parser.add_argument("--keep-columns", action="store_true", help="copy every input column to the output")
+    parser.add_argument("--artifacts-dir", type=Path, default=DEFAULT_ARTIFACTS_DIR)
+    options = parser.parse_args()
+
+    stats = score_csv(
+        options.input.expanduser().resolve(),
+        options.output,
+        chunksize=options.chunksize,
+        workers=options.workers,
+        threshold=options.threshold,
+        engine=options.engine,
+        keep_columns=options.keep_columns,
+        artifacts_dir=options.artifacts_dir,
+    )
+    peak = stats["peak_rss_mb"]
+    print(f"Scored {stats['rows']} rows in {stats['chunks']} chunks -> {options.output}")
+    print(f"{stats['seconds']:.2f} s, {stats['rows_per_second']:,.0f} rows/s")
+    if peak["main"] is not None:
+        print(f"peak RSS: {peak['main']:.0f} MB main, {peak['workers']:.0f} MB largest worker")
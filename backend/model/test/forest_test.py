@@ -0,0 +1,108 @@
+import mmap
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from backend.model.runtime import forest as forest_module
+from backend.model.runtime.forest import FlatForest, export_forest, forest_path, load_forest, load_or_export_forest
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=12, max_depth=6, random_state=0).fit(X, y)
+    return model, rng.normal(size=(200, 6))
+
+
+def _walk(forest, x):
+    # one row, one tree at a time: the reference the flat layout must reproduce
+    total = 0.0
+    for root in forest.roots:
+        node = root
+        while forest.left[node] != node:
+            node = forest.left[node] if np.float32(x[forest.feature[node]]) <= forest.threshold[node] else forest.right[node]
+        total += forest.value[node]
+    return total / forest.n_trees
+
+
+def _mapped(values):
+    while isinstance(values, np.ndarray) and values.base is not None:
+        values = values.base
+    return isinstance(values, mmap.mmap)
+
+
+def test_flat_forest_reproduces_predict_proba(fitted):
+    model, X = fitted
+    forest = FlatForest.from_model(model)
+
+    expected = model.predict_proba(X)[:, list(model.classes_).index(1)]
+    actual = np.array([_walk(forest, x) for x in X])
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+    assert forest.n_trees == 12
+    assert forest.n_nodes == sum(e.tree_.node_count for e in model.estimators_)
+
+
+def test_predict_proba1_matches_sklearn(fitted):
+    model, X = fitted
+    forest = FlatForest.from_model(model)
+
+    expected = model.predict_proba(X)[:, list(model.classes_).index(1)]
+    np.testing.assert_allclose(forest.predict_proba1(X), expected, rtol=0, atol=1e-9)
+    # one row takes the direct per-tree walk instead of the active set
+    single = np.concatenate([forest.predict_proba1(X[i:i + 1]) for i in range(len(X))])
+    np.testing.assert_allclose(single, expected, rtol=0, atol=1e-9)
+    assert forest.predict_proba1(X[:0]).shape == (0,)
+
+
+def test_predict_proba1_rejects_bad_input(fitted):
+    model, X = fitted
+    forest = FlatForest.from_model(model)
+
+    with pytest.raises(ValueError):
+        forest.predict_proba1(X[:, :3])
+    X = X.copy()
+    X[0, 0] = np.nan
+    with pytest.raises(ValueError):
+        forest.predict_proba1(X)
+
+
+def test_export_round_trip_is_memory_mapped(fitted, tmp_path):
+    model, X = fitted
+    forest = FlatForest.from_model(model)
+    loaded = load_forest(export_forest(forest, tmp_path / "rf_model.forest"))
+    np.testing.assert_array_equal(loaded.predict_proba1(X), forest.predict_proba1(X))
+    assert loaded.predict_proba1(X[:1]) == pytest.approx(forest.predict_proba1(X[:1]), abs=1e-12)
+
+    for name in forest_module.ARRAYS:
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(forest, name))
+        assert _mapped(getattr(loaded, name))
+        assert not getattr(loaded, name).flags.writeable
+    assert (loaded.n_features, loaded.max_depth, loaded.classes) == (6, forest.max_depth, [0, 1])
+
+
+def test_reexported_when_model_changes(fitted, tmp_path):
+    model, _ = fitted
+    joblib.dump(model, tmp_path / "rf_model.joblib")
+
+    first = load_or_export_forest(tmp_path)
+    assert forest_path(tmp_path).is_dir()
+    assert load_or_export_forest(tmp_path).source_sha256 == first.source_sha256
+
+    smaller = RandomForestClassifier(n_estimators=3, random_state=1).fit(*_toy())
+    joblib.dump(smaller, tmp_path / "rf_model.joblib")
+    assert load_or_export_forest(tmp_path).n_trees == 3
+
+
+def test_rejects_non_binary_models():
+    X, _ = _toy()
+    model = RandomForestClassifier(n_estimators=2, random_state=0).fit(X, np.arange(len(X)) % 3)
+    with pytest.raises(ValueError):
+        FlatForest.from_model(model)
+
+
+def _toy():
+    X = np.arange(40, dtype=float).reshape(20, 2)
+    return X, (X[:, 0] > 15).astype(int)
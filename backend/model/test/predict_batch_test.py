@@ -0,0 +1,98 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.model.runtime import predict_one
+from backend.model.runtime.predict_one import FLAT_ENGINE_MAX_ROWS, PREDICTION_CACHE, choose_engine, load_model, predict_batch, predict_row
+
+THIS_DIR = Path(__file__).resolve().parent
+ARTIFACTS_DIR = (THIS_DIR / ".." / "artifacts").resolve()
+CSV_PATH = (THIS_DIR / ".." / ".." / "training-data" / "kepler-data.csv").resolve()
+
+pytestmark = pytest.mark.skipif(
+    not (ARTIFACTS_DIR / "rf_model.joblib").exists(),
+    reason="rf_model.joblib is not checked in",
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_prediction_cache():
+    # predict_row caches by default; don't let one test's results answer another's
+    PREDICTION_CACHE.clear()
+    yield
+    PREDICTION_CACHE.clear()
+
+
+@pytest.fixture(scope="module")
+def kepler_df():
+    return pd.read_csv(CSV_PATH, comment="#")
+
+
+def test_batch_matches_single_row_predictions(kepler_df):
+    sample = kepler_df.sample(n=200, random_state=0)
+
+    batch = predict_batch(sample)
+    # predict_row sees the row without its NaN cells, which it fills with training means
+    singles = [predict_row(row.dropna().to_dict(), use_cache=False) for _, row in sample.iterrows()]
+
+    assert list(batch.index) == list(sample.index)
+    np.testing.assert_allclose(batch["prob_candidate"], [s["prob_candidate"] for s in singles])
+    np.testing.assert_allclose(batch["confidence"], [s["confidence"] for s in singles])
+    assert batch["is_candidate"].tolist() == [s["is_candidate"] for s in singles]
+
+
+def test_batch_fills_missing_columns_with_training_means(kepler_df):
+    sample = kepler_df.head(5)[["koi_period", "koi_prad", "koi_teq"]]
+
+    batch = predict_batch(sample, threshold=0.3)
+    singles = [predict_row(row, threshold=0.3, use_cache=False) for row in sample.to_dict(orient="records")]
+
+    np.testing.assert_allclose(batch["prob_candidate"], [s["prob_candidate"] for s in singles])
+    assert (batch["threshold"] == 0.3).all()
+
+
+def test_empty_batch_returns_empty_frame():
+    out = predict_batch(pd.DataFrame(columns=["koi_period"]))
+
+    assert out.empty
+    assert list(out.columns) == ["is_candidate", "confidence", "prob_candidate", "threshold"]
+
+
+def test_flat_engine_matches_sklearn(kepler_df):
+    sklearn_batch = predict_batch(kepler_df, engine="sklearn")
+    flat_batch = predict_batch(kepler_df)
+
+    np.testing.assert_allclose(flat_batch["prob_candidate"], sklearn_batch["prob_candidate"], rtol=0, atol=1e-9)
+    assert flat_batch["is_candidate"].tolist() == sklearn_batch["is_candidate"].tolist()
+
+    for _, row in kepler_df.sample(n=50, random_state=1).iterrows():
+        raw = row.dropna().to_dict()
+        flat = predict_row(raw, use_cache=False)
+        sklearn = predict_row(raw, engine="sklearn", use_cache=False)
+        assert abs(flat["prob_candidate"] - sklearn["prob_candidate"]) <= 1e-9
+        assert flat["is_candidate"] == sklearn["is_candidate"]
+
+
+def test_auto_engine_picks_by_row_count():
+    assert choose_engine("auto", 1) == "flat"
+    assert choose_engine("auto", FLAT_ENGINE_MAX_ROWS - 1) == "flat"
+    assert choose_engine("auto", FLAT_ENGINE_MAX_ROWS) == "sklearn"
+    assert choose_engine("flat", 10**6) == "flat"
+    with pytest.raises(ValueError):
+        choose_engine("onnx", 1)
+
+
+def test_unknown_engine_is_rejected(kepler_df):
+    with pytest.raises(ValueError):
+        predict_batch(kepler_df.head(1), engine="onnx")
+
+
+def test_load_model_does_not_unpickle_the_sklearn_model(kepler_df):
+    predict_one._reset_artifacts()
+    load_model()
+    predict_batch(kepler_df.head(10))
+    assert predict_one._load_sklearn_model.cache_info().currsize == 0
+
+    predict_batch(kepler_df.head(10), engine="sklearn")
+    assert predict_one._load_sklearn_model.cache_info().currsize == 1
@@ -0,0 +1,110 @@
+from pathlib import Path
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.model.runtime.prediction_cache import PredictionCache
+from backend.model.runtime.predict_one import PREDICTION_CACHE, predict_batch, predict_row
+
+THIS_DIR = Path(__file__).resolve().parent
+ARTIFACTS_DIR = (THIS_DIR / ".." / "artifacts").resolve()
+
+needs_model = pytest.mark.skipif(
+    not (ARTIFACTS_DIR / "rf_model.joblib").exists(),
+    reason="rf_model.joblib is not checked in",
+)
+
+
+def _write_artifacts(directory: Path, version: str) -> None:
+    for name in ("rf_model.joblib", "scaler.joblib", "feature_list.json"):
+        (directory / name).write_bytes(b"x")
+    (directory / "version.json").write_text(version)
+
+
+def test_key_depends_on_values_and_version(tmp_path):
+    cache = PredictionCache()
+    values = np.array([1.0, 2.0, 3.0])
+
+    assert cache.key(values, "v1", tmp_path) == cache.key(values.copy(), "v1", tmp_path)
+    assert cache.key(values, "v1", tmp_path) != cache.key(values + 1e-9, "v1", tmp_path)
+    assert cache.key(values, "v1", tmp_path) != cache.key(values, "v2", tmp_path)
+    assert cache.key(values, "v1", tmp_path, "flat") != cache.key(values, "v1", tmp_path, "sklearn")
+
+
+def test_artifact_change_clears_the_cache(tmp_path):
+    _write_artifacts(tmp_path, '{"version": 1}')
+    cache = PredictionCache(check_interval=0)
+    changes = []
+
+    version = cache.model_version(tmp_path, on_change=lambda: changes.append(1))
+    cache.put(cache.key(np.zeros(3), version, tmp_path), 0.25)
+    assert cache.model_version(tmp_path) == version
+    assert cache.get(cache.key(np.zeros(3), version, tmp_path)) == 0.25
+
+    (tmp_path / "version.json").write_text('{"version": 2}')
+    os.utime(tmp_path / "version.json", ns=(1, 1))
+    new_version = cache.model_version(tmp_path, on_change=lambda: changes.append(1))
+
+    assert new_version != version
+    assert changes == [1]
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_check_interval_skips_restat(tmp_path):
+    _write_artifacts(tmp_path, "a")
+    cache = PredictionCache(check_interval=3600)
+    version = cache.model_version(tmp_path)
+
+    (tmp_path / "version.json").write_text("bb")
+    assert cache.model_version(tmp_path) == version
+    assert cache.stats()["invalidations"] == 0
+
+
+@needs_model
+def test_row_with_missing_fields_shares_entry_with_filled_row():
+    PREDICTION_CACHE.clear()
+    first = predict_row({})
+    hits = PREDICTION_CACHE.stats()["hits"]
+
+    again = predict_row({}, threshold=0.9)
+    assert PREDICTION_CACHE.stats()["hits"] == hits + 1
+    assert again["prob_candidate"] == first["prob_candidate"]
+    assert again["is_candidate"] == (first["prob_candidate"] >= 0.9)
+    assert predict_row({}, use_cache=False)["prob_candidate"] == first["prob_candidate"]
+
+
+@needs_model
+def test_null_features_are_imputed_on_every_path():
+    PREDICTION_CACHE.clear()
+    expected = predict_row({})["prob_candidate"]
+
+    for engine in ("sklearn", "flat"):
+        for value in (None, float("nan")):
+            assert predict_row({"koi_period": value}, engine=engine)["prob_candidate"] == pytest.approx(expected)
+            assert predict_row({"koi_period": value}, engine=engine, use_cache=False)["prob_candidate"] == pytest.approx(expected)
+
+
+@needs_model
+def test_engines_get_their_own_entries():
+    PREDICTION_CACHE.clear()
+    predict_row({})
+    predict_row({}, engine="sklearn")
+
+    assert PREDICTION_CACHE.stats()["size"] == 2
+
+
+@needs_model
+def test_cached_batch_matches_uncached():
+    PREDICTION_CACHE.clear()
+    frame = pd.DataFrame([{"koi_period": p} for p in (1.0, 10.0, 100.0, 10.0)])
+
+    expected = predict_batch(frame)
+    cold = predict_batch(frame, use_cache=True)
+    warm = predict_batch(frame, use_cache=True)
+
+    np.testing.assert_allclose(cold["prob_candidate"], expected["prob_candidate"], rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(warm["prob_candidate"], cold["prob_candidate"])
+    assert PREDICTION_CACHE.stats()["size"] == 3
+    assert (expected.attrs["model_rows"], cold.attrs["model_rows"], warm.attrs["model_rows"]) == (4, 4, 0)
@@ -0,0 +1,52 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.model.runtime.predict_one import predict_batch
+from backend.model.runtime.score import ID_COLUMNS, score_csv
+
+THIS_DIR = Path(__file__).resolve().parent
+ARTIFACTS_DIR = (THIS_DIR / ".." / "artifacts").resolve()
+CSV_PATH = (THIS_DIR / ".." / ".." / "training-data" / "kepler-data.csv").resolve()
+
+pytestmark = pytest.mark.skipif(
+    not (ARTIFACTS_DIR / "rf_model.joblib").exists(),
+    reason="rf_model.joblib is not checked in",
+)
+
+
+@pytest.fixture(scope="module")
+def sample_csv(tmp_path_factory):
+    sample = pd.read_csv(CSV_PATH, comment="#").head(250)
+    path = tmp_path_factory.mktemp("score") / "sample.csv"
+    path.write_text("# exported rows\n" + sample.to_csv(index=False))
+    return path, sample
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_scores_every_row_in_order(sample_csv, tmp_path, workers):
+    path, sample = sample_csv
+    output = tmp_path / "out.csv"
+
+    stats = score_csv(path, output, chunksize=60, workers=workers)
+    scored = pd.read_csv(output)
+    expected = predict_batch(sample)
+
+    assert (stats["rows"], stats["chunks"]) == (250, 5)
+    ids = [c for c in ID_COLUMNS if c in sample.columns]
+    assert list(scored.columns) == ids + ["is_candidate", "confidence", "prob_candidate"]
+    assert scored["kepoi_name"].tolist() == sample["kepoi_name"].tolist()
+    np.testing.assert_allclose(scored["prob_candidate"], expected["prob_candidate"])
+    assert stats["rows_per_second"] > 0
+
+
+def test_keep_columns_copies_input(sample_csv, tmp_path):
+    path, sample = sample_csv
+    output = tmp_path / "out.csv"
+
+    score_csv(path, output, chunksize=100, workers=0, keep_columns=True, threshold=0.3)
+    scored = pd.read_csv(output)
+
+    assert list(scored.columns) == list(sample.columns) + ["is_candidate", "confidence", "prob_candidate"]
+    assert (scored["is_candidate"] == (scored["prob_candidate"] >= 0.3)).all()
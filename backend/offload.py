@@ -0,0 +1,112 @@
+"""
+Bounded thread pool for CPU-bound request work.
+
+Endpoints that do per-row pandas/model work hand it to an InferencePool
+instead of running it on the event loop, so one heavy request can't stall
+cheap ones on the same worker. At most max_workers jobs run and at most
+max_queue more wait; beyond that submissions fail fast with PoolFull
+(the API answers 429) rather than queueing without bound.
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import contextvars
+import threading
+import time
+
+class PoolFull(Exception):
+    """Raised when max_workers jobs are running and max_queue are waiting."""
+
+class InferencePool:
+    """
+    Thread pool with a hard cap on outstanding jobs and a per-call timeout.
+
+    A job keeps its slot until it actually finishes: a timed-out call stops
+    waiting, but a job that already started still counts against the cap
+    while it runs (threads can't be interrupted), so timeouts never let
+    more work pile up than the cap allows. Jobs that time out before they
+    start are cancelled.
+    """
+
+    # how often run(wait=...) checks for a free slot
+    WAIT_INTERVAL = 0.05
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64, timeout: Optional[float] = 10.0):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self._outstanding -= 1
+            if not future.cancelled():
+                self.completed += 1
+
+    async def _acquire(self, wait: Optional[float]) -> None:
+        deadline = time.monotonic() + (wait or 0.0)
+        while True:
+            with self._lock:
+                if self._outstanding < self.max_workers + self.max_queue:
+                    self._outstanding += 1
+                    return
+                if time.monotonic() >= deadline:
+                    self.rejected += 1
+                    raise PoolFull(f"{self._outstanding} jobs outstanding")
+            await asyncio.sleep(self.WAIT_INTERVAL)
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        wait: Optional[float] = None,
+    ) -> Any:
+        """
+        Run fn(*args) on the pool and return its result.
+
+        Raises PoolFull when the pool is at capacity (after waiting up to
+        `wait` seconds for a slot, if given) and asyncio.TimeoutError when
+        the result takes longer than timeout (default: the pool's). Only
+        the final PoolFull counts as a rejection.
+        """
+        await self._acquire(wait)
+
+        try:
+            # like asyncio.to_thread, run in a copy of the caller's context
+            # so contextvars (request timings) follow the job
+            future = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        except BaseException:
+            with self._lock:
+                self._outstanding -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            outstanding = self._outstanding
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "outstanding": outstanding,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.offload import InferencePool, PoolFull
+
+
+def test_runs_off_the_event_loop_thread():
+    pool = InferencePool(max_workers=2, max_queue=0)
+
+    async def main():
+        return await pool.run(threading.get_ident)
+
+    assert asyncio.run(main()) != threading.get_ident()
+    assert pool.stats()["completed"] == 1
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    pool = InferencePool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(PoolFull):
+            await pool.run(lambda: None)
+        release.set()
+        return await asyncio.gather(*running)
+
+    assert asyncio.run(main()) == [True, True]
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["outstanding"] == 0
+
+
+def test_timed_out_job_holds_its_slot_until_it_finishes():
+    pool = InferencePool(max_workers=1, max_queue=0, timeout=0.01)
+    release = threading.Event()
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(release.wait)
+        # still running in its thread, so the pool is still full
+        with pytest.raises(PoolFull):
+            await pool.run(lambda: None)
+        release.set()
+        while pool.stats()["outstanding"]:
+            await asyncio.sleep(0.001)
+        return await pool.run(lambda: "ok")
+
+    assert asyncio.run(main()) == "ok"
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_queued_job_is_cancelled_on_timeout():
+    pool = InferencePool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    ran = []
+
+    async def main():
+        blocker = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(lambda: ran.append(1), timeout=0.01)
+        release.set()
+        await blocker
+
+    asyncio.run(main())
+    time.sleep(0.01)
+    assert ran == []
+    assert pool.stats()["outstanding"] == 0
+
+
+def test_jobs_see_the_callers_contextvars():
+    import contextvars
+    request_id = contextvars.ContextVar("request_id", default=None)
+    pool = InferencePool(max_workers=1, max_queue=0)
+
+    async def main():
+        request_id.set("abc")
+        return await pool.run(request_id.get)
+
+    assert asyncio.run(main()) == "abc"
+
+
+def test_waiting_for_a_slot_is_not_a_rejection():
+    pool = InferencePool(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def main():
+        blocker = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.ensure_future(pool.run(lambda: "ok", wait=5.0))
+        await asyncio.sleep(0.2)
+        release.set()
+        await blocker
+        result = await waiting
+        release.clear()
+        blocker = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        with pytest.raises(PoolFull):
+            await pool.run(lambda: None, wait=0.1)
+        release.set()
+        await blocker
+        return result
+
+    assert asyncio.run(main()) == "ok"
+    assert pool.stats()["rejected"] == 1
@@ -0,0 +1,38 @@
+"""
+Planet and lifeform profiles for the API.
+
+The game-aspect code lives in a directory that isn't an importable package
+(its name has a hyphen) and imports its modules top-level
+(``from formatter import ...``), so its directory is put on sys.path, but
+only when a profile is first built rather than when this module is imported.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Iterator
+import sys
+
+import pandas as pd
+
+GAME_ASPECT_DIR = (Path(__file__).resolve().parent / "game-aspect").resolve()
+
+def add_game_aspect_to_path() -> None:
+    """Make the game-aspect modules (exporter, formatter, game_objects) importable."""
+    if str(GAME_ASPECT_DIR) not in sys.path:
+        sys.path.insert(0, str(GAME_ASPECT_DIR))
+
+def _exporter():
+    add_game_aspect_to_path()
+    import exporter
+
+    return exporter
+
+def iter_profiles(data: pd.DataFrame, environments=None) -> Iterator[Dict[str, Any]]:
+    """The game-aspect exporter's profile for every row of data, in order."""
+    return _exporter().iter_profiles(data, environments)
+
+def build_planet_profile(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The formatter's profile for one raw catalog row (NaNs left in place),
+    computed in memory: {"kepoi_name", "kepler_name", "text_description", "parameters"}.
+    """
+    return next(iter_profiles(pd.DataFrame([record])))
@@ -0,0 +1,95 @@
+"""
+Pre-encoded HTTP responses for payloads that only change when the catalog does.
+
+The body is serialized (and gzip-compressed) once, so serving it costs a
+header check and a memcpy instead of per-row Python work and JSON encoding.
+"""
+from __future__ import annotations
+from typing import Any
+import gzip
+import hashlib
+import json
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+def accepts_gzip(request: Request) -> bool:
+    """True when Accept-Encoding allows gzip (explicitly or via *) with q > 0."""
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body as it goes
+    (e.g. scoring an upload chunk by chunk).
+
+    StreamingResponse normally listens for client disconnects on receive()
+    while it streams, which would swallow the request body messages; here
+    the body iterator is the only reader, and a disconnect surfaces there as
+    ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+class PreencodedBody:
+    """
+    A response body encoded once, with a strong ETag and a gzip variant.
+
+    Each representation gets its own ETag ("<hash>" and "<hash>-gzip") so
+    caches never confuse the two, and If-None-Match accepts either.
+    """
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        # mtime=0 keeps the compressed bytes (and so the ETag) stable across restarts
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+    def _not_modified(self, request: Request) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+        # Weak comparison is what If-None-Match calls for, so ignore any W/ prefix
+        tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return self.etag in tags or self.gzip_etag in tags
+
+    def response(self, request: Request) -> Response:
+        """Build the 200/304 response for this request."""
+        use_gzip = accepts_gzip(request)
+        headers = {
+            "ETag": self.gzip_etag if use_gzip else self.etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache",
+        }
+
+        if self._not_modified(request):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type=self.media_type, headers=headers)
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+class PreencodedJSON(PreencodedBody):
+    """A JSON payload encoded once; see PreencodedBody."""
+
+    def __init__(self, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        super().__init__(body, "application/json")
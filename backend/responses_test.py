@@ -0,0 +1,45 @@
+import gzip
+import json
+
+from starlette.requests import Request
+
+from backend.responses import PreencodedJSON
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+PAYLOAD = [{"kepler_name": "Kepler-227 b", "kepoi_name": "K00752.01"}]
+
+
+def test_gzip_variant_when_accepted():
+    listing = PreencodedJSON(PAYLOAD)
+
+    response = listing.response(_request(accept_encoding="gzip, deflate"))
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == listing.gzip_etag
+    assert json.loads(gzip.decompress(response.body)) == PAYLOAD
+
+
+def test_identity_when_gzip_refused():
+    listing = PreencodedJSON(PAYLOAD)
+
+    response = listing.response(_request(accept_encoding="gzip;q=0"))
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == listing.etag
+    assert json.loads(response.body) == PAYLOAD
+
+
+def test_if_none_match_returns_304():
+    listing = PreencodedJSON(PAYLOAD)
+
+    assert listing.response(_request(if_none_match=f'"other", W/{listing.etag}')).status_code == 304
+    assert listing.response(_request(if_none_match='"other"')).status_code == 200
+
+
+def test_etag_is_stable_across_encodings_of_equal_payloads():
+    assert PreencodedJSON(PAYLOAD).gzip_body == PreencodedJSON(list(PAYLOAD)).gzip_body
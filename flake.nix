@@ -19,6 +19,9 @@
             python312Packages.pydantic
             python312Packages.joblib
             python312Packages.scikit-learn
+            python312Packages.pytest
+            python312Packages.httpx
+            python312Packages.orjson
             nodejs_20
           ];
         };
@@ -1,4 +1,4 @@
-import { ExoplanetListItem, ExoplanetDetails } from '../types/exoplanet';
+import { ExoplanetListItem, ExoplanetDetails, SceneParameters } from '../types/exoplanet';
 
 let customPlanetByKepoiName: Record<string, ExoplanetDetails> = {};
 let customPlanetKepoiNameList: string[] = [];
@@ -23,6 +23,29 @@ export async function fetchExoplanetDetails(kepoi_name: string): Promise<Exoplan
   return data;
 }
 
+// Every KOI's render parameters in one binary payload: a uint32 header length,
+// a JSON header, then packed little-endian Float32 columns and the kepoi_names
+// (layout documented in backend/catalog/exoplanet_metrics.py)
+export async function fetchSceneParameters(): Promise<SceneParameters> {
+  const response = await fetch(`${API_URL}/exoplanets/scene`);
+  if (!response.ok) {
+    // an error body is JSON, not the binary layout below
+    throw new Error(`Failed to fetch scene parameters: ${response.status} ${response.statusText}`);
+  }
+  const buffer = await response.arrayBuffer();
+  const headerLength = new DataView(buffer).getUint32(0, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)));
+
+  let offset = 4 + headerLength;
+  const columns: Record<string, Float32Array> = {};
+  for (const name of header.columns) {
+    columns[name] = new Float32Array(buffer, offset, header.rows); // a view, no copy
+    offset += header.rows * 4;
+  }
+  const names = new TextDecoder().decode(new Uint8Array(buffer, offset, header.names_bytes));
+  return { count: header.rows, kepoiNames: header.rows ? names.split('\n') : [], columns };
+}
+
 // Function to add custom planet
 export function addCustomPlanet(planetDetails: ExoplanetDetails) {
   customPlanetByKepoiName[planetDetails.kepoi_name] = planetDetails;
@@ -21,6 +21,13 @@ export interface ExoplanetDetails {
   diet: string;
 }
 
+// Render parameters for the whole catalog, one Float32Array per field (row i = kepoiNames[i])
+export interface SceneParameters {
+  count: number;
+  kepoiNames: string[];
+  columns: Record<string, Float32Array>; // orbital_period, planet_radius, ..., is_exoplanet (0/1)
+}
+
 export interface SelectedPlanet extends ExoplanetDetails {
   color: string; // assigned color for visualization
 }